@@ -3,35 +3,42 @@ import os
 import sys
 from typing import List
 
-import joblib
-import numpy as np
-
 MODEL_PATH = os.path.join('resources', 'classifier_rf.pkl')
 LEVEL_MAP = {0: 'junior', 1: 'middle', 2: 'senior'}
+BATCH_ROWS = 65536
 
 def predict_levels(npy_path: str) -> List[str]:
     """
     Выполняет предсказание уровней квалификации.
 
     Args:
-        npy_path (str): путь к файлу с признаками.
+        npy_path (str): путь к хранилищу датасета (директория с manifest.json), таблице признаков .arrow/.parquet
+                        или файлу x_data.npy/.npz.
     Returns:
         List[str]: список предсказанных уровней.
     """
-    if not os.path.exists(MODEL_PATH):
-        raise FileNotFoundError(f"Модель {MODEL_PATH} не найдена. Обучите её через train_classifier.py")
+    # Тяжелые импорты — после разбора аргументов: `app.py --help` не загружает numpy/scipy
+    from utils.compact_model import load_model
+    from utils.dataset_io import load_features
+
+    # Предсказание идет большими батчами, где деревья sklearn быстрее компактного леса NumPy:
+    # берется pickle, а classifier_rf.npz — только если pickle нет (см. utils/compact_model.py)
+    model = load_model(MODEL_PATH, prefer_compact=False)
 
     try:
-        x_data = np.load(npy_path)
-        model = joblib.load(MODEL_PATH)
-        preds = model.predict(x_data)
-        return [LEVEL_MAP[int(p)] for p in preds]
+        x_data = load_features(npy_path)
+        # Предсказание батчами: memory-mapped датасет не копируется в память целиком
+        levels = []
+        for start in range(0, x_data.shape[0], BATCH_ROWS):
+            levels.extend(LEVEL_MAP[int(p)] for p in model.predict(x_data[start:start + BATCH_ROWS]))
+        return levels
     except Exception as e:
         raise RuntimeError(f"Ошибка в процессе инференса: {e}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="HH Developer Level Predictor")
-    parser.add_argument("path", help="Путь к x_data.npy")
+    parser.add_argument("path", help="Путь к датасету (например, data/ или data/features.arrow) "
+                                     "или к x_data.npy/x_data.npz")
     args = parser.parse_args()
 
     try:
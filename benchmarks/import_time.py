@@ -0,0 +1,99 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+# CLI запускаются по пути из корня репозитория: их директория сама попадает в sys.path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LEVEL_CODES = [0, 1, 2]
+
+
+def run_ms(args: List[str], cwd: str, repeat: int) -> float:
+    """Медиана времени запуска команды (новый процесс на каждый запуск), мс."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def slowest_imports(args: List[str], cwd: str, top: int = 10) -> List[tuple]:
+    """Самые дорогие модули по суммарному времени импорта (python -X importtime)."""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Только модули верхнего уровня вложенности (один пробел отступа): их время включает зависимости
+        if not name.startswith('  '):
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def make_workspace(path: str, rows: int = 1000, n_features: int = 64) -> None:
+    """Маленькое хранилище датасета и компактная модель для замера одного батча предсказания."""
+    import numpy as np
+    import scipy.sparse as sp
+    from sklearn.ensemble import RandomForestClassifier
+
+    from utils.compact_model import export_compact_model
+    from utils.dataset_io import DatasetWriter
+
+    rng = np.random.RandomState(0)
+    x = sp.random(rows, n_features, density=0.1, format='csr', dtype=np.float32, random_state=rng)
+    y = rng.choice(LEVEL_CODES, size=rows).astype(np.int8)
+    writer = DatasetWriter(os.path.join(path, 'data'))
+    writer.write(x, y, [f'f{i}' for i in range(n_features)], 'benchmark')
+    writer.close()
+
+    os.makedirs(os.path.join(path, 'resources'))
+    model = RandomForestClassifier(n_estimators=100, random_state=0).fit(x, y)
+    export_compact_model(model, os.path.join(path, 'resources', 'classifier_rf.npz'))
+
+
+def main(repeat: int, budget_help_ms: float, budget_predict_ms: float, show_imports: bool) -> int:
+    with tempfile.TemporaryDirectory() as workspace:
+        make_workspace(workspace)
+        cases = [
+            # (название, аргументы, бюджет мс)
+            ('python -c pass', ['-c', 'pass'], None),
+            ('app.py --help', [os.path.join(ROOT, 'app.py'), '--help'], budget_help_ms),
+            ('predict.py --help', [os.path.join(ROOT, 'predict.py'), '--help'], budget_help_ms),
+            ('parse_data.py --help', [os.path.join(ROOT, 'parse_data.py'), '--help'], budget_help_ms),
+            ('train_classifier.py --help', [os.path.join(ROOT, 'train_classifier.py'), '--help'], budget_help_ms),
+            ('convert_data.py --help', [os.path.join(ROOT, 'convert_data.py'), '--help'], budget_help_ms),
+            ('app.py data (1 батч)', [os.path.join(ROOT, 'app.py'), 'data'], budget_predict_ms),
+        ]
+        failed = False
+        print(f"{'команда':<30}{'медиана, мс':>14}{'бюджет, мс':>13}")
+        for name, args, budget in cases:
+            elapsed = run_ms(args, workspace, repeat)
+            over = budget is not None and elapsed > budget
+            failed |= over
+            budget_text = '-' if budget is None else f'{budget:.0f}'
+            print(f"{name:<30}{elapsed:>14.1f}{budget_text:>13}{'  ПРЕВЫШЕН' if over else ''}")
+            if show_imports and args[0] != '-c':
+                for cumulative, module in slowest_imports(args, workspace):
+                    print(f"    {cumulative / 1000:8.1f} мс  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Время запуска CLI: --help и предсказание одного батча.")
+    parser.add_argument("--repeat", type=int, default=5, help="Число запусков на команду (берется медиана).")
+    parser.add_argument("--budget-help-ms", type=float, default=150.0, help="Бюджет для `<cli> --help`, мс.")
+    parser.add_argument("--budget-predict-ms", type=float, default=600.0,
+                        help="Бюджет для `app.py data` на одном батче, мс.")
+    parser.add_argument("--imports", action="store_true", help="Показать самые дорогие импорты каждой команды.")
+    args = parser.parse_args()
+    sys.exit(main(args.repeat, args.budget_help_ms, args.budget_predict_ms, args.imports))
@@ -0,0 +1,252 @@
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Стадии в порядке пайплайна: каждая следующая использует артефакты предыдущих
+# (save создает data/ и resources/, train — модели, predict и score — предсказывают ими)
+STAGES = ['load', 'parse', 'extract', 'save', 'train', 'predict', 'score']
+CSV_NAME = 'resumes.csv'
+DATA_DIR = 'data'
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """Пиковый RSS процесса и самого большого из завершенных дочерних процессов, МБ (None вне Unix)."""
+    try:
+        import resource
+    except ImportError:
+        return {'peak_rss_mb': None, 'peak_child_rss_mb': None}
+    # ru_maxrss: в килобайтах на Linux, в байтах на macOS
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+            'peak_child_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit}
+
+
+def make_stopwatch():
+    """
+    Обработчик-секундомер: встраивается в цепочку перед замеряемой стадией и считает
+    время всех следующих обработчиков (включая close) и число прошедших строк.
+    """
+    from src.base import Handler
+
+    class Stopwatch(Handler):
+        def __init__(self):
+            self.seconds, self.rows = 0.0, 0
+
+        def handle(self, data):
+            self.rows += data['x'].shape[0] if isinstance(data, dict) else len(data)
+            start = time.perf_counter()
+            try:
+                return super().handle(data)
+            finally:
+                self.seconds += time.perf_counter() - start
+
+        def close(self) -> None:
+            start = time.perf_counter()
+            super().close()
+            self.seconds += time.perf_counter() - start
+
+    return Stopwatch()
+
+
+def make_column_parser():
+    """Стадия parse: векторные парсеры utils/column_parsers.py и фильтр IT по всем колонкам чанка."""
+    from src.base import Handler
+    from utils.column_parsers import (is_it_developer_column, parse_age_column, parse_city_column,
+                                      parse_experience_column, parse_male_column, parse_salary_column)
+    from utils.helpers import find_column_name
+
+    class ColumnParser(Handler):
+        def handle(self, df):
+            gender_age = df[find_column_name(df, 'Пол, возраст')]
+            parse_salary_column(df[find_column_name(df, 'ЗП')])
+            parse_age_column(gender_age)
+            parse_male_column(gender_age)
+            parse_experience_column(df[find_column_name(df, 'Опыт')])
+            parse_city_column(df[find_column_name(df, 'Город')])
+            return super().handle(is_it_developer_column(df[find_column_name(df, 'Ищет работу')]))
+
+    return ColumnParser()
+
+
+def run_stage(stage: str, chunksize: int, workers: int) -> dict:
+    """
+    Выполняет одну стадию в текущей директории (рабочее пространство замера).
+
+    Returns:
+        {'rows': строк на входе стадии, 'seconds': время стадии без загрузки CSV}.
+    """
+    from src.loaders import DataLoaderHandler
+    from src.output import NpySaveHandler
+    from src.transformation import FeatureExtractionHandler, TransformerFitHandler
+
+    loader = DataLoaderHandler(chunksize=chunksize)
+    stopwatch = make_stopwatch()
+    if stage in ('load', 'parse', 'extract', 'save'):
+        fit_seconds, fitted = 0.0, (None, None)
+        if stage in ('extract', 'save') and chunksize:
+            # Потоковое обучение: трансформеры обучаются отдельным проходом по всему файлу
+            fitter = TransformerFitHandler(n_jobs=workers)
+            fit_loader = DataLoaderHandler(chunksize=chunksize)
+            fit_loader.set_next(fitter)
+            start = time.perf_counter()
+            fit_loader.handle(CSV_NAME)
+            fit_seconds, fitted = time.perf_counter() - start, fitter.transformers
+        extractor = FeatureExtractionHandler(is_training=True, n_jobs=workers, vectorizer=fitted[0], scaler=fitted[1])
+        if stage == 'load':
+            loader.set_next(stopwatch)
+        elif stage == 'parse':
+            loader.set_next(stopwatch).set_next(make_column_parser())
+        elif stage == 'extract':
+            loader.set_next(stopwatch).set_next(extractor)
+        else:
+            loader.set_next(extractor).set_next(stopwatch).set_next(NpySaveHandler(output_dir=DATA_DIR, partial=True))
+        start = time.perf_counter()
+        loader.handle(CSV_NAME)
+        # Для load замеряется весь проход по файлу, для остальных — только их часть цепочки
+        # (extract — вместе с проходом обучения трансформеров)
+        seconds = time.perf_counter() - start if stage == 'load' else stopwatch.seconds
+        if stage == 'extract':
+            seconds += fit_seconds
+        return {'rows': stopwatch.rows, 'seconds': seconds}
+
+    from utils.dataset_io import read_manifest
+    start = time.perf_counter()
+    if stage == 'train':
+        import train_classifier
+        train_classifier.main(plot=False)
+        rows = read_manifest(DATA_DIR)['rows']
+    elif stage == 'predict':
+        import app
+        rows = len(app.predict_levels(DATA_DIR))
+    else:
+        import predict
+        predict.predict_pipeline(CSV_NAME, 'predictions.csv', chunksize, workers)
+        rows = None
+    return {'rows': rows, 'seconds': time.perf_counter() - start}
+
+
+def measure(stage: str, workspace: str, chunksize: int, workers: int, input_rows: int) -> dict:
+    """
+    Запускает стадию в отдельном процессе: пиковый RSS не накапливается между стадиями. Процесс стартует
+    как модуль из корня репозитория и сам переходит в workspace.
+    """
+    result = subprocess.run([sys.executable, '-m', 'benchmarks.stages', '--run-stage', stage, '--workspace', workspace,
+                             '--chunksize', str(chunksize), '--workers', str(workers)],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Стадия {stage} завершилась с ошибкой:\n{result.stderr[-2000:]}")
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    stats['rows'] = stats['rows'] if stats['rows'] is not None else input_rows
+    stats['rows_per_s'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else None
+    return stats
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> Dict[str, Dict[str, tuple]]:
+    """
+    Отклонения от базовой линии: (изменение rows/s, изменение пикового RSS) в долях
+    и признак регрессии (скорость упала или память выросла больше чем на tolerance).
+    """
+    deltas = {}
+    for size, stages in current['results'].items():
+        for stage, stats in stages.items():
+            base = baseline.get('results', {}).get(size, {}).get(stage)
+            if base is None or not base.get('rows_per_s') or not stats.get('rows_per_s'):
+                continue
+            speed = stats['rows_per_s'] / base['rows_per_s'] - 1
+            memory = (stats['peak_rss_mb'] / base['peak_rss_mb'] - 1) if base.get('peak_rss_mb') else 0.0
+            deltas.setdefault(size, {})[stage] = (speed, memory, speed < -tolerance or memory > tolerance)
+    return deltas
+
+
+def main(sizes: List[int], stages: List[str], encoding: str, sep: str, seed: int, chunksize: int, workers: int,
+         baseline_path: Optional[str], save_path: Optional[str], tolerance: float) -> int:
+    from benchmarks.synthetic import write_resumes_csv
+
+    report = {
+        'meta': {'created': datetime.datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                 'platform': platform.platform(), 'cpu_count': os.cpu_count(), 'encoding': encoding, 'sep': sep,
+                 'seed': seed, 'chunksize': chunksize, 'workers': workers},
+        'results': {},
+    }
+    baseline = None
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        changed = [k for k in ('encoding', 'sep', 'chunksize', 'workers', 'cpu_count')
+                   if baseline['meta'].get(k) != report['meta'][k]]
+        if changed:
+            print(f"Внимание: параметры замера отличаются от базовой линии: {', '.join(changed)}")
+
+    print(f"{'строк':>10}  {'стадия':<8}{'вход, строк':>13}{'время, с':>11}{'строк/с':>12}{'пик RSS, МБ':>13}")
+    for size in sizes:
+        results = report['results'][str(size)] = {}
+        with tempfile.TemporaryDirectory() as workspace:
+            write_resumes_csv(os.path.join(workspace, CSV_NAME), size, encoding, sep, seed)
+            for stage in stages:
+                stats = results[stage] = measure(stage, workspace, chunksize, workers, size)
+                rss = '-' if stats['peak_rss_mb'] is None else f"{stats['peak_rss_mb']:.0f}"
+                print(f"{size:>10}  {stage:<8}{stats['rows']:>13}{stats['seconds']:>11.2f}"
+                      f"{stats['rows_per_s'] or 0:>12.0f}{rss:>13}")
+
+    failed = False
+    if baseline is not None:
+        print(f"\nСравнение с {baseline_path} (допуск {tolerance:.0%}):")
+        for size, stages_delta in compare(report, baseline, tolerance).items():
+            for stage, (speed, memory, regressed) in stages_delta.items():
+                failed |= regressed
+                print(f"{size:>10}  {stage:<8} строк/с {speed:+7.1%}  пик RSS {memory:+7.1%}"
+                      f"{'  РЕГРЕССИЯ' if regressed else ''}")
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nРезультаты сохранены в '{save_path}'.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Замеры стадий пайплайна (строк/с, пиковый RSS) на синтетических резюме HeadHunter."
+    )
+    parser.add_argument("--rows", type=int, nargs='+', default=[10000, 100000],
+                        help="Размеры синтетического CSV, строк (например, 10000 1000000 10000000).")
+    parser.add_argument("--stages", nargs='+', choices=STAGES, default=STAGES,
+                        help="Стадии для замера. train требует save, predict и score — train.")
+    parser.add_argument("--encoding", default="utf-8", choices=["utf-8", "cp1251"], help="Кодировка CSV.")
+    parser.add_argument("--sep", default=",", help="Разделитель CSV (например, ';' или '\\t').")
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора данных.")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Размер чанка потоковых стадий, строк.")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов для extract, save и score.")
+    parser.add_argument("--baseline", default=None, help="JSON базовой линии для сравнения.")
+    parser.add_argument("--save", default=None, help="Сохранить результаты в JSON (новая базовая линия).")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Допустимое падение строк/с и рост пикового RSS (доля), иначе код выхода 1.")
+    parser.add_argument("--run-stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--workspace", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        # Дочерний процесс одной стадии: вывод хендлеров уходит в stderr (показывается при ошибке),
+        # в stdout — только JSON с результатом
+        os.chdir(args.workspace)
+        with contextlib.redirect_stdout(sys.stderr):
+            stats = run_stage(args.run_stage, args.chunksize, args.workers)
+        print(json.dumps({**stats, **peak_rss_mb()}))
+        sys.exit(0)
+
+    try:
+        sys.exit(main(args.rows, [s for s in STAGES if s in args.stages], args.encoding,
+                      args.sep.encode().decode('unicode_escape'), args.seed, args.chunksize, args.workers,
+                      args.baseline, args.save, args.tolerance))
+    except (FileNotFoundError, RuntimeError) as err:
+        print(f"Ошибка: {err}")
+        sys.exit(1)
@@ -0,0 +1,144 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.salary_parser import RATES
+
+# Колонки выгрузки HeadHunter в исходном порядке (первая — безымянный номер строки)
+COLUMNS = ['', 'Пол, возраст', 'ЗП', 'Ищет работу на должность:', 'Город', 'Занятость', 'График',
+           'Опыт (двойное нажатие для полной версии)', 'Последенее/нынешнее место работы',
+           'Последеняя/нынешняя должность', 'Образование и ВУЗ', 'Обновление резюме', 'Авто']
+# Файл генерируется блоками: память не зависит от числа строк, у каждого блока
+# свой генератор (seed, номер блока)
+BLOCK_ROWS = 100000
+
+IT_ROLES = ['Python-разработчик', 'Java developer', 'Программист 1С', 'Frontend-разработчик', 'Backend developer',
+            'Инженер-программист', 'QA engineer', 'Тестировщик ПО', 'DevOps-инженер', 'Data Scientist',
+            'Fullstack-разработчик', 'PHP-программист', 'Разработчик C++', 'JavaScript developer']
+LEVEL_PREFIXES = ['', '', '', 'Senior ', 'Junior ', 'Ведущий ', 'Младший ', 'Lead ', 'Стажер ', 'Главный ']
+OTHER_ROLES = ['Менеджер по продажам', 'Бухгалтер', 'Водитель', 'Администратор', 'Продавец-консультант',
+               'Юрист', 'Системный администратор', 'Кладовщик', 'Менеджер проектов', 'Экономист', 'Оператор call-центра']
+CITIES = ['Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 'Казань', 'Нижний Новгород', 'Самара',
+          'Краснодар', 'Алматы', 'Минск', 'Киев', 'Советск']
+CITY_WEIGHTS = [0.35, 0.15, 0.06, 0.06, 0.05, 0.05, 0.04, 0.04, 0.06, 0.05, 0.05, 0.04]
+RELOCATION = ['готов к переезду', 'не готов к переезду', 'хочу переехать (Москва)']
+TRIPS = ['готов к командировкам', 'не готов к командировкам', 'готов к редким командировкам']
+EMPLOYMENT = ['полная занятость', 'частичная занятость, полная занятость', 'проектная работа', 'стажировка']
+SCHEDULE = ['полный день', 'гибкий график, полный день', 'удаленная работа', 'сменный график']
+COMPANIES = ['ООО "Ромашка"', 'ПАО Сбербанк', 'Яндекс', 'ИП Иванов', 'АО "Тинькофф Банк"', 'МАОУ "СОШ № 1"']
+EDUCATION = ['Высшее образование 2012 МГУ', 'Неоконченное высшее образование 2020 СПбГУ',
+             'Среднее специальное образование 2008 Колледж', 'Высшее образование (Бакалавр) 2017 МФТИ']
+AUTO = ['Не указано', 'Имеется собственный автомобиль']
+MONTHS = ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня', 'июля', 'августа', 'сентября', 'октября',
+          'ноября', 'декабря']
+STARTS = ['Январь', 'Март', 'Июнь', 'Сентябрь', 'Ноябрь']
+# Валюта ЗП и ее курс: рубли и все валюты из RATES; сумма в валюте — рублевая сумма по курсу
+CURRENCY_RATES = {'руб.': 1.0, **RATES, 'грн.': RATES['ГРН']}
+CURRENCY_WEIGHTS = [0.8] + [0.16 / len(RATES)] * len(RATES) + [0.04]
+
+
+def _plural(n: np.ndarray, forms: tuple) -> np.ndarray:
+    """Русская форма слова для числа: (1 год, 2 года, 5 лет)."""
+    n10, n100 = n % 10, n % 100
+    one = (n10 == 1) & (n100 != 11)
+    few = (n10 >= 2) & (n10 <= 4) & ((n100 < 12) | (n100 > 14))
+    return np.select([one, few], forms[:2], default=forms[2])
+
+
+def _num(values: np.ndarray) -> pd.Series:
+    return pd.Series(values).astype(str)
+
+
+def _missing(col: pd.Series, rng: np.random.Generator, share: float) -> pd.Series:
+    return col.mask(rng.random(len(col)) < share)
+
+
+def generate_resumes(n_rows: int, seed: int = 0, block: int = 0) -> pd.DataFrame:
+    """
+    Генерирует блок синтетических резюме в формате выгрузки HeadHunter (все значения — строки).
+
+    Значения покрывают все ветки парсеров: склонения возраста и опыта, валюты из RATES,
+    даты вместо стажа («Опыт работы 2019 год»), «Не указано», пропуски, IT- и не-IT должности
+    с ключевыми словами уровней. Результат детерминирован по (n_rows, seed, block).
+    """
+    rng = np.random.default_rng([seed, block])
+    n = n_rows
+
+    age = rng.integers(18, 66, n)
+    female = rng.random(n) < 0.35
+    gender_age = (pd.Series(np.where(female, 'Женщина', 'Мужчина')) + ' ,  ' + _num(age) + ' '
+                  + _plural(age, ('год', 'года', 'лет')) + np.where(female, ' , родилась ', ' , родился ')
+                  + _num(rng.integers(1, 29, n)) + ' ' + rng.choice(MONTHS, n) + ' ' + _num(2019 - age))
+    # Часть резюме без возраста: парсер подставляет значение по умолчанию
+    gender_age = gender_age.mask(rng.random(n) < 0.05, pd.Series(np.where(female, 'Женщина', 'Мужчина')))
+
+    currency = rng.choice(len(CURRENCY_RATES), n, p=CURRENCY_WEIGHTS)
+    rub = np.round(rng.lognormal(11.0, 0.5, n), -3)
+    amount = np.maximum(rub / np.array(list(CURRENCY_RATES.values()))[currency], 1).astype(np.int64)
+    salary = _num(amount) + ' ' + np.array(list(CURRENCY_RATES))[currency]
+
+    is_it = rng.random(n) < 0.45
+    it_title = pd.Series(rng.choice(LEVEL_PREFIXES, n)) + rng.choice(IT_ROLES, n)
+    position = it_title.where(is_it, pd.Series(rng.choice(OTHER_ROLES, n)))
+    last_position = (pd.Series(rng.choice(LEVEL_PREFIXES, n)) + rng.choice(IT_ROLES, n)).where(
+        is_it & (rng.random(n) < 0.7), pd.Series(rng.choice(OTHER_ROLES, n)))
+
+    city = (pd.Series(rng.choice(CITIES, n, p=CITY_WEIGHTS)) + ' , ' + rng.choice(RELOCATION, n) + ' , '
+            + rng.choice(TRIPS, n))
+
+    years, months = rng.integers(0, 25, n), rng.integers(0, 12, n)
+    # Как на HH, нулевые годы и месяцы не пишутся: «Опыт работы 8 месяцев», «Опыт работы 3 года»
+    years_text = (_num(years) + ' ' + _plural(years, ('год', 'года', 'лет')) + ' ').where(years > 0, '')
+    months_text = (_num(months) + ' ' + _plural(months, ('месяц', 'месяца', 'месяцев'))).where(
+        (months > 0) | (years == 0), '')
+    experience = ('Опыт работы ' + years_text + months_text + '  ' + rng.choice(STARTS, n) + ' ' + _num(2019 - years) + ' — по настоящее время')
+    special = rng.random(n)
+    experience = experience.mask(special < 0.03, 'Не указано')
+    experience = experience.mask((special >= 0.03) & (special < 0.05), 'Опыт работы ' + _num(2019 - years) + ' год')
+
+    updated = (_num(rng.integers(10, 29, n)) + '.0' + _num(rng.integers(1, 10, n)) + '.2019 '
+               + _num(rng.integers(10, 24, n)) + ':' + _num(rng.integers(10, 60, n)))
+
+    return pd.DataFrame(dict(zip(COLUMNS[1:], [
+        _missing(gender_age, rng, 0.02),
+        _missing(salary, rng, 0.03),
+        _missing(position, rng, 0.01),
+        _missing(city, rng, 0.01),
+        pd.Series(rng.choice(EMPLOYMENT, n)),
+        pd.Series(rng.choice(SCHEDULE, n)),
+        _missing(experience, rng, 0.02),
+        _missing(pd.Series(rng.choice(COMPANIES, n)), rng, 0.1),
+        _missing(last_position, rng, 0.15),
+        pd.Series(rng.choice(EDUCATION, n)),
+        updated,
+        pd.Series(rng.choice(AUTO, n)),
+    ])))
+
+
+def write_resumes_csv(path: str, n_rows: int, encoding: str = 'utf-8', sep: str = ',', seed: int = 0) -> None:
+    """
+    Пишет n_rows синтетических резюме в CSV блоками по BLOCK_ROWS строк: память не зависит
+    от размера файла (в том числе для 10M строк). Содержимое зависит только от n_rows и seed.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        for block, start in enumerate(range(0, n_rows, BLOCK_ROWS)):
+            df = generate_resumes(min(BLOCK_ROWS, n_rows - start), seed, block)
+            df.insert(0, COLUMNS[0], np.arange(start, start + len(df)))
+            df.to_csv(f, sep=sep, index=False, header=block == 0, lineterminator='\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генератор синтетических резюме HeadHunter (CSV).")
+    parser.add_argument("path", help="Путь к создаваемому CSV-файлу.")
+    parser.add_argument("--rows", type=int, default=100000, help="Число строк.")
+    parser.add_argument("--encoding", default="utf-8", choices=["utf-8", "cp1251"], help="Кодировка файла.")
+    parser.add_argument("--sep", default=",", help="Разделитель колонок (например, ';' или '\\t').")
+    parser.add_argument("--seed", type=int, default=0, help="Seed генератора: одинаковый seed дает одинаковый файл.")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    write_resumes_csv(args.path, args.rows, args.encoding, args.sep.encode().decode('unicode_escape'), args.seed)
+    print(f"Записано строк: {args.rows} в '{args.path}' за {time.perf_counter() - started:.1f} с")
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+def convert_pipeline(csv_path: str, out_path: str, chunksize: int = 100000) -> None:
+    """
+    Однократно переводит CSV-выгрузку резюме в колоночный формат: Parquet (сжатый, row group на чанк)
+    или Arrow IPC (по расширению out_path). Дальше parse_data.py и predict.py читают из него
+    только нужные колонки, без разбора CSV.
+
+    Args:
+        csv_path (str): Путь к исходному CSV-файлу резюме.
+        out_path (str): Путь к выходному файлу (.parquet или .arrow).
+        chunksize (int): Размер чанка (и row group), строк.
+    """
+    from src.loaders import DataLoaderHandler
+    from utils.columnar import convert_csv
+
+    if not os.path.exists(csv_path):
+        print(f"Ошибка: CSV-файл '{csv_path}' не найден.")
+        sys.exit(1)
+    try:
+        # Кодировка и разделитель определяются так же, как при загрузке CSV в пайплайне
+        encoding, sep = DataLoaderHandler().sniff_format(csv_path)
+        rows = convert_csv(csv_path, out_path, encoding, sep, chunksize)
+    except Exception as e:
+        print(f"Ошибка конвертации: {e}")
+        sys.exit(1)
+    print(f"Записано строк: {rows} в '{out_path}' ({os.path.getsize(out_path) / 2 ** 20:.1f} МБ).")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="HH Developer Level Predictor: конвертация CSV-выгрузки в Parquet/Arrow IPC."
+    )
+    parser.add_argument("csv_path", help="Путь к исходному CSV-файлу резюме HeadHunter.")
+    parser.add_argument("-o", "--output", required=True, help="Выходной файл: .parquet или .arrow.")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Размер чанка и row group, строк.")
+    args = parser.parse_args()
+    from utils.columnar import columnar_format
+    if columnar_format(args.output) is None:
+        parser.error("--output должен оканчиваться на .parquet или .arrow.")
+    convert_pipeline(args.csv_path, args.output, args.chunksize)
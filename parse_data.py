@@ -1,51 +1,234 @@
 import argparse
 import os
 import sys
-
-from src.loaders import DataLoaderHandler
-from src.output import NpySaveHandler
-from src.transformation import FeatureExtractionHandler
+from dataclasses import dataclass, field
+from typing import List, Optional
 
 DATA_DIR = 'data'
 
-def parse_data_pipeline(csv_path: str) -> None:
+@dataclass
+class ParseOptions:
+    """
+    Параметры пайплайна парсинга.
+
+    Attributes:
+        chunksize (Optional[int]): Размер чанка для потоковой обработки. None — файл целиком.
+        dense (bool): Сохранить плотную матрицу вместо разреженной (CSR).
+        append (bool): Дописать новый батч к существующему датасету без перезаписи.
+        workers (int): Число процессов для извлечения признаков (-1 — все ядра).
+        hashing (bool): Векторизовать текст HashingVectorizer вместо TF-IDF.
+        metrics_dir (Optional[str]): Директория для метрик стадий (JSON-лог, Prometheus, профили).
+        profile (List[str]): Стадии для профилирования: 'Имя' (cProfile) или 'Имя:sample'.
+        incremental (bool): Обработать только новые и измененные строки CSV относительно прошлого прогона
+                            (индекс data/row_index.npz), удалить из датасета исчезнувшие. Без действующего
+                            индекса датасет собирается полностью.
+        output (str): Директория хранилища датасета или файл .parquet/.arrow (признаки, y и номера строк).
+        dedup_threshold (Optional[float]): Удалить точные дубликаты резюме и почти дубликаты с похожестью
+                                           текста записи не ниже порога (1.0 — только точные). None — без удаления.
     """
-    Запускает пайплайн обработки CSV-файла: загрузка -> трансформация -> сохранение .npy.
+    chunksize: Optional[int] = None
+    dense: bool = False
+    append: bool = False
+    workers: int = 1
+    hashing: bool = False
+    metrics_dir: Optional[str] = None
+    profile: List[str] = field(default_factory=list)
+    incremental: bool = False
+    output: str = DATA_DIR
+    dedup_threshold: Optional[float] = None
 
-    Скрипт читает CSV, извлекает признаки, фильтрует IT-разработчиков,
+def parse_data_pipeline(csv_path: str, options: Optional[ParseOptions] = None) -> None:
+    """
+    Запускает пайплайн обработки CSV-файла: загрузка -> трансформация -> сохранение датасета.
+
+    Скрипт читает CSV (или .parquet/.arrow), извлекает признаки, фильтрует IT-разработчиков,
     формирует целевую переменную (уровень), масштабирует числовые признаки,
-    векторизует текст и сохраняет результат в .npy файлы.
+    векторизует текст и сохраняет результат в хранилище датасета (data/manifest.json + .npy)
+    или в таблицу признаков Parquet/Arrow IPC.
 
     Args:
-        csv_path (str): Путь к исходному CSV-файлу резюме.
+        csv_path (str): Путь к исходному CSV-файлу резюме (или его копии в .parquet/.arrow).
+        options (Optional[ParseOptions]): Параметры пайплайна. None — значения по умолчанию.
     """
+    # Хендлеры тянут pandas/scipy — импортируются после разбора аргументов
+    from src.instrumentation import instrumented
+
+    options = options or ParseOptions()
     print(f"\n--- Запуск пайплайна парсинга данных из '{os.path.basename(csv_path)}' ---")
 
     if not os.path.exists(csv_path):
         print(f"Ошибка: CSV-файл '{csv_path}' не найден.")
         sys.exit(1)
 
-    loader = DataLoaderHandler()
-    # is_training=True обучает и сохраняет трансформеры в resources/
-    transformer = FeatureExtractionHandler(is_training=True)
-    saver = NpySaveHandler(output_dir=DATA_DIR)
-
-    loader.set_next(transformer).set_next(saver)
-
     try:
-        loader.handle(csv_path)
-        print(f"Парсинг успешно завершен. Данные сохранены в '{DATA_DIR}'.")
+        # Оба прохода потокового режима (обучение трансформеров и извлечение признаков) попадают в метрики
+        with instrumented(options.metrics_dir, options.profile):
+            _build_chain(csv_path, options).handle(csv_path)
+        print(f"Парсинг успешно завершен. Данные сохранены в '{options.output}'.")
     except Exception as e:
         print(f"Ошибка во время парсинга: {e}")
         sys.exit(1)
 
+def _build_chain(csv_path: str, options: ParseOptions):
+    """Цепочка хендлеров прогона: загрузка -> [индекс строк | дедупликация] -> признаки -> сохранение."""
+    from src.dedup import DedupHandler
+    from src.incremental import DatasetRowsHandler, RowFingerprintHandler
+    from src.loaders import DataLoaderHandler
+    from src.transformation import FeatureExtractionHandler
+    from utils.row_index import RowIndex
+
+    # Читаются только колонки, из которых строятся признаки
+    loader = DataLoaderHandler(chunksize=options.chunksize, columns=FeatureExtractionHandler.REQUIRED_COLUMNS)
+    row_index = _load_row_index(options.dense) if options.incremental else None
+    if row_index is not None:
+        transformer = _incremental_transformer(options)
+        saver = _make_saver(options, append=True)
+    else:
+        transformer = _training_transformer(csv_path, options)
+        saver = _make_saver(options, append=options.append)
+        if options.incremental:
+            print("Индекс прошлого прогона не найден или не совпадает с датасетом — полная сборка.")
+            row_index = RowIndex(DATA_DIR)
+
+    if row_index is not None:
+        loader.set_next(RowFingerprintHandler(row_index)).set_next(transformer) \
+            .set_next(DatasetRowsHandler(row_index)).set_next(saver)
+    elif options.dedup_threshold is not None:
+        # Дубликаты удаляются до извлечения признаков: меньше работы и нет одинаковых резюме в train и test
+        loader.set_next(DedupHandler(options.dedup_threshold)).set_next(transformer).set_next(saver)
+    else:
+        loader.set_next(transformer).set_next(saver)
+    return loader
+
+def _incremental_transformer(options: ParseOptions):
+    """Признаки новых строк строятся теми же трансформерами, что и у строк датасета: без переобучения."""
+    from src.transformation import FeatureExtractionHandler
+    from utils.transformer_utils import load_transformer
+
+    res_dir = FeatureExtractionHandler.RES_DIR
+    return FeatureExtractionHandler(is_training=True, sparse=not options.dense, n_jobs=options.workers,
+                                    vectorizer=load_transformer(os.path.join(res_dir, "vectorizer.pkl")),
+                                    scaler=load_transformer(os.path.join(res_dir, "scaler.pkl")))
+
+def _training_transformer(csv_path: str, options: ParseOptions):
+    """
+    Хендлер признаков полного прогона: is_training=True обучает и сохраняет трансформеры в resources/.
+    В потоковом режиме они обучаются заранее отдельным проходом по всему файлу.
+    """
+    from src.transformation import FeatureExtractionHandler
+
+    vectorizer, scaler = _fit_transformers(csv_path, options) if options.chunksize is not None else (None, None)
+    return FeatureExtractionHandler(is_training=True, sparse=not options.dense, n_jobs=options.workers,
+                                    hashing=options.hashing, vectorizer=vectorizer, scaler=scaler)
+
+def _make_saver(options: ParseOptions, append: bool):
+    """Хранилище .npy или таблица Parquet/Arrow по options.output."""
+    from src.output import ColumnarSaveHandler, NpySaveHandler
+    from utils.columnar import columnar_format
+
+    if columnar_format(options.output) is not None:
+        return ColumnarSaveHandler(options.output)
+    # В потоковом режиме сохранение идет по чанкам, пиковая память зависит от chunksize
+    return NpySaveHandler(output_dir=options.output, partial=options.chunksize is not None, append=append)
+
+def _fit_transformers(csv_path: str, options: ParseOptions) -> tuple:
+    """
+    Первый проход потокового режима: обучает векторайзер и скалер на всех строках файла
+    (те же строки, что пойдут в датасет), чтобы артефакты не зависели от chunksize.
+    """
+    from src.dedup import DedupHandler
+    from src.loaders import DataLoaderHandler
+    from src.transformation import FeatureExtractionHandler, TransformerFitHandler
+
+    print("Проход 1: обучение трансформеров на всем файле")
+    loader = DataLoaderHandler(chunksize=options.chunksize, columns=FeatureExtractionHandler.REQUIRED_COLUMNS)
+    fitter = TransformerFitHandler(n_jobs=options.workers, hashing=options.hashing)
+    if options.dedup_threshold is not None:
+        loader.set_next(DedupHandler(options.dedup_threshold)).set_next(fitter)
+    else:
+        loader.set_next(fitter)
+    loader.handle(csv_path)
+    print("Проход 2: извлечение признаков")
+    return fitter.transformers
+
+def _load_row_index(dense: bool):
+    """Индекс прошлого прогона, если он согласован с датасетом, текущими трансформерами и форматом."""
+    from src.transformation import FeatureExtractionHandler
+    from utils.row_index import RowIndex
+    from utils.transformer_utils import artifacts_hash
+
+    paths = [os.path.join(FeatureExtractionHandler.RES_DIR, name) for name in ("vectorizer.pkl", "scaler.pkl")]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+    return RowIndex.load(DATA_DIR, artifacts_hash(paths), 'dense' if dense else 'csr')
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="HH Developer Level Predictor: Обработка CSV в формат .npy."
+        description="HH Developer Level Predictor: Обработка CSV в датасет (.npy + manifest.json)."
     )
     parser.add_argument(
         "csv_path",
-        help="Путь к исходному CSV-файлу резюме HeadHunter."
+        help="Путь к исходному CSV-файлу резюме HeadHunter (или к его копии .parquet/.arrow, см. convert_data.py)."
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=None,
+        help="Потоковая обработка чанками по указанному числу строк."
+    )
+    parser.add_argument(
+        "--dense", action="store_true",
+        help="Сохранить плотную матрицу признаков вместо разреженной (CSR)."
+    )
+    parser.add_argument(
+        "--append", action="store_true",
+        help="Дописать результат к существующему датасету в data/ без перезаписи."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Число процессов для извлечения признаков (-1 — все ядра). Результат не зависит от числа процессов."
+    )
+    parser.add_argument(
+        "--hashing", action="store_true",
+        help="HashingVectorizer вместо TF-IDF: без словаря и обучения (для train_classifier.py --incremental)."
+    )
+    parser.add_argument(
+        "--metrics", default=None, metavar="DIR",
+        help="Собрать метрики стадий: время, CPU, память, строки и байты (DIR/metrics.jsonl, DIR/metrics.prom)."
+    )
+    parser.add_argument(
+        "--profile", action="append", default=[], metavar="HANDLER[:sample]",
+        help="Профилировать стадию cProfile (или семплированием стека с ':sample'), например "
+             "FeatureExtractionHandler. Можно повторять; профили пишутся в --metrics (по умолчанию metrics/)."
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Обработать только новые и измененные строки относительно прошлого прогона (data/row_index.npz); "
+             "исчезнувшие из CSV строки удаляются из датасета."
+    )
+    parser.add_argument(
+        "--output", default=DATA_DIR, metavar="PATH",
+        help="Куда сохранить датасет: директория хранилища .npy (по умолчанию data) или файл .parquet/.arrow "
+             "с признаками, уровнем и номерами строк (Arrow IPC открывается через memory-mapping)."
+    )
+    parser.add_argument(
+        "--dedup", action="store_true",
+        help="Удалить дубликаты резюме до извлечения признаков: точные (по нормализованным полям) и почти дубликаты "
+             "из того же города с похожим текстом записи (MinHash/LSH). С --append дубликаты ищутся "
+             "только внутри нового батча."
+    )
+    parser.add_argument(
+        "--dedup-threshold", type=float, default=0.9,
+        help="Порог похожести (Жаккар) текста записи для почти дубликатов; 1.0 — только точные дубликаты."
     )
     args = parser.parse_args()
-    parse_data_pipeline(args.csv_path)
\ No newline at end of file
+    if not 0 < args.dedup_threshold <= 1:
+        parser.error("--dedup-threshold должен быть в (0, 1].")
+    if args.dedup and args.incremental:
+        parser.error("--dedup и --incremental несовместимы: индекс инкрементального прогона ведет все строки CSV.")
+    if args.incremental and args.append:
+        parser.error("--incremental и --append несовместимы: инкрементальный прогон сам дописывает новые строки.")
+    if args.output != DATA_DIR and (args.incremental or args.append):
+        parser.error("--incremental и --append работают только с хранилищем data/.")
+    parse_data_pipeline(args.csv_path, ParseOptions(
+        chunksize=args.chunksize, dense=args.dense, append=args.append, workers=args.workers, hashing=args.hashing,
+        metrics_dir=args.metrics, profile=args.profile, incremental=args.incremental, output=args.output,
+        dedup_threshold=args.dedup_threshold if args.dedup else None))
\ No newline at end of file
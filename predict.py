@@ -0,0 +1,86 @@
+import argparse
+import functools
+import os
+import sys
+from typing import List, Optional
+
+from app import LEVEL_MAP, MODEL_PATH
+
+def predict_pipeline(csv_path: str, out_path: str, chunksize: int = 100000, workers: int = 1,
+                     id_column: Optional[str] = None, model_path: str = MODEL_PATH,
+                     metrics_dir: Optional[str] = None, profile: Optional[List[str]] = None,
+                     cache_dir: Optional[str] = None, cache_ttl_s: Optional[float] = None,
+                     cache_max_mb: Optional[float] = None) -> None:
+    """
+    Потоково оценивает сырую выгрузку резюме: CSV -> признаки -> модель -> CSV/Parquet с предсказаниями.
+
+    Трансформеры не переобучаются (is_training=False), целевые колонки не требуются,
+    промежуточные .npy не создаются. При workers > 1 чанки обрабатываются параллельно
+    в пуле процессов, а результаты пишутся в исходном порядке.
+
+    Args:
+        csv_path (str): Путь к исходному CSV-файлу резюме (или его копии в .parquet/.arrow).
+        out_path (str): Путь к файлу предсказаний (.csv или .parquet).
+        chunksize (int): Размер чанка, строк.
+        workers (int): Число процессов для извлечения признаков и предсказания.
+        id_column (Optional[str]): Колонка с идентификатором резюме (иначе — номер строки файла).
+        model_path (str): Путь к обученной модели.
+        metrics_dir (Optional[str]): Директория для метрик стадий (JSON-лог, Prometheus, профили).
+        profile (Optional[List[str]]): Стадии для профилирования: 'Имя' (cProfile) или 'Имя:sample'.
+        cache_dir (Optional[str]): Директория кэша предсказаний: резюме, уже оцененные текущими
+                                   артефактами, повторно не разбираются.
+        cache_ttl_s (Optional[float]): Время жизни записи кэша, с.
+        cache_max_mb (Optional[float]): Лимит размера кэша, МБ.
+    """
+    from src.instrumentation import instrumented
+    from src.loaders import DataLoaderHandler
+    from src.parallel import ProcessPoolHandler
+    from src.scoring import PredictionWriterHandler, build_scoring_chain
+    from src.transformation import FeatureExtractionHandler
+
+    print(f"\n--- Запуск пакетного предсказания для '{os.path.basename(csv_path)}' ---")
+
+    if not os.path.exists(model_path) and not os.path.exists(os.path.splitext(model_path)[0] + '.npz'):
+        print(f"Ошибка: Модель {model_path} не найдена. Обучите её через train_classifier.py")
+        sys.exit(1)
+
+    loader = DataLoaderHandler(chunksize=chunksize, index_col=id_column,
+                               columns=FeatureExtractionHandler.REQUIRED_COLUMNS)
+    writer = PredictionWriterHandler(out_path)
+    cache = {'cache_dir': cache_dir, 'cache_ttl_s': cache_ttl_s,
+             'cache_max_bytes': int(cache_max_mb * 2 ** 20) if cache_max_mb else None}
+    if workers > 1:
+        chain_factory = functools.partial(build_scoring_chain, model_path, LEVEL_MAP, **cache)
+        loader.set_next(ProcessPoolHandler(chain_factory, workers)).set_next(writer)
+    else:
+        loader.set_next(build_scoring_chain(model_path, LEVEL_MAP, next_handler=writer, **cache))
+
+    try:
+        with instrumented(metrics_dir, profile or ()):
+            loader.handle(csv_path)
+        print(f"Предсказания сохранены в '{out_path}'.")
+    except Exception as e:
+        print(f"Ошибка во время предсказания: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="HH Developer Level Predictor: пакетное предсказание уровней по сырому CSV."
+    )
+    parser.add_argument("csv_path", help="Путь к исходному CSV-файлу резюме HeadHunter (или к .parquet/.arrow).")
+    parser.add_argument("-o", "--output", default="predictions.csv", help="Файл предсказаний (.csv или .parquet).")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Размер чанка, строк.")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов.")
+    parser.add_argument("--id-column", default=None, help="Колонка с идентификатором резюме.")
+    parser.add_argument("--model", default=MODEL_PATH, help="Путь к обученной модели (.pkl).")
+    parser.add_argument("--metrics", default=None, metavar="DIR",
+                        help="Собрать метрики стадий (DIR/metrics.jsonl, DIR/metrics.prom).")
+    parser.add_argument("--profile", action="append", default=[], metavar="HANDLER[:sample]",
+                        help="Профилировать стадию cProfile (или семплированием с ':sample'). Можно повторять.")
+    parser.add_argument("--cache-dir", default=None, metavar="DIR",
+                        help="Кэш предсказаний: повторно встреченные резюме берутся из DIR/predictions.sqlite.")
+    parser.add_argument("--cache-ttl", type=float, default=None, metavar="SECONDS", help="Время жизни записи кэша.")
+    parser.add_argument("--cache-max-mb", type=float, default=None, help="Лимит размера кэша, МБ.")
+    args = parser.parse_args()
+    predict_pipeline(args.csv_path, args.output, args.chunksize, args.workers, args.id_column, args.model,
+                     args.metrics, args.profile, args.cache_dir, args.cache_ttl, args.cache_max_mb)
@@ -0,0 +1,171 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import LEVEL_MAP, MODEL_PATH
+from src import instrumentation
+from src.batcher import MicroBatcher
+from src.predictor import LevelPredictor
+from utils import parse_cache
+from utils.prediction_cache import PredictionCache
+
+class ServiceStats:
+    """Счетчики запросов и задержек сервиса (потокобезопасные)."""
+    def __init__(self, cache: PredictionCache = None):
+        self.cache = cache
+        self.started = time.time()
+        self.requests = self.errors = self.rows = 0
+        self.latency_total = self.latency_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, rows: int, latency: float, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.rows += rows
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def prometheus(self) -> str:
+        """Счетчики сервиса в текстовом формате Prometheus."""
+        stats = self.as_dict()
+        metrics = [
+            ('hh_uptime_seconds', 'gauge', 'Время работы сервиса, с.', stats['uptime_s']),
+            ('hh_requests_total', 'counter', 'Запросы POST /predict.', stats['requests']),
+            ('hh_request_errors_total', 'counter', 'Запросы, завершившиеся ошибкой.', stats['errors']),
+            ('hh_rows_total', 'counter', 'Записей резюме в запросах.', stats['rows']),
+            ('hh_request_latency_seconds_total', 'counter', 'Суммарная задержка запросов, с.', self.latency_total),
+            ('hh_request_latency_seconds_max', 'gauge', 'Максимальная задержка запроса, с.', self.latency_max),
+        ]
+        parsing = parse_cache.stats()
+        metrics += [
+            ('hh_parse_cache_hits_total', 'counter', 'Попадания в кэш скалярных парсеров.', parsing['cache']['hits']),
+            ('hh_parse_cache_misses_total', 'counter', 'Промахи кэша скалярных парсеров.', parsing['cache']['misses']),
+            ('hh_parse_cache_size', 'gauge', 'Записей в кэше скалярных парсеров.', parsing['cache']['size']),
+            ('hh_parse_unique_rows_total', 'counter', 'Строк в колонках векторного разбора.', parsing['uniques']['rows']),
+            ('hh_parse_unique_parsed_total', 'counter', 'Разобранных уникальных значений.', parsing['uniques']['parsed']),
+        ]
+        if self.cache is not None:
+            cache = self.cache.stats()
+            metrics += [
+                ('hh_prediction_cache_hits_total', 'counter', 'Попадания в кэш предсказаний (память и диск).',
+                 cache['hits_memory'] + cache['hits_disk']),
+                ('hh_prediction_cache_disk_hits_total', 'counter', 'Попадания в дисковый кэш предсказаний.',
+                 cache['hits_disk']),
+                ('hh_prediction_cache_misses_total', 'counter', 'Промахи кэша предсказаний.', cache['misses']),
+                ('hh_prediction_cache_size', 'gauge', 'Записей кэша предсказаний в памяти.', cache['size']),
+                ('hh_prediction_cache_evicted_total', 'counter', 'Записей, вытесненных с диска.', cache['evicted']),
+            ]
+        return ''.join(f'# HELP {name} {help_text}\n# TYPE {name} {kind}\n{name} {value}\n'
+                       for name, kind, help_text, value in metrics)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                'uptime_s': round(time.time() - self.started, 1),
+                'requests': self.requests, 'errors': self.errors, 'rows': self.rows,
+                'latency_ms_avg': round(1000 * self.latency_total / max(self.requests, 1), 3),
+                'latency_ms_max': round(1000 * self.latency_max, 3),
+            }
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """Многопоточный HTTP-сервер с увеличенной очередью соединений под конкурентную нагрузку."""
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def make_handler(predictor: LevelPredictor, stats: ServiceStats, batcher: MicroBatcher = None):
+    """Создает HTTP-обработчик, замкнутый на прогретый предиктор (и микро-батчер, если задан)."""
+    predict = batcher.predict if batcher is not None else predictor.predict_records
+
+    class PredictionRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                # Метрики стадий цепочки — если сервис запущен с --instrument
+                text = stats.prometheus() + (instrumentation.current.prometheus() if instrumentation.current else '')
+                return self._send(200, text.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+            if self.path != '/health':
+                return self._reply(404, {'error': 'not found'})
+            payload = {'status': 'ok', 'model': predictor.model_path, **stats.as_dict(), 'parsing': parse_cache.stats()}
+            if batcher is not None:
+                payload['batcher'] = batcher.stats()
+            if stats.cache is not None:
+                payload['prediction_cache'] = stats.cache.stats()
+            self._reply(200, payload)
+
+        def do_POST(self):
+            if self.path != '/predict':
+                return self._reply(404, {'error': 'not found'})
+            start, records = time.perf_counter(), []
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'[]')
+                records = body['records'] if isinstance(body, dict) else body
+                predictor.check_records(records)
+                predictions = predict(records)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                stats.record(len(records), time.perf_counter() - start, error=True)
+                return self._reply(400, {'error': str(e)})
+            stats.record(len(records), time.perf_counter() - start)
+            self._reply(200, {'predictions': predictions})
+
+        def _reply(self, status: int, payload: dict) -> None:
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json; charset=utf-8')
+
+        def _send(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # Логирование каждого запроса заметно увеличивает задержку
+
+    return PredictionRequestHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HH Developer Level Predictor: HTTP-сервис предсказаний")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес для прослушивания")
+    parser.add_argument("--port", type=int, default=8000, help="Порт для прослушивания")
+    parser.add_argument("--model", default=MODEL_PATH, help="Путь к обученной модели (.pkl)")
+    parser.add_argument("--batch-rows", type=int, default=64,
+                        help="Максимум записей в микро-батче (0 — без батчинга)")
+    parser.add_argument("--batch-wait-ms", type=float, default=5.0,
+                        help="Максимальное ожидание добора микро-батча, мс")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Записей в кэше предсказаний в памяти (0 — без кэша, если не задан --cache-dir)")
+    parser.add_argument("--cache-dir", default=None, metavar="DIR",
+                        help="Дисковый кэш предсказаний DIR/predictions.sqlite (общий для процессов и перезапусков)")
+    parser.add_argument("--cache-ttl", type=float, default=None, metavar="SECONDS", help="Время жизни записи кэша")
+    parser.add_argument("--cache-max-mb", type=float, default=None, help="Лимит размера дискового кэша, МБ")
+    parser.add_argument("--instrument", action="store_true",
+                        help="Собирать метрики стадий цепочки (время, CPU, память, строки) для GET /metrics")
+    args = parser.parse_args()
+
+    if args.instrument:
+        instrumentation.Instrumentation().install()
+    service_cache = None
+    if args.cache_size > 0 or args.cache_dir is not None:
+        service_cache = PredictionCache(args.cache_size, args.cache_dir, args.cache_ttl,
+                                        int(args.cache_max_mb * 2 ** 20) if args.cache_max_mb else None)
+    try:
+        service_predictor = LevelPredictor(args.model, LEVEL_MAP, cache=service_cache)
+    except FileNotFoundError as err:
+        print(f"Ошибка: {err}")
+        sys.exit(1)
+
+    service_batcher = None
+    if args.batch_rows > 0:
+        service_batcher = MicroBatcher(service_predictor.predict_records, args.batch_rows, args.batch_wait_ms).start()
+    handler = make_handler(service_predictor, ServiceStats(service_cache), service_batcher)
+    server = PredictionServer((args.host, args.port), handler)
+    print(f"[serve] Модель загружена, сервис слушает http://{args.host}:{args.port} (POST /predict, GET /health, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
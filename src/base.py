@@ -1,6 +1,19 @@
 from __future__ import annotations
+import functools
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+from . import instrumentation
+
+
+def _instrumented(method: Callable) -> Callable:
+    """Передает вызов активному сборщику метрик (src/instrumentation.py), если он установлен."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if instrumentation.current is None:
+            return method(self, *args, **kwargs)
+        return instrumentation.current.call(self, method, args, kwargs)
+    return wrapper
 
 class Handler(ABC):
     """
@@ -8,6 +21,17 @@ class Handler(ABC):
     Каждый конкретный обработчик должен реализовывать метод `handle`.
     """
     _next: Optional[Handler] = None
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Оборачивает handle и close каждого обработчика для сбора метрик по стадиям.
+        Пока сборщик не установлен, обертка — одна проверка на вызов.
+        """
+        super().__init_subclass__(**kwargs)
+        for name in ('handle', 'close'):
+            if name in cls.__dict__:
+                setattr(cls, name, _instrumented(cls.__dict__[name]))
+
     def set_next(self, handler: Handler) -> Handler:
         """
         Устанавливает следующий обработчик в цепочке.
@@ -33,5 +57,16 @@ class Handler(ABC):
             Если есть следующий обработчик, возвращается его результат.
         """
         if self._next:
+            if instrumentation.current is not None:
+                instrumentation.current.forward(self, data)
             return self._next.handle(data)
-        return data
\ No newline at end of file
+        return data
+
+    def close(self) -> None:
+        """
+        Сигнализирует об окончании потока данных (используется в потоковом режиме).
+        Обработчики, накапливающие состояние между чанками, переопределяют этот метод,
+        чтобы завершить запись, и вызывают super().close() для передачи сигнала дальше.
+        """
+        if self._next:
+            self._next.close()
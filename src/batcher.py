@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from collections import Counter
+from typing import Callable, List
+
+class MicroBatcher:
+    """
+    Микро-батчинг онлайн-запросов перед моделью.
+    Конкурентные запросы накапливаются в asyncio-очереди, пока в батче не наберется
+    max_rows записей или не истечет max_wait_ms с момента первого запроса; затем
+    весь батч обрабатывается одним векторным вызовом predict_fn, а результаты
+    раздаются вызывающим в исходном порядке.
+    """
+    def __init__(self, predict_fn: Callable[[List[dict]], List[dict]], max_rows: int = 64,
+                 max_wait_ms: float = 5.0):
+        """
+        Args:
+            predict_fn: Функция пакетного предсказания (список записей -> список результатов).
+            max_rows: Максимальное число записей в батче.
+            max_wait_ms: Максимальное ожидание добора батча, мс.
+        """
+        self.predict_fn = predict_fn
+        self.max_rows = max_rows
+        self.max_wait = max_wait_ms / 1000
+        self.loop = None
+        self._queue = None
+        self._lock = threading.Lock()
+        self._batches = self._rows = 0
+        self._histogram = Counter()
+
+    def start(self) -> 'MicroBatcher':
+        """Запускает цикл событий батчера в фоновом потоке."""
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self._queue = asyncio.Queue()
+            self.loop.create_task(self._collect())
+            ready.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=run, name='micro-batcher', daemon=True).start()
+        ready.wait()
+        return self
+
+    async def submit(self, records: List[dict]) -> List[dict]:
+        """Ставит записи в очередь и ожидает их результаты (вызывается из цикла батчера)."""
+        future = self.loop.create_future()
+        await self._queue.put((records, future))
+        return await future
+
+    def predict(self, records: List[dict]) -> List[dict]:
+        """Потокобезопасная обертка над submit для синхронного кода (потоков HTTP-сервера)."""
+        return asyncio.run_coroutine_threadsafe(self.submit(records), self.loop).result()
+
+    def stats(self) -> dict:
+        """Глубина очереди, число батчей/записей и гистограмма размеров батчей (корзины — степени двойки)."""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+                'batches': self._batches, 'rows': self._rows,
+                'batch_rows_histogram': {f'<={b}': n for b, n in sorted(self._histogram.items())},
+            }
+
+    async def _collect(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = self.loop.time() + self.max_wait
+            while rows < self.max_rows:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                rows += len(batch[-1][0])
+            # Пока батч считается в пуле потоков, новые запросы копятся в очереди для следующего
+            await self.loop.run_in_executor(None, self._run_batch, batch)
+            self._record(rows)
+
+    def _run_batch(self, batch: list) -> None:
+        try:
+            results = self.predict_fn([r for records, _ in batch for r in records])
+        except Exception:
+            # Ошибка одного запроса не должна ронять чужие — разбираем батч по запросам
+            for records, future in batch:
+                self._resolve(future, records)
+            return
+        offset = 0
+        for records, future in batch:
+            self.loop.call_soon_threadsafe(future.set_result, results[offset:offset + len(records)])
+            offset += len(records)
+
+    def _resolve(self, future: asyncio.Future, records: List[dict]) -> None:
+        try:
+            self.loop.call_soon_threadsafe(future.set_result, self.predict_fn(records))
+        except Exception as e:
+            self.loop.call_soon_threadsafe(future.set_exception, e)
+
+    def _record(self, rows: int) -> None:
+        bucket = 1
+        while bucket < rows:
+            bucket *= 2
+        with self._lock:
+            self._batches += 1
+            self._rows += rows
+            self._histogram[bucket] += 1
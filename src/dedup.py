@@ -0,0 +1,157 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import find_column_name
+from utils.minhash import EMPTY, NUM_PERM, band_keys, lsh_bands, normalize_text, signatures
+from .base import Handler
+from .transformation import FeatureExtractionHandler
+
+# Порция пар кандидатов при сравнении сигнатур: ограничивает память (пары x длина сигнатуры)
+PAIRS_PER_BLOCK = 1 << 14
+
+class DedupHandler(Handler):
+    """
+    Обработчик удаления дубликатов резюме перед извлечением признаков.
+
+    Точные дубликаты — строки с одинаковыми нормализованными полями (регистр, пробелы).
+    Почти дубликаты (перепубликации с мелкими правками) — строки из того же города, у которых текст
+    записи (n-граммы всех полей, включая должность) похож по Жаккару (MinHash + LSH) не меньше threshold.
+    Остается первое вхождение; состояние сохраняется между чанками, поэтому дубликаты
+    удаляются по всему файлу, а не внутри чанка.
+    """
+    def __init__(self, threshold: float = 0.9, num_perm: int = NUM_PERM,
+                 columns=FeatureExtractionHandler.REQUIRED_COLUMNS):
+        """
+        Args:
+            threshold: Порог похожести текста записи для почти дубликатов (1.0 — только точные дубликаты).
+            num_perm: Длина MinHash-сигнатуры.
+            columns: Ключевые слова колонок, по которым сравниваются резюме (см. find_column_name).
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.columns = columns
+        self.bands, _ = lsh_bands(threshold, num_perm)
+        self.stats = {'rows': 0, 'exact': 0, 'near': 0}
+        self._seen = np.zeros(0, dtype=np.uint64)
+        # Сигнатуры считаются один раз на различное значение поля
+        self._value_ids: Dict[str, int] = {}
+        self._value_signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        # Сигнатуры оставленных строк и индекс LSH по ним: отсортированные ключи полос и номер сигнатуры
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._band_keys = np.zeros(0, dtype=np.uint64)
+        self._band_rows = np.zeros(0, dtype=np.int64)
+
+    def handle(self, df: pd.DataFrame):
+        self.stats['rows'] += len(df)
+        cols = list(dict.fromkeys(find_column_name(df, keyword) for keyword in self.columns))
+        fields = pd.DataFrame({col: normalize_text(df[col]) for col in cols}, index=df.index)
+        exact = pd.util.hash_pandas_object(fields, index=False).to_numpy()
+
+        keep = ~pd.Series(exact).duplicated().to_numpy() & ~self._known(self._seen, exact)
+        self.stats['exact'] += int((~keep).sum())
+        self._seen = np.union1d(self._seen, exact[keep])
+        if self.threshold < 1.0:
+            rows = np.flatnonzero(keep)
+            # Блок LSH — только город без уточнений («москва , готов к переезду» -> «москва»): правка любого
+            # другого поля меняет лишь часть n-грамм записи и не уводит строку в другой блок
+            city = fields[find_column_name(df, 'Город')].str.replace(r'\s*,.*', '', regex=True)
+            block = pd.util.hash_pandas_object(city, index=False).to_numpy()
+            near = self._near_duplicates(self._record_signatures(fields.iloc[rows]), block[rows])
+            keep[rows[near]] = False
+            self.stats['near'] += int(near.sum())
+        if not keep.any():
+            return None
+        return super().handle(df[keep])
+
+    def close(self) -> None:
+        s = self.stats
+        print(f"[{self.__class__.__name__}] Строк: {s['rows']}, удалено точных дубликатов: {s['exact']}, "
+              f"почти дубликатов: {s['near']} (порог {self.threshold}), осталось: {s['rows'] - s['exact'] - s['near']}")
+        super().close()
+
+    @staticmethod
+    def _known(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+        pos = np.minimum(np.searchsorted(sorted_keys, keys), max(sorted_keys.size - 1, 0))
+        return (sorted_keys[pos] == keys) if sorted_keys.size else np.zeros(keys.size, dtype=bool)
+
+    def _similar(self, left: np.ndarray, right: np.ndarray, rows: np.ndarray, owners: np.ndarray) -> np.ndarray:
+        """Маска пар (строка left, строка right), у которых доля совпадающих позиций сигнатур не меньше порога."""
+        result = np.zeros(rows.size, dtype=bool)
+        for start in range(0, rows.size, PAIRS_PER_BLOCK):
+            part = slice(start, start + PAIRS_PER_BLOCK)
+            matches = (left[rows[part]] == right[owners[part]]).sum(axis=1)
+            result[part] = matches >= self.threshold * self.num_perm
+        return result
+
+    @staticmethod
+    def _pairs(items: np.ndarray, owners: np.ndarray, starts: np.ndarray, counts: np.ndarray, size: int):
+        """
+        Пары (items[i], owners[starts[i] + k]) для k < counts[i] порциями около PAIRS_PER_BLOCK пар, без повторов
+        внутри порции (общий ключ нескольких полос): память не зависит от размера групп LSH.
+        """
+        ends = np.cumsum(counts)
+        total = int(ends[-1]) if ends.size else 0
+        cuts = np.searchsorted(ends, np.arange(PAIRS_PER_BLOCK, total, PAIRS_PER_BLOCK), 'right')
+        bounds = np.unique(np.r_[0, cuts, counts.size])
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            part = counts[lo:hi]
+            offsets = np.arange(part.sum()) - np.repeat(np.cumsum(part) - part, part)
+            codes = np.unique(np.repeat(items[lo:hi], part) * np.int64(size)
+                              + owners[np.repeat(starts[lo:hi], part) + offsets])
+            yield codes // size, codes % size
+
+    def _record_signatures(self, fields: pd.DataFrame) -> np.ndarray:
+        """
+        MinHash-сигнатуры записей: поэлементный минимум сигнатур полей равен сигнатуре объединения
+        их множеств n-грамм, поэтому сигнатура всей записи собирается из кэша сигнатур значений.
+        """
+        sig = np.full((len(fields), self.num_perm), EMPTY, dtype=np.uint32)
+        for col in fields:
+            codes, uniques = pd.factorize(fields[col])
+            new = [value for value in uniques if value not in self._value_ids]
+            if new:
+                self._value_ids.update(zip(new, range(len(self._value_ids), len(self._value_ids) + len(new))))
+                self._value_signatures = np.concatenate([self._value_signatures, signatures(new, self.num_perm)])
+            ids = np.array([self._value_ids[value] for value in uniques], dtype=np.int64)[codes]
+            np.minimum(sig, self._value_signatures[ids], out=sig)
+        return sig
+
+    def _near_duplicates(self, sig: np.ndarray, block: np.ndarray) -> np.ndarray:
+        """Маска почти дубликатов среди строк без точных дубликатов; оставленные строки попадают в индекс LSH."""
+        keys = band_keys(sig, block, self.bands)
+        flat = keys.ravel()
+        flat_rows = np.repeat(np.arange(len(sig)), self.bands)
+        near = np.zeros(len(sig), dtype=bool)
+
+        # Пары с оставленными строками прошлых чанков: диапазоны индекса по ключам полос одним векторным поиском
+        lo = np.searchsorted(self._band_keys, flat, 'left')
+        counts = np.searchsorted(self._band_keys, flat, 'right') - lo
+        for rows, owners in self._pairs(flat_rows, self._band_rows, lo, counts, len(self._signatures)):
+            near[rows[self._similar(sig, self._signatures, rows, owners)]] = True
+
+        # Пары внутри чанка: каждая строка с более ранними строками с тем же ключом полосы
+        order = np.argsort(flat, kind='stable')
+        sorted_keys, sorted_rows = flat[order], flat_rows[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, flat.size]))
+        similar = [(rows[mask], owners[mask]) for rows, owners in self._pairs(
+                       sorted_rows, sorted_rows, group_start, np.arange(flat.size) - group_start, len(sig))
+                   for mask in [self._similar(sig, sig, rows, owners) & (rows != owners)]]
+        rows = np.concatenate([np.zeros(0, dtype=np.int64)] + [rows for rows, _ in similar])
+        owners = np.concatenate([np.zeros(0, dtype=np.int64)] + [owners for _, owners in similar])
+        # Строка — дубликат, если похожа на более раннюю оставленную строку. Похожих пар мало,
+        # поэтому порядок оставления разрешается построчно только для них
+        for row, owner in zip(*(array[np.lexsort((owners, rows))].tolist() for array in (rows, owners))):
+            if not near[owner]:
+                near[row] = True
+
+        kept = np.flatnonzero(~near)
+        merged = np.concatenate([self._band_keys, keys[kept].ravel()])
+        order = np.argsort(merged, kind='stable')
+        ids = len(self._signatures) + np.arange(kept.size)
+        self._band_keys = merged[order]
+        self._band_rows = np.concatenate([self._band_rows, np.repeat(ids, self.bands)])[order]
+        self._signatures = np.concatenate([self._signatures, sig[kept]])
+        return near
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from utils.helpers import find_column_name
+from utils.row_index import RowIndex, row_fingerprints
+from .base import Handler
+from .transformation import FeatureExtractionHandler
+
+class RowFingerprintHandler(Handler):
+    """
+    Обработчик инкрементального парсинга: считает отпечатки строк чанка по колонкам,
+    от которых зависят признаки, и пропускает дальше только строки, которых нет в индексе
+    (новые или измененные резюме). По окончании потока согласует датасет с индексом.
+    """
+    def __init__(self, row_index: RowIndex, columns=FeatureExtractionHandler.REQUIRED_COLUMNS):
+        """
+        Args:
+            row_index: Индекс прошлого прогона (utils/row_index.py) или пустой для полной сборки.
+            columns: Ключевые слова колонок, входящих в отпечаток (см. find_column_name).
+        """
+        self.row_index = row_index
+        self.columns = columns
+        self.stats = None
+
+    def handle(self, df: pd.DataFrame):
+        keys = row_fingerprints(df, [find_column_name(df, keyword) for keyword in self.columns])
+        new = self.row_index.add_input(keys)
+        if not new.any():
+            return None
+        return super().handle(df[new])
+
+    def close(self) -> None:
+        """Сначала завершает запись датасета следующими обработчиками, затем обновляет индекс."""
+        super().close()
+        self.stats = self.row_index.finish()
+        s = self.stats
+        print(f"[{self.__class__.__name__}] Строк на входе: {s['input_rows']}, новых/измененных: {s['new_rows']}, "
+              f"без изменений: {s['unchanged_rows']}. Датасет: +{s['appended_rows']} / -{s['deleted_rows']} "
+              f"строк, всего {s['dataset_rows']}")
+
+class DatasetRowsHandler(Handler):
+    """Отмечает в индексе, какие входные строки (data['index']) стали строками датасета."""
+    def __init__(self, row_index: RowIndex):
+        self.row_index = row_index
+
+    def handle(self, data: dict):
+        self.row_index.add_rows(np.asarray(data['index']))
+        return super().handle(data)
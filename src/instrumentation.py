@@ -0,0 +1,324 @@
+import collections
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Активный сборщик метрик процесса; None — инструментирование выключено (обработчики не замеряются)
+current: Optional['Instrumentation'] = None
+
+PROFILE_MODES = ('cprofile', 'sample')
+METRICS = [
+    # (поле HandlerStats, имя метрики, тип, описание)
+    ('calls', 'hh_handler_calls_total', 'counter', 'Вызовы handle обработчика.'),
+    ('errors', 'hh_handler_errors_total', 'counter', 'Вызовы handle, завершившиеся исключением.'),
+    ('wall_s', 'hh_handler_wall_seconds_total', 'counter', 'Собственное время обработчика без следующих в цепочке, с.'),
+    ('cpu_s', 'hh_handler_cpu_seconds_total', 'counter', 'Собственное процессорное время потока обработчика, с.'),
+    ('mem_bytes', 'hh_handler_memory_growth_bytes_total', 'counter',
+     'Суммарный прирост RSS за собственное время (уменьшение RSS не вычитается), байт.'),
+    ('rows_in', 'hh_handler_rows_in_total', 'counter', 'Строк на входе handle.'),
+    ('rows_out', 'hh_handler_rows_out_total', 'counter', 'Строк, переданных следующему обработчику.'),
+    ('bytes_in', 'hh_handler_bytes_in_total', 'counter', 'Байт на входе handle (буферы массивов, размер файла).'),
+    ('bytes_out', 'hh_handler_bytes_out_total', 'counter', 'Байт, переданных следующему обработчику.'),
+]
+
+
+def _rss_bytes() -> int:
+    """Текущий RSS процесса (Linux, /proc); на других ОС — 0, и прирост памяти не считается."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _payload_size(data: Any) -> Tuple[int, int]:
+    """
+    Строки и байты данных, идущих по цепочке: DataFrame, массивы NumPy, scipy.sparse,
+    словарь {'x', 'y', ...} от FeatureExtractionHandler, путь к файлу. Для DataFrame считаются
+    только буферы колонок (без deep=True): замер не должен обходить строки.
+    """
+    if isinstance(data, dict) and 'x' in data:
+        rows, size = _payload_size(data['x'])
+        return rows, size + (_payload_size(data['y'])[1] if data.get('y') is not None else 0)
+    if hasattr(data, 'memory_usage'):
+        return len(data), int(data.memory_usage(index=False).sum() if data.ndim == 2 else data.memory_usage())
+    if hasattr(data, 'nnz'):
+        return data.shape[0], data.data.nbytes + data.indices.nbytes + data.indptr.nbytes
+    if hasattr(data, 'nbytes'):
+        return (data.shape[0] if data.ndim else 1), int(data.nbytes)
+    if isinstance(data, str):
+        return 0, os.path.getsize(data) if os.path.isfile(data) else 0
+    if isinstance(data, (list, tuple)):
+        return len(data), 0
+    return 0, 0
+
+
+class HandlerStats:
+    """Накопленные метрики одного обработчика (по имени класса)."""
+    __slots__ = [field for field, *_ in METRICS]
+
+    def __init__(self):
+        for field in self.__slots__:
+            setattr(self, field, 0)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class _Frame:
+    """Вызов обработчика на стеке потока: отметки начала и время/память вложенных вызовов."""
+    __slots__ = ('handler', 'name', 'wall', 'cpu', 'rss', 'child_wall', 'child_cpu', 'child_rss',
+                 'rows_out', 'bytes_out')
+
+    def __init__(self, handler, name: str):
+        self.handler, self.name = handler, name
+        self.child_wall = self.child_cpu = self.child_rss = self.rows_out = self.bytes_out = 0
+        self.rss = _rss_bytes()
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+
+
+class Instrumentation:
+    """
+    Сборщик метрик цепочки обработчиков.
+
+    Пока сборщик установлен (install), каждый вызов handle/close наследника Handler
+    замеряется: собственное время (wall и CPU потока), прирост RSS, строки и байты на входе
+    и переданные дальше по цепочке. «Собственное» — без времени следующих обработчиков,
+    поэтому сумма по стадиям равна времени всего пайплайна, а узкое место видно сразу.
+    Отдельные стадии можно профилировать cProfile или семплирующим профилировщиком.
+    Замеряется только процесс, установивший сборщик: подцепочки в пулах процессов видны
+    как время ожидания вызывающего обработчика.
+    """
+    def __init__(self, log_path: Optional[str] = None, profile: Optional[Dict[str, str]] = None,
+                 sample_interval: float = 0.005):
+        """
+        Args:
+            log_path: JSON Lines лог: событие на каждый вызов handle и итоговая сводка в конце.
+            profile: {имя класса обработчика: 'cprofile' | 'sample'} — какие стадии профилировать.
+            sample_interval: Период семплирования стека, с.
+        """
+        self.profile = dict(profile or {})
+        self.sample_interval = sample_interval
+        self.stats: Dict[str, HandlerStats] = collections.defaultdict(HandlerStats)
+        self.profilers: Dict[str, Any] = {}
+        self.samples: Dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+        self._log = open(log_path, 'w', encoding='utf-8') if log_path else None
+        self._lock = threading.Lock()
+        self._stacks: Dict[int, List[_Frame]] = {}
+        self._pid = os.getpid()
+        self._sampler = None
+        self._stopped = threading.Event()
+
+    def install(self) -> 'Instrumentation':
+        global current
+        self._pid = os.getpid()
+        current = self
+        if 'sample' in self.profile.values():
+            self._sampler = threading.Thread(target=self._sample_loop, name='handler-sampler', daemon=True)
+            self._sampler.start()
+        return self
+
+    def uninstall(self) -> None:
+        global current
+        if current is self:
+            current = None
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self._log is not None:
+            self._write_event({'event': 'summary', 'handlers': self.summary()})
+            self._log.close()
+            self._log = None
+
+    def call(self, handler, method, args: tuple, kwargs: Optional[Dict[str, Any]] = None) -> Any:
+        """Вызывает метод обработчика (handle или close) с замером; повторный вход в тот же обработчик не замеряется."""
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        if os.getpid() != self._pid or (stack and stack[-1].handler is handler):
+            return method(handler, *args, **(kwargs or {}))
+        name = type(handler).__name__
+        is_handle = method.__name__ == 'handle'
+        rows_in, bytes_in = _payload_size(args[0]) if is_handle and args else (0, 0)
+        if stack:
+            self._pause_profiler(stack[-1].name)
+        frame = _Frame(handler, name)
+        stack.append(frame)
+        self._resume_profiler(name)
+        failed = True
+        try:
+            result = method(handler, *args, **(kwargs or {}))
+            failed = False
+            return result
+        finally:
+            self._pause_profiler(name)
+            wall, cpu = time.perf_counter() - frame.wall, time.thread_time() - frame.cpu
+            rss = _rss_bytes() - frame.rss
+            stack.pop()
+            if stack:
+                parent = stack[-1]
+                parent.child_wall += wall
+                parent.child_cpu += cpu
+                parent.child_rss += rss
+                self._resume_profiler(parent.name)
+            self._record(name, is_handle, failed, wall - frame.child_wall, cpu - frame.child_cpu,
+                         rss - frame.child_rss, rows_in, bytes_in, frame)
+
+    def forward(self, handler, data: Any) -> None:
+        """Учитывает данные, которые обработчик передает следующему в цепочке."""
+        stack = self._stacks.get(threading.get_ident())
+        if stack and stack[-1].handler is handler:
+            rows, size = _payload_size(data)
+            stack[-1].rows_out += rows
+            stack[-1].bytes_out += size
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Метрики по обработчикам; share — доля собственного времени стадии в сумме по всем стадиям."""
+        with self._lock:
+            stats = {name: s.as_dict() for name, s in self.stats.items()}
+        total = sum(s['wall_s'] for s in stats.values()) or 1.0
+        for s in stats.values():
+            s['share'] = s['wall_s'] / total
+        return stats
+
+    def format_summary(self) -> str:
+        """Таблица собственного времени стадий для вывода в консоль."""
+        lines = [f"{'обработчик':<28}{'вызовов':>9}{'время, с':>10}{'CPU, с':>9}{'доля':>7}"
+                 f"{'строк вход':>12}{'строк выход':>13}{'+RSS, МБ':>9}"]
+        for name, s in sorted(self.summary().items(), key=lambda item: -item[1]['wall_s']):
+            lines.append(f"{name:<28}{s['calls']:>9}{s['wall_s']:>10.2f}{s['cpu_s']:>9.2f}{s['share']:>7.0%}"
+                         f"{s['rows_in']:>12}{s['rows_out']:>13}{s['mem_bytes'] / 2 ** 20:>9.1f}")
+        return '\n'.join(lines)
+
+    def prometheus(self) -> str:
+        """Метрики в текстовом формате Prometheus (exposition format 0.0.4)."""
+        stats = self.summary()
+        lines = []
+        for field, metric, kind, help_text in METRICS:
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+            lines += [f'{metric}{{handler="{name}"}} {s[field]}' for name, s in sorted(stats.items())]
+        return '\n'.join(lines) + '\n'
+
+    def write_reports(self, out_dir: str) -> List[str]:
+        """
+        Пишет metrics.prom и профили стадий: <обработчик>.prof (pstats, cProfile) и
+        <обработчик>.folded (свернутые стеки семплирования, формат flamegraph.pl / speedscope).
+
+        Returns:
+            Пути записанных файлов.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        paths = [os.path.join(out_dir, 'metrics.prom')]
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        for name, profiler in self.profilers.items():
+            paths.append(os.path.join(out_dir, f'{name}.prof'))
+            profiler.dump_stats(paths[-1])
+        for name, counter in self.samples.items():
+            paths.append(os.path.join(out_dir, f'{name}.folded'))
+            with open(paths[-1], 'w', encoding='utf-8') as f:
+                f.writelines(f'{stack} {count}\n' for stack, count in counter.most_common())
+        return paths
+
+    def _record(self, name: str, is_handle: bool, failed: bool, wall: float, cpu: float, rss: int,
+                rows_in: int, bytes_in: int, frame: _Frame) -> None:
+        with self._lock:
+            s = self.stats[name]
+            s.wall_s += wall
+            s.cpu_s += cpu
+            # Счетчик монотонный: освобождение памяти в вызове не уменьшает его (в журнале событий — знаковая дельта)
+            s.mem_bytes += max(rss, 0)
+            s.rows_out += frame.rows_out
+            s.bytes_out += frame.bytes_out
+            if is_handle:
+                s.calls += 1
+                s.errors += int(failed)
+                s.rows_in += rows_in
+                s.bytes_in += bytes_in
+        if self._log is not None:
+            self._write_event({
+                'event': 'handle' if is_handle else 'close', 'handler': name, 'error': failed,
+                'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6), 'mem_bytes': rss,
+                'rows_in': rows_in, 'rows_out': frame.rows_out, 'bytes_in': bytes_in, 'bytes_out': frame.bytes_out,
+            })
+
+    def _write_event(self, event: dict) -> None:
+        line = json.dumps({'ts': round(time.time(), 6), **event}, ensure_ascii=False)
+        with self._lock:
+            self._log.write(line + '\n')
+            self._log.flush()
+
+    def _resume_profiler(self, name: str) -> None:
+        if self.profile.get(name) != 'cprofile':
+            return
+        if name not in self.profilers:
+            import cProfile
+            self.profilers[name] = cProfile.Profile()
+        self.profilers[name].enable()
+
+    def _pause_profiler(self, name: str) -> None:
+        # Профиль стадии — только ее собственный код: на время следующих обработчиков он выключается
+        if name in self.profilers:
+            self.profilers[name].disable()
+
+    def _sample_loop(self) -> None:
+        """Раз в sample_interval снимает стеки потоков, стоящих внутри семплируемых стадий."""
+        while not self._stopped.wait(self.sample_interval):
+            frames = sys._current_frames()
+            for thread_id, stack in list(self._stacks.items()):
+                try:
+                    top = stack[-1]
+                except IndexError:
+                    continue
+                if self.profile.get(top.name) != 'sample' or thread_id not in frames:
+                    continue
+                names, frame = [], frames[thread_id]
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                with self._lock:
+                    self.samples[top.name][';'.join(reversed(names))] += 1
+
+
+def parse_profile_specs(specs: Iterable[str]) -> Dict[str, str]:
+    """
+    Разбирает аргументы вида 'FeatureExtractionHandler' или 'DataLoaderHandler:sample'.
+
+    Raises:
+        ValueError: Если режим профилирования неизвестен.
+    """
+    profile = {}
+    for spec in specs:
+        name, _, mode = spec.partition(':')
+        mode = mode or 'cprofile'
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Неизвестный режим профилирования '{mode}' (доступны: {', '.join(PROFILE_MODES)}).")
+        profile[name] = mode
+    return profile
+
+
+@contextlib.contextmanager
+def instrumented(out_dir: Optional[str], profile: Iterable[str] = ()):
+    """
+    Включает сбор метрик на время блока, если задан out_dir или профилируемые стадии.
+    По выходу печатает сводку по стадиям и пишет в out_dir (по умолчанию 'metrics')
+    metrics.jsonl, metrics.prom и профили стадий.
+    """
+    profile = parse_profile_specs(profile)
+    if out_dir is None and not profile:
+        yield None
+        return
+    out_dir = out_dir or 'metrics'
+    os.makedirs(out_dir, exist_ok=True)
+    instrumentation = Instrumentation(os.path.join(out_dir, 'metrics.jsonl'), profile).install()
+    try:
+        yield instrumentation
+    finally:
+        instrumentation.uninstall()
+        paths = instrumentation.write_reports(out_dir)
+        print(instrumentation.format_summary())
+        print(f"Метрики и профили: {', '.join([os.path.join(out_dir, 'metrics.jsonl')] + paths)}")
@@ -1,27 +1,108 @@
+import codecs
+import csv
 import os
+from typing import List, Optional, Tuple
 
 import pandas as pd
 
+from utils.columnar import columnar_format, iter_frames, schema_names
+from utils.helpers import find_column_name
 from .base import Handler
 
 class DataLoaderHandler(Handler):
     """
     Обработчик, отвечающий за загрузку данных из CSV-файла.
-    Автоматически определяет разделитель и пытается подобрать кодировку
-    (utf-8, cp1251) для устойчивости к различным форматам файлов.
+    Определяет разделитель по небольшому фрагменту начала файла, а кодировку (utf-8, cp1251) —
+    одной быстрой проверкой декодирования всего файла, после чего читает файл C-движком pandas.
+    При заданном chunksize работает в потоковом режиме: файл читается чанками
+    фиксированного размера, и каждый чанк передается дальше по цепочке.
+    Файлы .parquet и .arrow (см. utils/columnar.py) читаются через pyarrow: только нужные
+    колонки, с фильтром строк на уровне row group и параллельным чтением.
     """
+    ENCODINGS = ('utf-8', 'cp1251')
+    DELIMITERS = ',;\t|'
+
+    def __init__(self, chunksize: Optional[int] = None, sample_bytes: int = 64 * 1024,
+                 index_col: Optional[str] = None, columns: Optional[List[str]] = None, filters=None):
+        """
+        Инициализирует DataLoaderHandler.
+
+        Args:
+            chunksize: Количество строк в одном чанке. None — загрузить файл целиком.
+            sample_bytes: Размер фрагмента начала файла для определения разделителя.
+            index_col: Колонка с идентификатором строки, которая станет индексом DataFrame.
+                       По умолчанию индекс — сквозной номер строки файла (в том числе между чанками).
+            columns: Ключевые слова нужных колонок (см. find_column_name); остальные колонки не читаются.
+                     None — все колонки.
+            filters: Фильтр строк колоночного файла (выражение pyarrow.compute или список условий
+                     в формате pandas.read_parquet). Номера строк считаются после фильтрации.
+        """
+        self.chunksize = chunksize
+        self.sample_bytes = sample_bytes
+        self.index_col = index_col
+        self.columns = columns
+        self.filters = filters
+
+    def sniff_format(self, path: str) -> Tuple[str, str]:
+        """
+        Определяет разделитель по первым sample_bytes байтам файла, а кодировку — по всему файлу:
+        utf-8 выбирается, только если декодируется весь файл, иначе — cp1251.
+
+        Args:
+            path: Путь к CSV-файлу.
+
+        Returns:
+            Кортеж (кодировка, разделитель).
+        """
+        with open(path, 'rb') as f:
+            head = f.read(self.sample_bytes)
+
+        for encoding in self.ENCODINGS:
+            try:
+                # final=False: многобайтовый символ, обрезанный на границе фрагмента, не считается ошибкой
+                decoder = codecs.getincrementaldecoder(encoding)()
+                sample = decoder.decode(head, final=False)
+                # Байт другой кодировки может встретиться после фрагмента, а в потоковом режиме
+                # часть чанков к тому моменту уже ушла по цепочке. Поэтому остаток файла проверяется
+                # заранее тем же декодером: это один последовательный проход без разбора CSV
+                if encoding != self.ENCODINGS[-1]:
+                    self._decode_rest(path, len(head), decoder)
+                break
+            except UnicodeDecodeError:
+                print(f"[{self.__class__.__name__}] Не удалось декодировать с {encoding}, пробуем следующую...")
+        else:
+            raise ValueError(f"Не удалось определить кодировку файла '{path}'.")
+
+        # Последняя строка фрагмента может быть обрезана — анализируем только полные строки
+        lines = sample.lstrip('\ufeff').splitlines()[:-1] or [sample]
+        try:
+            sep = csv.Sniffer().sniff('\n'.join(lines), delimiters=self.DELIMITERS).delimiter
+        except csv.Error:
+            sep = ','
+        return encoding, sep
+
+    @staticmethod
+    def _decode_rest(path: str, offset: int, decoder, block_bytes: int = 1 << 20) -> None:
+        """Декодирует файл с позиции offset блоками; UnicodeDecodeError — файл не в кодировке декодера."""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                block = f.read(block_bytes)
+                decoder.decode(block, final=not block)
+                if not block:
+                    return
+
     def handle(self, path: str) -> pd.DataFrame:
         """
         Загружает данные из CSV-файла по указанному пути.
-        Пытается загрузить файл с кодировкой 'utf-8', если не удается,
-        переключается на 'cp1251'. Использует engine='python' и sep=None
-        для автоматического определения разделителя.
+        В потоковом режиме передает каждый чанк по цепочке. По окончании
+        файла вызывает close(), чтобы обработчики завершили запись и освободили ресурсы.
 
         Args:
             path: Абсолютный или относительный путь к CSV-файлу.
 
         Returns:
-            Загруженный pandas.DataFrame.
+            Результат следующего обработчика (для потокового режима — по последнему чанку).
 
         Raises:
             FileNotFoundError: Если файл по указанному пути не найден.
@@ -29,14 +110,65 @@ class DataLoaderHandler(Handler):
         """
         if not os.path.exists(path):
             raise FileNotFoundError(f"Ошибка: Файл '{path}' не найден.")
+        if columnar_format(path) is not None:
+            return self._handle_columnar(path)
+
+        encoding, sep = self.sniff_format(path)
+        name = os.path.basename(path)
+        print(f"[{self.__class__.__name__}] Формат '{name}': кодировка {encoding}, разделитель {sep!r}")
+        # C-движок не конвертирует колонки, не попавшие в usecols
+        usecols = self._usecols if self.columns is not None else None
+
+        if self.chunksize is None:
+            try:
+                df = pd.read_csv(path, sep=sep, encoding=encoding, index_col=self.index_col, usecols=usecols)
+            except Exception as e:
+                raise Exception(f"Произошла ошибка при чтении файла CSV: {e}")
+            print(f"[{self.__class__.__name__}] Файл '{name}' загружен. Строк: {df.shape[0]}")
+            result = super().handle(df)
+            self.close()
+            return result
 
+        result, total = None, 0
         try:
-            df = pd.read_csv(path, sep=None, engine='python', encoding='utf-8')
-        except UnicodeDecodeError:
-            print(f"[{self.__class__.__name__}] Не удалось загрузить с utf-8, пробуем cp1251...")
-            df = pd.read_csv(path, sep=None, engine='python', encoding='cp1251')
-        except Exception as e:
+            with pd.read_csv(path, sep=sep, encoding=encoding, index_col=self.index_col, usecols=usecols,
+                             chunksize=self.chunksize) as reader:
+                for chunk in reader:
+                    total += chunk.shape[0]
+                    result = super().handle(chunk)
+                    print(f"[{self.__class__.__name__}] Обработано строк: {total}")
+        except UnicodeDecodeError as e:
             raise Exception(f"Произошла ошибка при чтении файла CSV: {e}")
+        self.close()
+        print(f"[{self.__class__.__name__}] Файл '{name}' загружен потоково. Строк: {total}")
+        return result
+
+    def _usecols(self, column: str) -> bool:
+        """Колонка нужна, если содержит одно из ключевых слов columns или это index_col."""
+        return column == self.index_col or any(keyword.lower() in str(column).lower() for keyword in self.columns)
+
+    def _handle_columnar(self, path: str):
+        """Загружает .parquet/.arrow: проекция колонок, фильтр строк, чтение row group в потоках pyarrow."""
+        name = os.path.basename(path)
+        columns = None
+        if self.columns is not None:
+            header = pd.DataFrame(columns=schema_names(path))
+            columns = [find_column_name(header, keyword) for keyword in self.columns]
+            columns = list(dict.fromkeys(columns + ([self.index_col] if self.index_col else [])))
+        print(f"[{self.__class__.__name__}] Формат '{name}': колоночный, колонок к чтению: "
+              f"{len(columns) if columns is not None else 'все'}")
 
-        print(f"[{self.__class__.__name__}] Файл '{os.path.basename(path)}' загружен. Строк: {df.shape[0]}")
-        return super().handle(df)
\ No newline at end of file
+        result, total = None, 0
+        for df in iter_frames(path, columns, self.filters, self.chunksize):
+            if self.index_col is not None:
+                df = df.set_index(self.index_col)
+            else:
+                # Сквозной номер строки, как у CSV-загрузчика
+                df.index = pd.RangeIndex(total, total + len(df))
+            total += len(df)
+            result = super().handle(df)
+            if self.chunksize is not None:
+                print(f"[{self.__class__.__name__}] Обработано строк: {total}")
+        self.close()
+        print(f"[{self.__class__.__name__}] Файл '{name}' загружен. Строк: {total}")
+        return result
@@ -1,43 +1,120 @@
 import os
+import shutil
 
 import numpy as np
 
+from utils.columnar import feature_table, write_feature_table
+from utils.dataset_io import DatasetWriter, open_dataset
+from utils.npy_appender import NpyAppender
 from .base import Handler
 
 class NpySaveHandler(Handler):
     """
-    Обработчик, отвечающий за сохранение результирующих массивов NumPy
-    (матрицы признаков X и вектора целевой переменной y) в файлы .npy.
+    Обработчик, отвечающий за сохранение результирующих массивов
+    (матрицы признаков X и вектора целевой переменной y) в хранилище датасета:
+    файлы .npy, дописываемые по чанкам, и manifest.json с числом строк, dtype,
+    схемой признаков и хэшем трансформеров (см. utils/dataset_io.py).
+    Разреженная матрица (scipy.sparse) хранится покомпонентно в формате CSR.
     """
-    def __init__(self, output_dir: str = 'data'):
+    def __init__(self, output_dir: str = 'data', partial: bool = False, append: bool = False):
         """
         Инициализирует NpySaveHandler.
 
         Args:
-            output_dir: Директория, куда будут сохранены файлы x_data.npy и y_data.npy.
-                        По умолчанию 'data'.
+            output_dir: Директория хранилища датасета. По умолчанию 'data'.
+            partial: Потоковый режим: чанки дописываются по мере поступления, манифест — в close().
+            append: Дописать новый батч к существующему датасету вместо его перезаписи.
         """
         self.output_dir = output_dir
+        self.partial = partial
+        self.append = append
+        self._writer = None
         os.makedirs(self.output_dir, exist_ok=True)
-        print(f"[{self.__class__.__name__}] Файлы .npy будут сохранены в: {self.output_dir}")
+        print(f"[{self.__class__.__name__}] Датасет будет сохранен в: {self.output_dir}")
     def handle(self, data: dict) -> str:
         """
-        Сохраняет матрицу признаков 'x_data.npy' и вектор целевой переменной 'y_data.npy'.
+        Дописывает матрицу признаков и вектор целевой переменной в хранилище.
 
         Args:
-            data: Словарь, содержащий два ключа:
-                  'x': numpy.ndarray - матрица признаков.
-                  'y': numpy.ndarray - вектор целевой переменной.
+            data: Словарь с ключами:
+                  'x': numpy.ndarray или scipy.sparse.csr_matrix - матрица признаков.
+                  'y': numpy.ndarray - вектор целевой переменной (None в режиме инференса).
+                  'features', 'transformer_hash' (необязательные) - схема признаков и хэш трансформеров.
 
         Returns:
-            Строковое сообщение об успешном сохранении и пути к файлам.
+            Строковое сообщение об успешном сохранении.
         """
-        x_path = os.path.join(self.output_dir, 'x_data.npy')
-        y_path = os.path.join(self.output_dir, 'y_data.npy')
+        if self._writer is None:
+            self._writer = DatasetWriter(self.output_dir, append=self.append)
+        rows = self._writer.write(data['x'], data['y'], data.get('features'), data.get('transformer_hash'))
 
-        np.save(x_path, data['x'])
-        np.save(y_path, data['y'])
+        if self.partial:
+            return super().handle(f"[{self.__class__.__name__}] Чанк дописан. Строк в датасете: {rows}")
 
-        message = f"[{self.__class__.__name__}] Успех! Файлы x_data.npy и y_data.npy созданы в: {self.output_dir}"
+        self._finish()
+        message = f"[{self.__class__.__name__}] Успех! Датасет ({rows} строк) сохранен в: {self.output_dir}"
         print(message)
-        return super().handle(message)
\ No newline at end of file
+        return super().handle(message)
+
+    def close(self) -> None:
+        """Завершает потоковую запись: фиксирует заголовки .npy и манифест."""
+        if self._writer is not None:
+            rows = self._writer.manifest['rows']
+            self._finish()
+            print(f"[{self.__class__.__name__}] Успех! Строк в датасете: {rows} в: {self.output_dir}")
+        super().close()
+
+    def _finish(self) -> None:
+        self._writer.close()
+        self._writer = None
+        # Следующие батчи (повторный вызов handle) дописываются к только что записанным
+        self.append = True
+
+class ColumnarSaveHandler(Handler):
+    """
+    Сохраняет признаки, целевую переменную и номера строк исходной выгрузки в один файл
+    Parquet или Arrow IPC (по расширению, см. utils/columnar.py). Чанки дописываются во временное
+    хранилище .npy рядом с файлом (path + '.parts', как у NpySaveHandler), а в close() файл
+    пишется одним батчем/row group поверх memory-mapped частей: память не растет с числом чанков,
+    а train_classifier.py и app.py открывают Arrow IPC без копирования (open_feature_table).
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Путь к выходному файлу (.parquet или .arrow).
+        """
+        self.path = path
+        self.parts_dir = path + '.parts'
+        self._writer = None
+        self._row_ids = None
+        self._meta = None
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        print(f"[{self.__class__.__name__}] Датасет будет сохранен в: {self.path}")
+
+    def handle(self, data: dict) -> str:
+        """Дописывает чанк: data с ключами 'x', 'y', 'index' и (необязательно) 'features', 'transformer_hash'."""
+        meta = (data.get('features'), data.get('transformer_hash'))
+        if self._writer is None:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+            self._writer, self._meta = DatasetWriter(self.parts_dir), meta
+            self._row_ids = NpyAppender(os.path.join(self.parts_dir, 'row_ids.npy'))
+        elif meta != self._meta:
+            raise ValueError(f"Чанк получен другими трансформерами ({meta[1]}), чем датасет ({self._meta[1]}).")
+        rows = self._writer.write(data['x'], data['y'], *meta)
+        self._row_ids.append(np.asarray(data['index'], dtype=np.int64))
+        return super().handle(f"[{self.__class__.__name__}] Чанк дописан. Строк в датасете: {rows}")
+
+    def close(self) -> None:
+        """Пишет файл одним батчем из накопленных частей и удаляет их."""
+        if self._writer is not None:
+            self._writer.close()
+            self._row_ids.close()
+            x, y = open_dataset(self.parts_dir)
+            row_ids = np.load(os.path.join(self.parts_dir, 'row_ids.npy'), mmap_mode='r')
+            write_feature_table(feature_table(x, y, row_ids, *self._meta), self.path)
+            del x, y, row_ids
+            shutil.rmtree(self.parts_dir)
+            print(f"[{self.__class__.__name__}] Успех! Строк в датасете: {self._row_ids.rows} в: {self.path}")
+            self._writer = self._row_ids = None
+        super().close()
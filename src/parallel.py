@@ -0,0 +1,60 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from .base import Handler
+
+_worker_chain: Optional[Handler] = None
+
+
+def _init_worker(chain_factory: Callable[[], Handler]) -> None:
+    """Собирает подцепочку один раз при старте процесса-воркера (модели и трансформеры остаются прогретыми)."""
+    global _worker_chain
+    _worker_chain = chain_factory()
+
+
+def _run_chain(data: Any) -> Any:
+    return _worker_chain.handle(data)
+
+
+class ProcessPoolHandler(Handler):
+    """
+    Обработчик, выполняющий подцепочку обработчиков в пуле процессов.
+    Каждый вызов handle отправляет данные (например, чанк CSV) в свободный воркер;
+    результаты передаются следующему обработчику строго в исходном порядке.
+    Число чанков в работе ограничено max_pending, поэтому память остается ограниченной.
+    """
+    def __init__(self, chain_factory: Callable[[], Handler], workers: int, max_pending: Optional[int] = None):
+        """
+        Args:
+            chain_factory: Сериализуемая (pickle) функция без аргументов, собирающая подцепочку в воркере.
+            workers: Число процессов.
+            max_pending: Максимум чанков в работе (по умолчанию 2 * workers).
+        """
+        self.chain_factory = chain_factory
+        self.workers = workers
+        self.max_pending = max_pending or 2 * workers
+        self._pool = None
+        self._pending = deque()
+
+    def handle(self, data: Any) -> Any:
+        """Отправляет данные в пул; при заполнении очереди дожидается самого старого результата."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(self.chain_factory,))
+        self._pending.append(self._pool.submit(_run_chain, data))
+        result = None
+        while len(self._pending) >= self.max_pending:
+            result = super().handle(self._pending.popleft().result())
+        return result
+
+    def close(self) -> None:
+        """Дожидается оставшихся результатов, останавливает пул и передает сигнал дальше."""
+        try:
+            while self._pending:
+                super().handle(self._pending.popleft().result())
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+        super().close()
@@ -0,0 +1,136 @@
+import os
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from utils.compact_model import load_model
+from utils.prediction_cache import PredictionCache, artifacts_version, prediction_keys
+from utils.transformer_utils import load_transformer
+from .transformation import FeatureExtractionHandler
+
+class LevelPredictor:
+    """
+    Прогрев и хранение модели и трансформеров в памяти долгоживущего процесса.
+    Модель, векторайзер и скалер загружаются один раз при создании (из компактного .npz —
+    без sklearn, см. utils/compact_model.py),
+    после чего сырые записи резюме обрабатываются логикой FeatureExtractionHandler
+    в режиме инференса (без формирования целевой переменной).
+    """
+    def __init__(self, model_path: str, level_map: Dict[int, str], res_dir: str = FeatureExtractionHandler.RES_DIR,
+                 cache: Optional[PredictionCache] = None):
+        """
+        Args:
+            model_path: Путь к обученной модели (.pkl; компактный .npz рядом загружается вместо него).
+            level_map: Словарь перевода кодов классов в названия уровней (0 -> 'junior').
+            res_dir: Директория с vectorizer.pkl и scaler.pkl.
+            cache: Кэш предсказаний (utils/prediction_cache.py). С кэшем предиктор следит за версией
+                   артефактов: при изменении resources/*.pkl модель и трансформеры перезагружаются,
+                   а закэшированные предсказания прежней версии инвалидируются.
+        """
+        self.model_path = model_path
+        self.level_map = level_map
+        self.res_dir = res_dir
+        self.cache = cache
+        self._reload_lock = threading.Lock()
+        self._load()
+        if cache is not None:
+            cache.set_version(self._version())
+
+    def _load(self) -> None:
+        self.model = load_model(self.model_path)
+        # Одиночные запросы быстрее без пула потоков joblib внутри RandomForest
+        if hasattr(self.model, 'n_jobs'):
+            self.model.n_jobs = 1
+        # Компактная модель несет словарь TF-IDF и параметры скалера, с которыми обучалась: тогда
+        # sklearn не загружается. Без них (pickle, HashingVectorizer) трансформеры берутся из resources/*.pkl
+        vectorizer, scaler = getattr(self.model, 'vectorizer', None), getattr(self.model, 'scaler', None)
+        if vectorizer is None or scaler is None:
+            vectorizer = load_transformer(os.path.join(self.res_dir, "vectorizer.pkl"))
+            scaler = load_transformer(os.path.join(self.res_dir, "scaler.pkl"))
+        self.handler = FeatureExtractionHandler(is_training=False, vectorizer=vectorizer, scaler=scaler)
+        self.levels = [self.level_map[int(c)] for c in self.model.classes_]
+
+    def _version(self) -> str:
+        return artifacts_version(self.res_dir, [self.model_path, os.path.splitext(self.model_path)[0] + '.npz'])
+
+    def check_records(self, records: List[dict]) -> None:
+        """
+        Проверяет, что каждая запись содержит все колонки, нужные для извлечения признаков.
+        Позволяет отклонить некорректный запрос до того, как он попадет в общий батч.
+
+        Raises:
+            KeyError: Если в записи нет колонки с нужным ключевым словом.
+        """
+        for i, record in enumerate(records):
+            keys = [str(key).lower() for key in record]
+            for keyword in self.handler.REQUIRED_COLUMNS:
+                if not any(keyword.lower() in key for key in keys):
+                    raise KeyError(f"Запись {i}: колонка с ключевым словом '{keyword}' не найдена.")
+
+    def predict_records(self, records: List[dict]) -> List[dict]:
+        """
+        Предсказывает уровни для сырых записей резюме (ключи — названия колонок выгрузки HH).
+
+        Args:
+            records: Список словарей {колонка: значение}.
+
+        Returns:
+            Список результатов в порядке записей: {'level', 'probabilities'}.
+            Для записей, не прошедших фильтр IT-специалистов или без нужных полей, level = None.
+        """
+        results = [{'level': None, 'probabilities': None} for _ in records]
+        if not records:
+            return results
+        df = self._records_frame(records)
+        if self.cache is None:
+            probabilities = self._predict_frame(df)
+        else:
+            version = self._version()
+            with self._reload_lock:
+                if self.cache.set_version(version):
+                    # Артефакты на диске изменились (переобучение) — конкурентные запросы ждут перезагрузки
+                    self._load()
+            keys = prediction_keys(df, self.handler.REQUIRED_COLUMNS, version)
+            found = self.cache.get_many(keys)
+            missed = [row for row, key in enumerate(keys) if key not in found]
+            computed = self._predict_frame(df.iloc[missed]) if missed else {}
+            # Записи, не прошедшие фильтр, тоже кэшируются (None): повторно их не разбираем
+            self.cache.put_many({keys[row]: computed.get(row) for row in missed})
+            probabilities = {row: found.get(key, computed.get(row)) for row, key in enumerate(keys)}
+
+        for row, p in probabilities.items():
+            if p is not None:
+                results[row] = {
+                    'level': self.levels[max(range(len(p)), key=p.__getitem__)],
+                    'probabilities': {level: round(float(v), 6) for level, v in zip(self.levels, p)},
+                }
+        return results
+
+    def _records_frame(self, records: List[dict]) -> pd.DataFrame:
+        """
+        Фрейм записей с колонками, названными ключевыми словами REQUIRED_COLUMNS.
+        Колонка находится по каждой записи отдельно (как find_column_name по ее ключам): в общем батче
+        записи разных запросов могут называть колонки по-разному ('Опыт работы' вместо полного заголовка).
+        Нет колонки — значение None, запись не пройдет разбор (level = None).
+        """
+        columns = self.handler.REQUIRED_COLUMNS
+        # Набор ключей обычно общий для всех записей запроса — колонки ищутся один раз на набор
+        resolved: Dict[tuple, list] = {}
+        rows = []
+        for record in records:
+            keys = tuple(record)
+            names = resolved.get(keys)
+            if names is None:
+                names = resolved[keys] = [next((key for key in keys if keyword.lower() in str(key).lower()), None)
+                                          for keyword in columns]
+            rows.append([record[name] if name is not None else None for name in names])
+        return pd.DataFrame(rows, columns=columns)
+
+    def _predict_frame(self, df: pd.DataFrame) -> Dict[int, List[float]]:
+        """Вероятности уровней по строкам df (номер строки в запросе -> список в порядке levels)."""
+        features = self.handler.handle(df)
+        if features['x'].shape[0] == 0:
+            return {}
+        proba = self.model.predict_proba(features['x'])
+        return {int(row): p.tolist() for row, p in zip(features['index'], proba)}
@@ -0,0 +1,182 @@
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.compact_model import load_model
+from utils.prediction_cache import PredictionCache, artifacts_version, prediction_keys
+from utils.transformer_utils import load_transformer
+from .base import Handler
+from .transformation import FeatureExtractionHandler
+
+class PredictionHandler(Handler):
+    """
+    Обработчик, применяющий обученную модель к матрице признаков.
+    Возвращает DataFrame с идентификаторами строк, уровнем и вероятностями уровней.
+    """
+    def __init__(self, model, level_map: Dict[int, str]):
+        """
+        Args:
+            model: Обученный классификатор sklearn (с predict_proba).
+            level_map: Словарь перевода кодов классов в названия уровней (0 -> 'junior').
+        """
+        self.model = model
+        self.levels = [level_map[int(c)] for c in model.classes_]
+
+    def handle(self, data: dict) -> pd.DataFrame:
+        """
+        Args:
+            data: Результат FeatureExtractionHandler: 'x' — признаки, 'index' — идентификаторы строк.
+
+        Returns:
+            DataFrame с колонками row_id, level и p_<уровень>.
+        """
+        preds = pd.DataFrame({'row_id': data['index']})
+        if data['x'].shape[0]:
+            proba = self.model.predict_proba(data['x'])
+            preds['level'] = [self.levels[i] for i in proba.argmax(axis=1)]
+            for i, level in enumerate(self.levels):
+                preds[f'p_{level}'] = proba[:, i]
+        else:
+            preds['level'] = pd.Series(dtype=object)
+            for level in self.levels:
+                preds[f'p_{level}'] = pd.Series(dtype='float64')
+        return super().handle(preds)
+
+
+class PredictionCacheHandler(Handler):
+    """
+    Обработчик кэша предсказаний перед цепочкой инференса: строки чанка, уже оцененные
+    на той же версии артефактов (по хэшу сырых полей), берутся из кэша, остальные
+    проходят извлечение признаков и модель, а их вероятности сохраняются в кэш.
+    Дальше передается DataFrame предсказаний того же вида, что у PredictionHandler, в порядке строк чанка.
+    """
+    def __init__(self, chain: Handler, cache: PredictionCache, version: str, levels: List[str]):
+        """
+        Args:
+            chain: Цепочка FeatureExtractionHandler -> PredictionHandler (без следующего обработчика).
+            cache: Кэш предсказаний (utils/prediction_cache.py).
+            version: Версия артефактов (artifacts_version), входит в ключи кэша.
+            levels: Уровни в порядке классов модели (колонки p_<уровень>).
+        """
+        self.chain = chain
+        self.cache = cache
+        self.version = version
+        self.levels = levels
+        cache.set_version(version)
+
+    def handle(self, df: pd.DataFrame) -> pd.DataFrame:
+        keys = prediction_keys(df, FeatureExtractionHandler.REQUIRED_COLUMNS, self.version)
+        found = self.cache.get_many(keys)
+        missed = np.array([row for row, key in enumerate(keys) if key not in found], dtype=np.int64)
+        probabilities = {row: found[key] for row, key in enumerate(keys) if key in found}
+        if missed.size:
+            # Промахи идут в цепочку с номерами строк чанка вместо индекса: по ним результаты встают на место
+            computed = self.chain.handle(df.iloc[missed].set_axis(pd.RangeIndex(missed.size)))
+            values = computed[[f'p_{level}' for level in self.levels]].to_numpy()
+            new = dict.fromkeys((keys[row] for row in missed), None)
+            for pos, p in zip(computed['row_id'].to_numpy(), values):
+                new[keys[missed[pos]]] = probabilities[int(missed[pos])] = p.tolist()
+            # Строки, не прошедшие фильтр IT-специалистов, кэшируются как None
+            self.cache.put_many(new)
+
+        rows = [row for row in range(len(keys)) if probabilities.get(row) is not None]
+        proba = np.array([probabilities[row] for row in rows], dtype=np.float64).reshape(len(rows), len(self.levels))
+        preds = pd.DataFrame({'row_id': df.index[rows]})
+        preds['level'] = pd.Series([self.levels[i] for i in proba.argmax(axis=1)], dtype=object)
+        for i, level in enumerate(self.levels):
+            preds[f'p_{level}'] = proba[:, i]
+        return super().handle(preds)
+
+    def close(self) -> None:
+        s = self.cache.stats()
+        print(f"[{self.__class__.__name__}] Из кэша: {s['hits_memory'] + s['hits_disk']}, "
+              f"вычислено: {s['misses']} (доля попаданий {s['hit_rate']:.1%})")
+        super().close()
+
+
+class PredictionWriterHandler(Handler):
+    """
+    Потоковая запись предсказаний в CSV или Parquet (по расширению выходного файла).
+    Каждый чанк дописывается сразу; для Parquet требуется pyarrow.
+    """
+    def __init__(self, out_path: str):
+        """
+        Args:
+            out_path: Путь к выходному файлу (.csv или .parquet).
+        """
+        self.out_path = out_path
+        self.rows = 0
+        self._parquet_writer = None
+        self._started = False
+
+    def handle(self, preds: pd.DataFrame) -> str:
+        """Дописывает чанк предсказаний в выходной файл."""
+        if self.out_path.endswith('.parquet'):
+            self._write_parquet(preds)
+        else:
+            preds.to_csv(self.out_path, mode='a' if self._started else 'w', header=not self._started, index=False)
+        self._started = True
+        self.rows += len(preds)
+        return super().handle(f"[{self.__class__.__name__}] Записано предсказаний: {self.rows}")
+
+    def close(self) -> None:
+        """Закрывает выходной файл."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        print(f"[{self.__class__.__name__}] Записано предсказаний: {self.rows} в: {self.out_path}")
+        super().close()
+
+    def _write_parquet(self, preds: pd.DataFrame) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Для записи Parquet установите pyarrow: pip install pyarrow")
+        if preds.empty:
+            return  # у пустого чанка схема колонок не выводится
+        table = pa.Table.from_pandas(preds, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.out_path, table.schema)
+        self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+
+
+def build_scoring_chain(model_path: str, level_map: Dict[int, str],
+                        res_dir: str = FeatureExtractionHandler.RES_DIR,
+                        next_handler: Optional[Handler] = None, cache_dir: Optional[str] = None,
+                        cache_ttl_s: Optional[float] = None, cache_max_bytes: Optional[int] = None) -> Handler:
+    """
+    Собирает цепочку инференса FeatureExtractionHandler(is_training=False) -> PredictionHandler.
+    Модель и трансформеры загружаются один раз; функция пригодна как фабрика для пула процессов.
+
+    Args:
+        model_path: Путь к обученной модели (.pkl; компактный .npz — только если pickle нет).
+        level_map: Словарь перевода кодов классов в названия уровней.
+        res_dir: Директория с vectorizer.pkl и scaler.pkl.
+        next_handler: Обработчик, получающий DataFrame предсказаний (например, PredictionWriterHandler).
+        cache_dir: Директория дискового кэша предсказаний (None — без кэша). Перед цепочкой
+                   ставится PredictionCacheHandler; воркеры пула делят один файл кэша.
+        cache_ttl_s: Время жизни записи кэша, с.
+        cache_max_bytes: Лимит размера дискового кэша, байт.
+
+    Returns:
+        Первый обработчик цепочки.
+    """
+    transformer = FeatureExtractionHandler(
+        is_training=False,
+        vectorizer=load_transformer(os.path.join(res_dir, "vectorizer.pkl")),
+        scaler=load_transformer(os.path.join(res_dir, "scaler.pkl")),
+    )
+    prediction = PredictionHandler(load_model(model_path, prefer_compact=False), level_map)
+    predictor = transformer.set_next(prediction)
+    head = transformer
+    if cache_dir is not None:
+        # Пакетному прогону хватает дискового уровня: повторы внутри одного файла редки
+        cache = PredictionCache(maxsize=0, cache_dir=cache_dir, ttl_s=cache_ttl_s, max_bytes=cache_max_bytes)
+        version = artifacts_version(res_dir, [model_path, os.path.splitext(model_path)[0] + '.npz'])
+        head = predictor = PredictionCacheHandler(transformer, cache, version, prediction.levels)
+    if next_handler is not None:
+        predictor.set_next(next_handler)
+    return head
@@ -1,49 +1,286 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 
-import joblib
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 
 from utils.age_parser import extract_age
 from utils.city_parser import extract_city
+from utils.column_parsers import (is_it_developer_column, parse_age_column, parse_city_column,
+                                  parse_experience_column, parse_male_column, parse_salary_column)
 from utils.experience_parser import extract_experience
 from utils.helpers import find_column_name
-from utils.it_filter import is_it_developer
-from utils.level_classifier import classify_developer_level
+from utils.level_classifier import LEVEL_CODES, classify_developer_levels
 from utils.salary_parser import extract_salary
+from utils.transformer_utils import artifacts_hash, get_fitted_transformer, load_transformer
 from .base import Handler
 
+_worker_handler = None
+
+
+def _init_worker(is_training: bool, sparse: bool, vectorizer, scaler) -> None:
+    """Передает обученные трансформеры в процесс-воркер один раз, а не с каждым шардом."""
+    global _worker_handler
+    _worker_handler = FeatureExtractionHandler(is_training, sparse, vectorizer, scaler)
+
+
+def _prepare_shard(shard: pd.DataFrame) -> tuple:
+    return _worker_handler._prepare(shard)
+
+
+def _transform_shard(data: pd.DataFrame):
+    return _worker_handler._transform(data, _worker_handler.vectorizer, _worker_handler.scaler)
+
+
 class FeatureExtractionHandler(Handler):
     """Извлекает признаки и размечает уровни IT-специалистов (Jr/Mid/Sr)."""
     RES_DIR = "resources"
-    LEVEL_MAP = {'junior': 0, 'middle': 1, 'senior': 2}
+    LEVEL_MAP = LEVEL_CODES
+    NUMERIC_FEATURES = ['male', 'sal', 'age', 'exp']
+    ROWWISE_MAX_ROWS = 16
+    # Ключевые слова, по которым find_column_name находит нужные колонки выгрузки
+    REQUIRED_COLUMNS = ['Ищет работу', 'должность', 'ЗП', 'Пол, возраст', 'Опыт', 'Город']
+    # Меньшие фреймы быстрее разобрать в одном процессе, чем переслать шарды воркерам
+    PARALLEL_MIN_ROWS = 10000
+    TFIDF_MAX_FEATURES = 500
+    HASHING_FEATURES = 2 ** 14
 
-    def __init__(self, is_training: bool = True):
-        """ Инициализирует обработчик."""
+    def __init__(self, is_training: bool = True, sparse: bool = True, vectorizer=None, scaler=None,
+                 n_jobs: int = 1, hashing: bool = False):
+        """
+        Инициализирует обработчик.
+
+        Args:
+            is_training: Режим обучения: формирует целевую переменную y и, если трансформеры не переданы,
+                         обучает их на входном фрейме (повторно — только если изменились данные).
+                         Поток из нескольких чанков требует заранее обученных трансформеров
+                         (TransformerFitHandler): обучение на первом чанке отклоняется.
+            sparse: Возвращать матрицу признаков в формате scipy.sparse CSR (иначе плотный np.ndarray).
+            vectorizer, scaler: Уже загруженные трансформеры (для долгоживущих процессов).
+                                Если не заданы, берутся из реестра utils/transformer_utils.py.
+            n_jobs: Число процессов для разбора и трансформации (-1 — все ядра). При n_jobs > 1
+                    фрейм делится на шарды по строкам, результат совпадает с однопроцессным побайтно.
+            hashing: Векторизовать текст HashingVectorizer вместо TF-IDF. Словарь не хранится,
+                     признаки не зависят от обучающих данных (подходит для потокового обучения).
+        """
         self.is_training = is_training
+        self.sparse = sparse
+        self.vectorizer = vectorizer
+        self.scaler = scaler
+        self.n_jobs = os.cpu_count() if n_jobs < 0 else n_jobs
+        self.hashing = hashing
+        self._metadata = None
+        self._pool = None
+        self._fitted = None
+        self._fitted_on_chunk = False
 
     def handle(self, df: pd.DataFrame) -> dict:
         """ Преобразует сырой DataFrame в очищенную матрицу признаков. """
-        pos_col, last_col = find_column_name(df, 'Ищет работу'), find_column_name(df, 'должность')
-        data = pd.DataFrame({
-            'sal': df[find_column_name(df, 'ЗП')].apply(extract_salary),
-            'age': df[find_column_name(df, 'Пол, возраст')].apply(extract_age),
-            'exp': df[find_column_name(df, 'Опыт')].apply(extract_experience),
-            'male': df[find_column_name(df, 'Пол, возраст')].apply(lambda x: 1 if 'Мужчина' in str(x) else 0),
-            'city': df[find_column_name(df, 'Город')].apply(extract_city),
-            'pos': (df[pos_col].fillna('') + ' ' + df[last_col].fillna('')).str.lower()
+        if self._fitted_on_chunk:
+            # Словарь TF-IDF и статистики скалера, обученные на первом чанке, зависели бы от chunksize
+            raise ValueError("Трансформеры обучаются на всем потоке: в потоковом режиме обучите их заранее "
+                             "(TransformerFitHandler) и передайте в vectorizer/scaler.")
+        fit_pending = self.is_training and self.vectorizer is None and self._fitted is None
+        transformers = None if fit_pending else self._get_transformers()
+        prepared = self._prepare_frames(df, transformers)
+
+        if fit_pending:
+            transformers = self._get_transformers(pd.concat([data for data, _ in prepared]))
+            self._fitted_on_chunk = True
+        vec, scaler = transformers
+        if len(prepared) > 1:
+            xs = list(self._get_pool(transformers).map(_transform_shard, [data for data, _ in prepared]))
+        else:
+            xs = [self._transform(prepared[0][0], vec, scaler)]
+
+        features, transformer_hash = self._describe(vec, scaler)
+        xs = [x for x in xs if x is not None]
+        if not xs:
+            # sklearn-трансформеры не принимают 0 строк (пустой чанк или запрос без IT-специалистов)
+            x_data = np.zeros((0, len(features)), dtype=np.float32)
+            x_data = sp.csr_matrix(x_data) if self.sparse else x_data
+        elif len(xs) == 1:
+            x_data = xs[0]
+        else:
+            x_data = sp.vstack(xs, format='csr') if self.sparse else np.vstack(xs)
+        y_data = np.concatenate([y for _, y in prepared]) if self.is_training else None
+        return super().handle({
+            'x': x_data, 'y': y_data, 'index': np.concatenate([data.index.to_numpy() for data, _ in prepared]),
+            'features': features, 'transformer_hash': transformer_hash,
         })
 
-        data = data[data['pos'].apply(is_it_developer)].dropna(subset=['sal', 'age', 'exp'])
+    def close(self) -> None:
+        """Останавливает пул процессов, завершает поток обучения и передает сигнал дальше."""
+        if self._pool is not None:
+            self._pool[1].shutdown()
+            self._pool = None
+        # Следующий поток (новый файл) обучает трансформеры заново
+        self._fitted = None
+        self._fitted_on_chunk = False
+        super().close()
+
+    def _prepare_frames(self, df: pd.DataFrame, transformers: Optional[tuple]) -> list:
+        """Разбор фрейма: [(data, y)] — один элемент или по элементу на шард пула процессов."""
+        if self.n_jobs > 1 and len(df) >= self.PARALLEL_MIN_ROWS:
+            # Шарды — последовательные куски строк. Все шаги построчные (TF-IDF нормирует
+            # каждую строку отдельно), поэтому склейка в исходном порядке совпадает с серийным путем
+            bounds = np.linspace(0, len(df), self.n_jobs + 1).astype(int)
+            shards = [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+            return list(self._get_pool(transformers).map(_prepare_shard, shards))
+        return [self._prepare(df)]
+
+    def _get_transformers(self, fit_data: Optional[pd.DataFrame] = None) -> tuple:
+        """
+        Возвращает (vectorizer, scaler): переданные явно, обученные в текущем потоке
+        или полученные из реестра. С fit_data обучает трансформеры (если хэш данных
+        и параметров изменился) и закрепляет их до конца потока.
+        """
+        if self.vectorizer is not None:
+            return self.vectorizer, self.scaler
+        if self._fitted is not None:
+            return self._fitted
+        vec_path, scaler_path = os.path.join(self.RES_DIR, "vectorizer.pkl"), os.path.join(self.RES_DIR, "scaler.pkl")
+        # На 0 строк обучить нельзя — используются сохраненные артефакты
+        if fit_data is None or fit_data.empty:
+            return load_transformer(vec_path), load_transformer(scaler_path)
+
+        return self._fit_transformers(fit_data['pos'] + " " + fit_data['city'], fit_data[['sal', 'age', 'exp']])
+
+    def _fit_transformers(self, texts: pd.Series, numeric: pd.DataFrame) -> tuple:
+        """Обучает (или берет из реестра при неизменном хэше обучения) векторайзер и скалер и закрепляет их."""
+        # sklearn импортируется только для обучения: на инференсе трансформеры приходят из pickle
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+        from sklearn.preprocessing import StandardScaler
+        if self.hashing:
+            vectorizer = HashingVectorizer(n_features=self.HASHING_FEATURES, alternate_sign=False)
+        else:
+            vectorizer = TfidfVectorizer(max_features=self.TFIDF_MAX_FEATURES)
+        vec_path, scaler_path = os.path.join(self.RES_DIR, "vectorizer.pkl"), os.path.join(self.RES_DIR, "scaler.pkl")
+        vec = get_fitted_transformer(vectorizer, vec_path, texts, True)
+        scaler = get_fitted_transformer(StandardScaler(), scaler_path, numeric, True)
+        self._fitted = (vec, scaler)
+        return vec, scaler
+
+    def _get_pool(self, transformers: Optional[tuple]) -> ProcessPoolExecutor:
+        """
+        Пул процессов живет между вызовами (чанками) и пересоздается, только если сменились
+        трансформеры. transformers=None — подойдет любой пул (разбор их не использует).
+        """
+        if self._pool is not None and (transformers is None or self._pool[0] == transformers):
+            return self._pool[1]
+        if self._pool is not None:
+            self._pool[1].shutdown()
+        vec, scaler = transformers or (None, None)
+        pool = ProcessPoolExecutor(self.n_jobs, initializer=_init_worker,
+                                   initargs=(self.is_training, self.sparse, vec, scaler))
+        self._pool = (transformers, pool)
+        return pool
+
+    def _prepare(self, df: pd.DataFrame) -> tuple:
+        """
+        Разбирает колонки, оставляет IT-специалистов и размечает уровни.
+
+        Returns:
+            (data, y): очищенный DataFrame признаков и вектор уровней (None вне режима обучения).
+        """
+        pos_col, last_col = find_column_name(df, 'Ищет работу'), find_column_name(df, 'должность')
+        data = self._parse_columns(df)
+        data['pos'] = (df[pos_col].fillna('') + ' ' + df[last_col].fillna('')).str.lower()
+
+        data = data[is_it_developer_column(data['pos'])].dropna(subset=['sal', 'age', 'exp'])
         y_data = None
         if self.is_training:
-            y_data = data.apply(lambda r: self.LEVEL_MAP[classify_developer_level(r['exp'], r['pos'])], axis=1).values
+            y_data = classify_developer_levels(data['exp'].to_numpy(), data['pos'])
+        return data, y_data
 
-        vec = joblib.load(os.path.join(self.RES_DIR, "vectorizer.pkl"))
-        scaler = joblib.load(os.path.join(self.RES_DIR, "scaler.pkl"))
-
-        t_feats = vec.transform(data['pos'] + " " + data['city']).toarray()
+    def _transform(self, data: pd.DataFrame, vec, scaler):
+        """Строит матрицу признаков; None, если после фильтрации не осталось строк."""
+        if data.empty:
+            return None
+        t_feats = vec.transform(data['pos'] + " " + data['city'])
         n_feats = scaler.transform(data[['sal', 'age', 'exp']])
 
-        x_data = np.hstack([data[['male']].values, n_feats, t_feats]).astype(np.float32)
-        return super().handle({'x': x_data, 'y': y_data})
\ No newline at end of file
+        # TF-IDF более чем на 99% состоит из нулей — по умолчанию не уплотняем его
+        if self.sparse:
+            return sp.hstack([sp.csr_matrix(data[['male']].values), sp.csr_matrix(n_feats), t_feats],
+                             format='csr', dtype=np.float32)
+        return np.hstack([data[['male']].values, n_feats, t_feats.toarray()]).astype(np.float32)
+
+    def _parse_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Разбирает сырые колонки в числовые признаки и город."""
+        gender_age = df[find_column_name(df, 'Пол, возраст')]
+        salary, experience, city = (df[find_column_name(df, kw)] for kw in ('ЗП', 'Опыт', 'Город'))
+        if len(df) <= self.ROWWISE_MAX_ROWS:
+            # На единичных записях (онлайн-инференс) фиксированные накладные расходы pandas .str
+            # больше самого разбора, поэтому используются скалярные парсеры — результат тот же
+            return pd.DataFrame({
+                'sal': [extract_salary(v) for v in salary],
+                'age': [extract_age(v) for v in gender_age],
+                'exp': [extract_experience(v) for v in experience],
+                'male': [1 if 'Мужчина' in str(v) else 0 for v in gender_age],
+                'city': [extract_city(v) for v in city],
+            }, index=df.index).astype({'sal': 'float64', 'age': 'int64', 'exp': 'int64', 'male': 'int64'})
+        # Колонки разбираются целиком векторными парсерами (см. utils/column_parsers.py)
+        return pd.DataFrame({
+            'sal': parse_salary_column(salary),
+            'age': parse_age_column(gender_age),
+            'exp': parse_experience_column(experience),
+            'male': parse_male_column(gender_age),
+            'city': parse_city_column(city),
+        })
+
+    def _describe(self, vec, scaler) -> tuple:
+        """Схема признаков и хэш трансформеров; вычисляются один раз на пару трансформеров."""
+        if self._metadata is None or self._metadata[0] != (vec, scaler):
+            if not hasattr(vec, 'vocabulary_'):
+                # HashingVectorizer: словаря нет, колонки — корзины хэша
+                text_features = [f'hash_{i}' for i in range(vec.n_features)]
+            else:
+                text_features = list(vec.get_feature_names_out())
+            features = self.NUMERIC_FEATURES + text_features
+            paths = [os.path.join(self.RES_DIR, "vectorizer.pkl"), os.path.join(self.RES_DIR, "scaler.pkl")]
+            self._metadata = ((vec, scaler), features, artifacts_hash(paths))
+        return self._metadata[1], self._metadata[2]
+
+
+class TransformerFitHandler(FeatureExtractionHandler):
+    """
+    Первый проход потокового обучения: разбирает чанки так же, как FeatureExtractionHandler,
+    и копит только данные для обучения (текст должности с городом и числовые признаки IT-специалистов).
+    По окончании потока обучает векторайзер и скалер на всех строках разом — артефакты и хэш обучения
+    совпадают с обработкой файла целиком и не зависят от chunksize. Второй проход строит признаки
+    готовыми трансформерами (vectorizer/scaler у FeatureExtractionHandler).
+
+    Тексты хранятся категориальными: должности и города повторяются, в памяти остаются
+    уникальные строки и коды, а не сырые чанки.
+    """
+    def __init__(self, n_jobs: int = 1, hashing: bool = False):
+        """
+        Args:
+            n_jobs: Число процессов для разбора чанков (-1 — все ядра).
+            hashing: Обучать скалер для HashingVectorizer вместо TF-IDF.
+        """
+        super().__init__(is_training=True, n_jobs=n_jobs, hashing=hashing)
+        self.transformers = None
+        self._texts = []
+        self._numeric = []
+
+    def handle(self, df: pd.DataFrame) -> None:
+        for data, _ in self._prepare_frames(df, None):
+            self._texts.append((data['pos'] + " " + data['city']).astype('category'))
+            self._numeric.append(data[['sal', 'age', 'exp']])
+        return None
+
+    def close(self) -> None:
+        """Обучает трансформеры на всем потоке, затем останавливает пул и передает сигнал дальше."""
+        from pandas.api.types import union_categoricals
+        if self._texts and sum(map(len, self._texts)):
+            texts = pd.Series(union_categoricals(self._texts, ignore_order=True))
+            self.transformers = self._fit_transformers(texts, pd.concat(self._numeric, ignore_index=True))
+        else:
+            # На 0 строк обучить нельзя — используются сохраненные артефакты
+            self.transformers = self._get_transformers()
+        self._texts, self._numeric = [], []
+        super().close()
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.age_parser import extract_age
+from utils.city_parser import extract_city
+from utils.column_parsers import (is_it_developer_column, parse_age_column, parse_city_column,
+                                  parse_experience_column, parse_male_column, parse_salary_column)
+from utils.experience_parser import extract_experience
+from utils.it_filter import is_it_developer
+from utils.salary_parser import extract_salary
+
+VALUES = [
+    None, np.nan, '', ' ', 'nan', 'Не указано', 5, 3.5,
+    '80 000 руб.', '1500 EUR', '2 000 usd', '500 KZT', '1000 грн', '100 USD 200 EUR', 'договорная', '١٢٣ руб.',
+    'Мужчина , 32 года , родился 1 января', 'Женщина , 41 год', 'Мужчина', 'мужчина, 25 лет', 'Женщина , ١٢ лет',
+    'Опыт работы 5 лет 3 месяца', 'Опыт работы 2019 год', 'Опыт работы 8 месяцев', 'ОПЫТ РАБОТЫ 1 ГОД 1 МЕСЯЦ',
+    'Опыт работы 101 год', 'Опыт работы не указано',
+    'Москва , готов к переезду', 'Санкт-Петербург,не готов', ' Казань ', ',',
+    'Senior Python Developer', 'QA engineer', 'c++ программист', 'Бухгалтер', 'Frontend стажер',
+]
+PARSERS = [
+    (parse_salary_column, extract_salary),
+    (parse_age_column, extract_age),
+    (parse_experience_column, extract_experience),
+    (parse_male_column, lambda v: 1 if 'Мужчина' in str(v) else 0),
+    (parse_city_column, extract_city),
+    (is_it_developer_column, is_it_developer),
+]
+
+
+@pytest.mark.parametrize('vectorized, scalar', PARSERS, ids=[vectorized.__name__ for vectorized, _ in PARSERS])
+@pytest.mark.parametrize('col', [
+    pd.Series(VALUES, dtype=object),
+    pd.Series([v for v in VALUES if isinstance(v, str)] + [None], dtype='str'),
+    pd.Series([np.nan] * 3),
+    pd.Series([None] * 3, dtype=object),
+    pd.Series([1.0, np.nan, 2019.0]),
+    pd.Series([], dtype=object),
+], ids=['object', 'str', 'all_nan', 'all_none', 'numeric', 'empty'])
+def test_vectorized_matches_scalar(vectorized, scalar, col):
+    """Векторный парсер дает те же значения, что построчный .apply: пропуски, не строки, Unicode-цифры, регистр."""
+    result = vectorized(col)
+    expected = col.apply(scalar)
+    assert len(result) == len(col) and result.index.equals(col.index)
+    assert [None if pd.isna(v) else v for v in result] == [None if pd.isna(v) else v for v in expected]
+
+
+def test_repeated_values_and_index():
+    """Разбор по уникальным значениям сохраняет порядок и индекс исходной колонки."""
+    col = pd.Series(['Москва , готов к переезду', None, 'Казань', 'Москва , готов к переезду'] * 3,
+                    index=np.arange(12)[::-1] * 10)
+    pd.testing.assert_series_equal(parse_city_column(col), col.apply(extract_city), check_dtype=False)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+import scipy.sparse as sp
+
+from src.output import ColumnarSaveHandler
+from utils.columnar import convert_csv, iter_frames, open_feature_table
+
+
+def test_convert_csv_widens_types_across_chunks(tmp_path):
+    """Тип колонки, который меняется между чанками, расширяется до общего, а не обрывает конвертацию."""
+    csv = tmp_path / 'resumes.csv'
+    csv.write_text('id,empty_first,text,num,flag,empty\n'
+                   '1,,a,1,True,\n'
+                   '2,,b,2,False,\n'
+                   '3,x,5,2.5,True,\n'
+                   ',y,6,3,False,\n'
+                   '5,z,007,4,True,\n', encoding='utf-8')
+    assert convert_csv(str(csv), str(tmp_path / 'resumes.arrow'), 'utf-8', ',', chunksize=2) == 5
+    df = next(iter_frames(str(tmp_path / 'resumes.arrow')))
+    expected = pd.read_csv(csv, dtype={'text': str})
+    pd.testing.assert_frame_equal(df.drop(columns='empty'), expected.drop(columns='empty'))
+    assert df['text'].tolist() == ['a', 'b', '5', '6', '007']
+    assert df['empty'].isna().all() and pd.api.types.is_string_dtype(df['empty'])
+
+
+def test_convert_csv_numbers_then_text(tmp_path):
+    csv = tmp_path / 'resumes.csv'
+    csv.write_text('id,value\n1,a\n2,b\nq,c\n', encoding='utf-8')
+    convert_csv(str(csv), str(tmp_path / 'resumes.parquet'), 'utf-8', ',', chunksize=2)
+    assert next(iter_frames(str(tmp_path / 'resumes.parquet')))['id'].tolist() == ['1', '2', 'q']
+
+
+@pytest.mark.parametrize('ext', ['arrow', 'parquet'])
+@pytest.mark.parametrize('sparse', [True, False], ids=['csr', 'dense'])
+def test_chunked_feature_table_is_one_batch(tmp_path, ext, sparse):
+    """Чанки ColumnarSaveHandler склеиваются в один батч: open_feature_table не копирует массивы."""
+    path = str(tmp_path / f'features.{ext}')
+    saver = ColumnarSaveHandler(path)
+    rng = np.random.RandomState(0)
+    xs, ys = [], []
+    for start in range(0, 3000, 1000):
+        x = sp.random(1000, 20, density=0.2, format='csr', dtype=np.float32, random_state=rng)
+        x = x if sparse else x.toarray()
+        y = rng.randint(0, 3, 1000).astype(np.int8)
+        saver.handle({'x': x, 'y': y, 'index': np.arange(start, start + 1000) * 2,
+                      'features': [f'f{i}' for i in range(20)], 'transformer_hash': 'hash'})
+        xs.append(x)
+        ys.append(y)
+    saver.close()
+
+    x, y, row_ids = open_feature_table(path)
+    expected = sp.vstack(xs).toarray() if sparse else np.vstack(xs)
+    np.testing.assert_array_equal(x.toarray() if sparse else x, expected)
+    np.testing.assert_array_equal(y, np.concatenate(ys))
+    np.testing.assert_array_equal(row_ids, np.arange(3000) * 2)
+    assert not (tmp_path / f'features.{ext}.parts').exists()
+    if ext == 'arrow':
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        assert all(column.num_chunks == 1 for column in table.columns)
@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from benchmarks.synthetic import generate_resumes
+from src.transformation import FeatureExtractionHandler
+from utils.compact_model import export_compact_model, load_compact_model, load_model
+from utils.transformer_utils import load_transformer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def workspace(tmp_path_factory):
+    """Трансформеры и признаки синтетических резюме во временной директории (resources/ — относительный путь)."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(tmp_path_factory.mktemp('compact'))
+        train = FeatureExtractionHandler(is_training=True).handle(generate_resumes(3000, seed=0))
+        test = FeatureExtractionHandler(is_training=False).handle(generate_resumes(1000, seed=1))
+        yield train, test, load_transformer('resources/vectorizer.pkl'), load_transformer('resources/scaler.pkl')
+
+
+@pytest.mark.parametrize('model', [
+    RandomForestClassifier(n_estimators=20, random_state=0),
+    LogisticRegression(max_iter=500),
+], ids=['rf', 'lr'])
+def test_predict_proba_matches_sklearn(workspace, model, tmp_path):
+    train, test, vectorizer, scaler = workspace
+    model.fit(train['x'], train['y'])
+    export_compact_model(model, str(tmp_path / 'model.npz'), vectorizer=vectorizer, scaler=scaler)
+    compact = load_compact_model(str(tmp_path / 'model.npz'))
+    np.testing.assert_array_equal(compact.classes_, model.classes_)
+    np.testing.assert_allclose(compact.predict_proba(test['x']), model.predict_proba(test['x']), rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(compact.predict(test['x']), model.predict(test['x']))
+
+
+def test_transformers_match_sklearn(workspace, tmp_path):
+    """TF-IDF и скалер из .npz дают те же признаки, что трансформеры sklearn из pickle."""
+    train, _, vectorizer, scaler = workspace
+    model = LogisticRegression(max_iter=500).fit(train['x'], train['y'])
+    export_compact_model(model, str(tmp_path / 'model.npz'), vectorizer=vectorizer, scaler=scaler)
+    compact = load_compact_model(str(tmp_path / 'model.npz'))
+
+    texts = ['python-разработчик москва', 'Senior Java developer, Санкт-Петербург', '', 'бухгалтер',
+             'c++ c# 1с разработчик 1с']
+    np.testing.assert_allclose(compact.vectorizer.transform(texts).toarray(), vectorizer.transform(texts).toarray(),
+                               rtol=0, atol=1e-12)
+    assert compact.vectorizer.get_feature_names_out().tolist() == vectorizer.get_feature_names_out().tolist()
+    numeric = pd.DataFrame([[100000.0, 30, 24], [0.0, 18, 0], [350000.0, 65, 240]], columns=['sal', 'age', 'exp'])
+    np.testing.assert_allclose(compact.scaler.transform(numeric), scaler.transform(numeric), rtol=0, atol=1e-12)
+
+    sklearn_x = FeatureExtractionHandler(is_training=False, vectorizer=vectorizer, scaler=scaler).handle(
+        generate_resumes(500, seed=2))['x']
+    compact_x = FeatureExtractionHandler(is_training=False, vectorizer=compact.vectorizer,
+                                         scaler=compact.scaler).handle(generate_resumes(500, seed=2))['x']
+    np.testing.assert_array_equal(compact_x.toarray(), sklearn_x.toarray())
+
+
+def test_compact_inference_does_not_import_sklearn(workspace):
+    """Предиктор на компактной модели не загружает sklearn и joblib."""
+    train, _, vectorizer, scaler = workspace
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(train['x'], train['y'])
+    joblib.dump(model, 'resources/classifier_rf.pkl')
+    export_compact_model(model, 'resources/classifier_rf.npz', vectorizer=vectorizer, scaler=scaler)
+    assert type(load_model('resources/classifier_rf.pkl')).__name__ == 'CompactForest'
+    code = ("import sys\n"
+            "from benchmarks.synthetic import generate_resumes\n"
+            "from src.predictor import LevelPredictor\n"
+            "predictor = LevelPredictor('resources/classifier_rf.pkl', {0: 'junior', 1: 'middle', 2: 'senior'})\n"
+            "df = generate_resumes(50, seed=3)\n"
+            "results = predictor.predict_records(df.astype(object).where(df.notna(), None).to_dict('records'))\n"
+            "assert any(r['level'] for r in results)\n"
+            "print(sorted(m for m in ('sklearn', 'joblib') if m in sys.modules))\n")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT))
+    assert result.stdout.strip() == '[]'
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from src.dedup import DedupHandler
+
+COLUMNS = ['Ищет работу на должность:', 'ЗП', 'Пол, возраст', 'Опыт (двойное нажатие для полной версии)', 'Город']
+BASE = ['Python-разработчик', '150 000 руб.', 'Мужчина , 29 лет , родился 3 марта 1990',
+        'Опыт работы 6 лет 2 месяца  Март 2013 — по настоящее время', 'Москва , готов к переезду']
+
+
+def _frame(*changes) -> pd.DataFrame:
+    """Базовое резюме и его варианты: каждое изменение — словарь {номер колонки: значение}."""
+    rows = [BASE] + [[change.get(i, value) for i, value in enumerate(BASE)] for change in changes]
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def test_exact_duplicates_ignore_case_and_spaces():
+    df = _frame({0: 'python-разработчик'}, {4: 'Москва ,  готов к переезду '}, {1: '90 000 руб.'})
+    handler = DedupHandler(threshold=1.0)
+    assert handler.handle(df).index.tolist() == [0, 3]
+    assert handler.stats == {'rows': 4, 'exact': 2, 'near': 0}
+
+
+def test_trivial_edits_are_near_duplicates():
+    """Правка одного символа в короткой должности или другая ЗП не делают резюме новым при пороге 0.9."""
+    df = _frame({0: 'Python-разработчик!'}, {1: '160 000 руб.'}, {3: 'Опыт работы 6 лет 3 месяца  Март 2013 — по '
+                                                                   'настоящее время'})
+    handler = DedupHandler(threshold=0.9)
+    assert handler.handle(df).index.tolist() == [0]
+    assert handler.stats == {'rows': 4, 'exact': 0, 'near': 3}
+
+
+def test_different_resumes_are_kept():
+    """Другой человек с той же должностью и то же резюме в другом городе — не дубликаты."""
+    df = _frame({1: '60 000 руб.', 2: 'Женщина , 41 год', 3: 'Опыт работы 1 год 1 месяц'},
+                {4: 'Казань , готов к переезду'})
+    handler = DedupHandler(threshold=0.9)
+    assert handler.handle(df).index.tolist() == [0, 1, 2]
+
+
+def test_duplicates_across_chunks():
+    """Состояние сохраняется между чанками: результат совпадает с разбором всего фрейма."""
+    df = _frame({0: 'python-разработчик'}, {0: 'Python-разработчик!'}, {4: 'Казань'}, {0: 'Python-Разработчик!!'})
+    whole = DedupHandler(threshold=0.9).handle(df).index.tolist()
+    handler = DedupHandler(threshold=0.9)
+    chunks = [handler.handle(df.iloc[start:start + 2]) for start in range(0, len(df), 2)]
+    assert [i for chunk in chunks if chunk is not None for i in chunk.index] == whole == [0, 3]
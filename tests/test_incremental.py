@@ -0,0 +1,100 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_resumes
+from parse_data import DATA_DIR, ParseOptions, parse_data_pipeline
+from src.loaders import DataLoaderHandler
+from src.output import NpySaveHandler
+from src.transformation import FeatureExtractionHandler
+from utils.dataset_io import DatasetWriter, open_dataset, read_manifest
+from utils.row_index import RowIndex
+from utils.transformer_utils import load_transformer
+
+SALARY = 'ЗП'
+
+
+def _rows(data_dir: str) -> list:
+    """Строки датасета (признаки и уровень) без учета порядка: инкрементальный прогон может его менять."""
+    x, y = open_dataset(data_dir, mmap_mode=None)
+    x = x.toarray() if hasattr(x, 'toarray') else x
+    return sorted(row.tobytes() + np.int64(level).tobytes() for row, level in zip(x, y))
+
+
+def _full_reparse(csv_path: str, dense: bool) -> list:
+    """Полный разбор файла теми же трансформерами, что лежат в resources/ (без переобучения)."""
+    loader = DataLoaderHandler()
+    loader.set_next(FeatureExtractionHandler(
+        is_training=True, sparse=not dense, vectorizer=load_transformer('resources/vectorizer.pkl'),
+        scaler=load_transformer('resources/scaler.pkl'))).set_next(NpySaveHandler('full'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        loader.handle(csv_path)
+    return _rows('full')
+
+
+@pytest.fixture
+def resumes(tmp_path, monkeypatch) -> pd.DataFrame:
+    monkeypatch.chdir(tmp_path)
+    df = generate_resumes(3000, seed=0)
+    df.to_csv('resumes.csv', index=False)
+    return df
+
+
+@pytest.mark.parametrize('chunksize', [None, 700], ids=['whole', 'chunked'])
+@pytest.mark.parametrize('dense', [False, True], ids=['csr', 'dense'])
+def test_incremental_equals_full_reparse(resumes, chunksize, dense):
+    """
+    Удаленные, измененные, новые строки и лишние копии неизменных строк: датасет после инкрементального
+    прогона совпадает с полным разбором, а повторный прогон того же файла ничего не меняет.
+    """
+    options = ParseOptions(chunksize=chunksize, dense=dense, incremental=True)
+    parse_data_pipeline('resumes.csv', options)
+    rng = np.random.default_rng(1)
+    changed = resumes.drop(index=rng.choice(len(resumes), 300, replace=False))
+    changed.loc[changed.sample(150, random_state=2).index, SALARY] = '123456 руб.'
+    new = generate_resumes(300, seed=5)
+    changed = pd.concat([changed, changed.sample(200, random_state=3), new]).sample(frac=1, random_state=4)
+    changed.to_csv('changed.csv', index=False)
+
+    parse_data_pipeline('changed.csv', options)
+    expected = _full_reparse('changed.csv', dense)
+    assert _rows(DATA_DIR) == expected
+    assert read_manifest(DATA_DIR)['rows'] == len(expected)
+    parse_data_pipeline('changed.csv', options)
+    assert _rows(DATA_DIR) == expected
+
+    # Обратно к исходному файлу: копии и измененные строки удаляются, исчезнувшие строки разбираются заново
+    parse_data_pipeline('resumes.csv', options)
+    assert _rows(DATA_DIR) == _full_reparse('resumes.csv', dense)
+
+
+def test_finish_compacts_and_copies_duplicates(tmp_path):
+    """
+    Старый вход: a, a, b (не прошла фильтр), c. Новый: c, a, d (новая), c.
+    Вторая копия a удаляется из датасета, лишняя копия c дописывается копией строки c.
+    """
+    data_dir = str(tmp_path)
+    writer = DatasetWriter(data_dir)
+    writer.write(np.array([[1.0], [2.0], [3.0]]), np.array([0, 0, 1], dtype=np.int8), ['f'], 'hash')
+    writer.close()
+    a, b, c, d = np.array([10, 20, 30, 40], dtype=np.uint64)
+    index = RowIndex(data_dir, np.array([a, a, b, c]), np.array([0, 1, -1, 2]), dataset_rows=3)
+
+    assert index.add_input(np.array([c, a, d, c])).tolist() == [False, False, True, False]
+    writer = DatasetWriter(data_dir, append=True)
+    writer.write(np.array([[4.0]]), np.array([2], dtype=np.int8), ['f'], 'hash')
+    writer.close()
+    index.add_rows(np.array([2]))
+    stats = index.finish()
+
+    assert stats == {'input_rows': 4, 'new_rows': 1, 'unchanged_rows': 3, 'appended_rows': 2, 'deleted_rows': 1,
+                     'dataset_rows': 4}
+    x, y = open_dataset(data_dir, mmap_mode=None)
+    np.testing.assert_array_equal(x[:, 0], [1.0, 3.0, 4.0, 3.0])
+    np.testing.assert_array_equal(y, [0, 1, 2, 1])
+    loaded = RowIndex.load(data_dir, 'hash', 'dense')
+    assert loaded is not None
+    np.testing.assert_array_equal(x[loaded.offsets, 0], [3.0, 1.0, 4.0, 3.0])
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from utils.level_classifier import LEVEL_CODES, classify_developer_level, classify_developer_levels
+
+EXPERIENCE = [np.nan, -1.0, 0.0, 11.0, 11.999, 12.0, 12.001, 24.0, 35.999, 36.0, 36.001, 120.0]
+TITLES = [
+    '', 'python developer', 'Senior Python Developer', 'junior java developer', 'Ведущий программист',
+    'Стажер-разработчик', 'Team Lead', 'intern / trainee', 'senior junior developer', 'nan',
+]
+
+
+def _scalar(experience, titles):
+    return np.array([LEVEL_CODES[classify_developer_level(e, t)] for e, t in zip(experience, titles)], dtype=np.int8)
+
+
+def test_vectorized_matches_scalar_on_grid():
+    """Все сочетания стажа (пропуск, границы 12 и 36 месяцев) и должностей (пустая, с уровнем и без)."""
+    experience = [e for e in EXPERIENCE for _ in TITLES]
+    titles = [t for _ in EXPERIENCE for t in TITLES]
+    expected = _scalar(experience, titles)
+    result = classify_developer_levels(experience, titles)
+    assert result.dtype == np.int8
+    np.testing.assert_array_equal(result, expected)
+
+
+@pytest.mark.parametrize('experience, title, level', [
+    (np.nan, 'python developer', 'junior'),
+    (12.0, 'python developer', 'middle'),
+    (36.0, 'python developer', 'middle'),
+    (36.001, 'python developer', 'senior'),
+    (11.999, '', 'junior'),
+    (200.0, 'junior python developer', 'junior'),
+    (0.0, 'senior python developer', 'senior'),
+    (np.nan, 'Ведущий программист', 'senior'),
+    (24.0, 'senior junior developer', 'senior'),
+])
+def test_levels(experience, title, level):
+    """Ключевые слова в должности важнее стажа; senior важнее junior; границы стажа включают 12 и 36."""
+    assert classify_developer_level(experience, title) == level
+    assert classify_developer_levels([experience], [title]).tolist() == [LEVEL_CODES[level]]
+
+
+def test_unparseable_experience():
+    """Стаж, который не удалось разобрать (None в колонке object), размечается как пропуск."""
+    experience = np.array([None, 24.0, None], dtype=object)
+    titles = ['python developer', 'python developer', 'lead developer']
+    expected = _scalar([np.nan, 24.0, np.nan], titles)
+    np.testing.assert_array_equal(classify_developer_levels(experience, titles), expected)
+
+
+def test_empty_input():
+    result = classify_developer_levels([], [])
+    assert result.dtype == np.int8 and result.size == 0
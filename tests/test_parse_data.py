@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import write_resumes_csv
+from parse_data import DATA_DIR, ParseOptions, parse_data_pipeline
+from src.transformation import FeatureExtractionHandler
+from utils.dataset_io import open_dataset
+
+ROWS = 3000
+
+
+def _parse(options: ParseOptions) -> tuple:
+    parse_data_pipeline('resumes.csv', options)
+    x, y = open_dataset(DATA_DIR, mmap_mode=None)
+    return (x.toarray() if hasattr(x, 'toarray') else x), y
+
+
+@pytest.fixture(scope='module')
+def workspace(tmp_path_factory):
+    """Синтетический CSV и датасет полного разбора одним процессом (resources/ и data/ — относительные пути)."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(tmp_path_factory.mktemp('parse'))
+        # Шарды воркерам раздаются и на маленьком файле
+        mp.setattr(FeatureExtractionHandler, 'PARALLEL_MIN_ROWS', 100)
+        write_resumes_csv('resumes.csv', ROWS, seed=0)
+        yield _parse(ParseOptions())
+
+
+@pytest.mark.parametrize('options', [
+    ParseOptions(chunksize=700),
+    ParseOptions(workers=2),
+    ParseOptions(chunksize=700, workers=2),
+    ParseOptions(chunksize=ROWS * 2),
+], ids=['chunked', 'workers', 'chunked_workers', 'one_chunk'])
+def test_matrix_does_not_depend_on_mode(workspace, options):
+    """Потоковый разбор и пул процессов дают ту же матрицу и уровни, что и разбор файла целиком."""
+    x, y = workspace
+    assert 0 < len(y) < ROWS
+    chunked_x, chunked_y = _parse(options)
+    np.testing.assert_array_equal(chunked_x, x)
+    np.testing.assert_array_equal(chunked_y, y)
+
+
+def test_dense_matches_sparse(workspace):
+    x, y = workspace
+    dense_x, dense_y = _parse(ParseOptions(chunksize=700, dense=True, workers=2))
+    assert isinstance(dense_x, np.ndarray)
+    np.testing.assert_array_equal(dense_x, x)
+    np.testing.assert_array_equal(dense_y, y)
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+
+from utils.prediction_cache import DISK_FILE, PredictionCache
+
+
+def _disk_totals(cache_dir) -> tuple:
+    with sqlite3.connect(os.path.join(cache_dir, DISK_FILE)) as db:
+        return (db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM predictions').fetchone(),
+                db.execute('SELECT rows, bytes FROM cache_size').fetchone())
+
+
+def test_size_summary_follows_inserts_replaces_and_deletes(tmp_path):
+    """Размер из строки cache_size совпадает с SUM по таблице после вставки, замены, вытеснения и очистки."""
+    cache = PredictionCache(maxsize=0, cache_dir=str(tmp_path), max_bytes=4000)
+    cache.set_version('v1')
+    cache.put_many({f'key{i}': [0.1, 0.2, 0.7] for i in range(50)})
+    cache.put_many({f'key{i}': None for i in range(25)})
+    actual, summary = _disk_totals(tmp_path)
+    assert actual == summary and actual[0] == 50
+    cache.put_many({f'more{i}': [0.123456, 0.234567, 0.641977] for i in range(200)})
+    actual, summary = _disk_totals(tmp_path)
+    assert actual == summary and actual[1] <= 4000 and cache.evicted > 0
+    cache.clear()
+    assert _disk_totals(tmp_path) == ((0, 0), (0, 0))
+
+
+def test_eviction_removes_least_recently_read(tmp_path):
+    cache = PredictionCache(maxsize=0, cache_dir=str(tmp_path), max_bytes=2000)
+    cache.set_version('v1')
+    cache.put_many({'hot': [1.0, 0.0, 0.0]})
+    for i in range(100):
+        cache.put_many({f'cold{i}': [0.0, 1.0, 0.0]})
+        cache.get_many(['hot'])
+    assert 'hot' in cache.get_many(['hot'])
+    assert 'cold0' not in cache.get_many(['cold0'])
+
+
+def test_versions_share_disk_without_wiping(tmp_path):
+    """Процессы разных версий на одном cache_dir не удаляют записи друг друга и не читают чужие."""
+    old, new = PredictionCache(maxsize=0, cache_dir=str(tmp_path)), PredictionCache(maxsize=0, cache_dir=str(tmp_path))
+    old.set_version('v1')
+    old.put_many({'a': [0.5, 0.5, 0.0]})
+    new.set_version('v2')
+    new.put_many({'b': [0.0, 0.5, 0.5]})
+    old.put_many({'c': [1.0, 0.0, 0.0]})
+    assert old.get_many(['a', 'b', 'c']) == {'a': [0.5, 0.5, 0.0], 'c': [1.0, 0.0, 0.0]}
+    assert new.get_many(['a', 'b', 'c']) == {'b': [0.0, 0.5, 0.5]}
+
+
+def test_opens_file_without_size_summary(tmp_path):
+    """Файл прежнего формата (без cache_size) открывается, размер считается по существующим записям."""
+    with sqlite3.connect(os.path.join(tmp_path, DISK_FILE)) as db:
+        db.execute('CREATE TABLE predictions (key TEXT PRIMARY KEY, value TEXT, version TEXT, created REAL, '
+                   'accessed REAL, size INTEGER)')
+        db.execute("INSERT INTO predictions VALUES ('k', 'null', 'v1', 0, 0, 5)")
+    cache = PredictionCache(maxsize=0, cache_dir=str(tmp_path))
+    assert cache.stats()['disk_rows'] == 1 and cache.stats()['disk_bytes'] == 5
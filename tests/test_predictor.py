@@ -0,0 +1,60 @@
+import os
+import threading
+
+import joblib
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from benchmarks.synthetic import generate_resumes
+from src.batcher import MicroBatcher
+from src.predictor import LevelPredictor
+from src.transformation import FeatureExtractionHandler
+from utils.level_classifier import LEVEL_CODES
+
+EXPERIENCE = 'Опыт (двойное нажатие для полной версии)'
+
+
+@pytest.fixture(scope='module')
+def predictor(tmp_path_factory):
+    """Небольшая модель, обученная на синтетических резюме во временной директории (resources/ — относительный путь)."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(tmp_path_factory.mktemp('predictor'))
+        features = FeatureExtractionHandler(is_training=True).handle(generate_resumes(3000, seed=0))
+        model = LogisticRegression(max_iter=500).fit(features['x'], features['y'])
+        joblib.dump(model, os.path.join('resources', 'classifier_lr.pkl'))
+        yield LevelPredictor(os.path.join('resources', 'classifier_lr.pkl'),
+                             {code: level for level, code in LEVEL_CODES.items()}, res_dir='resources')
+
+
+def _records(seed: int, experience_column: str = EXPERIENCE) -> list:
+    df = generate_resumes(200, seed=seed).rename(columns={EXPERIENCE: experience_column})
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def test_header_variants_in_one_batch(predictor):
+    """Запись с другим заголовком колонки предсказывается так же, как отдельно, и в общем батче."""
+    normal, renamed = _records(1), _records(2, 'Опыт работы')
+    alone = predictor.predict_records(renamed)
+    assert sum(r['level'] is not None for r in alone) > 0
+    merged = predictor.predict_records(normal + renamed)
+    assert merged[:len(normal)] == predictor.predict_records(normal)
+    assert merged[len(normal):] == alone
+
+
+def test_micro_batcher_mixes_header_variants(predictor):
+    """Конкурентные запросы с разными заголовками попадают в один батч и не влияют друг на друга."""
+    normal, renamed = _records(1), _records(2, 'Опыт работы')
+    expected = [predictor.predict_records(normal), predictor.predict_records(renamed)]
+    batcher = MicroBatcher(predictor.predict_records, max_rows=1000, max_wait_ms=500).start()
+    results = [None, None]
+
+    def call(i, records):
+        results[i] = batcher.predict(records)
+
+    threads = [threading.Thread(target=call, args=(i, records)) for i, records in enumerate([normal, renamed])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert batcher.stats()['batches'] == 1
+    assert results == expected
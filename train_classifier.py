@@ -1,32 +1,200 @@
+import argparse
 import os
 import sys
 
-import joblib
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report
-from sklearn.model_selection import train_test_split
-
 from utils.visualizer import save_class_balance_plot
 
 DATA_DIR, RES_DIR, DOCS_DIR = 'data', 'resources', 'docs'
 MAP = {0: 'junior', 1: 'middle', 2: 'senior'}
+BATCH_ROWS = 65536
+TEST_PERCENT = 20
 
 def train_and_evaluate(model, x_train, x_test, y_train, y_test, name: str):
     """Обучает модель и выводит отчет."""
+    from sklearn.metrics import classification_report
     model.fit(x_train, y_train)
     preds = model.predict(x_test)
     print(f"\n--- Отчет {name} ---")
     print(classification_report(y_test, preds, target_names=list(MAP.values())))
-    joblib.dump(model, os.path.join(RES_DIR, f'classifier_{name.lower()}.pkl'))
+    save_model(model, name)
 
-def main():
-    try:
-        x = np.load(os.path.join(DATA_DIR, 'x_data.npy'))
-        y = np.load(os.path.join(DATA_DIR, 'y_data.npy'))
+def save_model(model, name: str):
+    """
+    Сохраняет модель в pickle и, для леса и линейных моделей, в компактный .npz
+    (плоские массивы без pickle, вместе со скалером и словарем) для быстрого инференса.
+    Для остальных моделей устаревший .npz с тем же именем удаляется.
+    """
+    import joblib
+
+    from utils.compact_model import export_compact_model
+    from utils.transformer_utils import load_transformer
+
+    path = os.path.join(RES_DIR, f'classifier_{name.lower()}')
+    joblib.dump(model, path + '.pkl')
+    if hasattr(model, 'estimators_') or hasattr(model, 'coef_'):
+        export_compact_model(model, path + '.npz',
+                             vectorizer=load_transformer(os.path.join(RES_DIR, 'vectorizer.pkl')),
+                             scaler=load_transformer(os.path.join(RES_DIR, 'scaler.pkl')))
+    elif os.path.exists(path + '.npz'):
+        # Компактный экспорт прежней модели с тем же именем загрузился бы вместо новой (load_model)
+        os.remove(path + '.npz')
+
+def is_held_out(start: int, end: int):
+    """
+    Маска строк отложенной выборки. Строка попадает в нее по хэшу своего номера,
+    поэтому разбиение не зависит от размера батча и повторяется между запусками.
+    """
+    import numpy as np
+    rows = np.arange(start, end, dtype=np.uint64)
+    return (rows * np.uint64(2654435761) % np.uint64(2 ** 32)) % np.uint64(100) < TEST_PERCENT
+
+def train_incremental(batch_rows: int = BATCH_ROWS, epochs: int = 5, plot: bool = True, data_path: str = DATA_DIR):
+    """
+    Потоковое (out-of-core) обучение: датасет читается батчами через memory-mapping,
+    модели дообучаются partial_fit, оценка идет по отложенному потоку строк.
+    Пиковая память зависит от batch_rows, а не от размера датасета.
+    """
+    import numpy as np
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.metrics import classification_report
+    from sklearn.naive_bayes import BernoulliNB
+
+    from utils.dataset_io import open_dataset
+
+    x, y = open_dataset(data_path)
+    classes = np.array(sorted(MAP))
+    starts = range(0, x.shape[0], batch_rows)
+
+    # Частоты классов считаются потоком — по ним строятся веса 'balanced' (partial_fit их не считает)
+    train_counts, all_counts = np.zeros(len(classes), dtype=np.int64), np.zeros(len(classes), dtype=np.int64)
+    for start in starts:
+        y_batch = np.asarray(y[start:start + batch_rows])
+        all_counts += np.bincount(y_batch, minlength=len(classes))
+        train_counts += np.bincount(y_batch[~is_held_out(start, start + len(y_batch))], minlength=len(classes))
+    if plot:
+        save_class_balance_plot(None, MAP, DOCS_DIR, counts=dict(zip(classes, all_counts)))
+    weights = train_counts.sum() / (len(classes) * np.maximum(train_counts, 1))
+
+    models = {'SGD': SGDClassifier(loss='log_loss', random_state=42),
+              'NB': BernoulliNB()}
+    rng = np.random.RandomState(42)
+    for epoch in range(epochs):
+        for start in rng.permutation(starts):
+            x_batch, y_batch = x[start:start + batch_rows], np.asarray(y[start:start + batch_rows])
+            train = ~is_held_out(start, start + len(y_batch))
+            if not train.any():
+                continue
+            for name, model in models.items():
+                # NB копит частоты признаков: повторные эпохи ничего не добавляют
+                if name == 'NB' and epoch > 0:
+                    continue
+                model.partial_fit(x_batch[train], y_batch[train], classes=classes,
+                                  sample_weight=weights[y_batch[train]])
+        print(f"[Incremental] Эпоха {epoch + 1}/{epochs} завершена")
+
+    # Отчет строится по матрице ошибок, накопленной потоком: y целиком в память не загружается
+    confusion = {name: np.zeros((len(classes), len(classes)), dtype=np.int64) for name in models}
+    for start in starts:
+        y_batch = np.asarray(y[start:start + batch_rows])
+        test = is_held_out(start, start + len(y_batch))
+        if not test.any():
+            continue
+        x_test = x[start:start + batch_rows][test]
+        for name, model in models.items():
+            np.add.at(confusion[name], (y_batch[test], model.predict(x_test)), 1)
+
+    true_labels, pred_labels = np.repeat(classes, len(classes)), np.tile(classes, len(classes))
+    for name, model in models.items():
+        print(f"\n--- Отчет {name} (отложенный поток) ---")
+        print(classification_report(true_labels, pred_labels, labels=classes, target_names=list(MAP.values()),
+                                    sample_weight=confusion[name].ravel(), zero_division=0))
+        save_model(model, name)
 
+def train_search(method: str = 'grid', cv: int = 5, workers: int = -1, models=None, config=None,
+                 latency_budget_ms=None, plot: bool = True, data_path: str = DATA_DIR):
+    """
+    Выбор модели: поиск гиперпараметров (сетка или successive halving) по моделям из пространства
+    поиска стратифицированной кросс-валидацией в пуле процессов, дообучение лучших параметров,
+    отчет по отложенной выборке с временем обучения, предсказания и задержкой одной записи.
+    Выбирается лучшая по кросс-валидации модель из укладывающихся в бюджет задержки.
+    """
+    import json
+    import time
+
+    import numpy as np
+    from sklearn.metrics import classification_report, f1_score
+    from sklearn.model_selection import train_test_split
+
+    from utils.dataset_io import open_dataset
+    from utils.model_search import load_search_space, make_estimator, measure_latency, search_models, select_model
+
+    x, y = open_dataset(data_path)
+    if plot:
         save_class_balance_plot(y, MAP, DOCS_DIR)
+    space = load_search_space(config, models)
+    # Разбиение — номерами строк: в поиск уходит весь memory-mapped датасет, а не его копия
+    train_idx, test_idx = train_test_split(np.arange(x.shape[0]), test_size=0.2, stratify=y, random_state=42)
+    train_idx, test_idx = np.sort(train_idx), np.sort(test_idx)
+    results = search_models(x, y, train_idx, space, method, cv, workers)
+
+    x_tr, y_tr, x_te, y_te = x[train_idx], np.asarray(y[train_idx]), x[test_idx], np.asarray(y[test_idx])
+    fitted = {}
+    for name, result in results.items():
+        model = make_estimator(space[name]).set_params(**result['params'])
+        start = time.perf_counter()
+        model.fit(x_tr, y_tr)
+        result['fit_s'] = time.perf_counter() - start
+        start = time.perf_counter()
+        preds = model.predict(x_te)
+        result['predict_s'] = time.perf_counter() - start
+        result['test_score'] = float(f1_score(y_te, preds, average='macro'))
+        result.update(measure_latency(model, x_te))
+        fitted[name] = model
+        print(f"\n--- Отчет {name} {result['params']} ---")
+        print(classification_report(y_te, preds, target_names=list(MAP.values()), zero_division=0))
+
+    selected = select_model(results, latency_budget_ms)
+    print(f"{'модель':<8}{'CV f1':>8}{'тест f1':>9}{'обучение, с':>13}{'предсказание, с':>17}"
+          f"{'p50, мс':>9}{'p95, мс':>9}")
+    for name, r in results.items():
+        mark = '  <- выбрана' if name == selected else ''
+        print(f"{name:<8}{r['cv_score']:>8.4f}{r['test_score']:>9.4f}{r['fit_s']:>13.2f}{r['predict_s']:>17.3f}"
+              f"{r['latency_p50_ms']:>9.2f}{r['latency_p95_ms']:>9.2f}{mark}")
+
+    os.makedirs(RES_DIR, exist_ok=True)
+    with open(os.path.join(RES_DIR, 'model_selection.json'), 'w', encoding='utf-8') as f:
+        json.dump({'method': method, 'cv': cv, 'latency_budget_ms': latency_budget_ms, 'selected': selected,
+                   'results': results}, f, ensure_ascii=False, indent=2, default=str)
+    if selected is None:
+        raise RuntimeError(f"Ни одна модель не укладывается в бюджет задержки {latency_budget_ms} мс.")
+    save_model(fitted[selected], selected)
+    save_model(fitted[selected], 'best')
+    print(f"\nВыбрана модель {selected}: resources/classifier_best.pkl (и classifier_{selected.lower()}.pkl)")
+
+def main(incremental: bool = False, batch_rows: int = BATCH_ROWS, epochs: int = 5, plot: bool = True,
+         data_path: str = DATA_DIR, search: dict = None):
+    try:
+        if incremental:
+            train_incremental(batch_rows, epochs, plot, data_path)
+            return
+        if search is not None:
+            train_search(plot=plot, data_path=data_path, **search)
+            return
+
+        # sklearn, pandas и scipy импортируются здесь, а не на уровне модуля:
+        # `--help` и ошибки аргументов не ждут их загрузки
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import train_test_split
+
+        from utils.dataset_io import open_dataset
+
+        # Датасет (или таблица признаков Arrow IPC) открывается через memory-mapping;
+        # sparse CSR передается в модели без уплотнения
+        x, y = open_dataset(data_path)
+
+        if plot:
+            save_class_balance_plot(y, MAP, DOCS_DIR)
 
         x_tr, x_te, y_tr, y_te = train_test_split(x, y, test_size=0.2, stratify=y, random_state=42)
 
@@ -44,4 +212,30 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="HH Developer Level Predictor: обучение моделей.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Потоковое обучение partial_fit (SGD log loss, наивный Байес) для датасетов больше памяти.")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="Размер батча потокового обучения, строк.")
+    parser.add_argument("--epochs", type=int, default=5, help="Число проходов SGD по датасету.")
+    parser.add_argument("--no-plot", action="store_true",
+                        help="Не строить график баланса классов (matplotlib/seaborn не загружаются).")
+    parser.add_argument("--data", default=DATA_DIR,
+                        help="Хранилище датасета (директория) или таблица признаков .arrow/.parquet "
+                             "(parse_data.py --output).")
+    parser.add_argument("--search", choices=["grid", "halving"], default=None,
+                        help="Выбор модели: поиск гиперпараметров перебором сетки или successive halving.")
+    parser.add_argument("--models", nargs='+', default=None,
+                        help="Модели для поиска (по умолчанию все из пространства поиска: LR RF ET SGD NB).")
+    parser.add_argument("--search-config", default=None,
+                        help="JSON пространства поиска: {модель: {estimator, params, grid}} "
+                             "(см. utils/model_search.py).")
+    parser.add_argument("--cv", type=int, default=5, help="Число фолдов стратифицированной кросс-валидации.")
+    parser.add_argument("--workers", type=int, default=-1, help="Число процессов поиска (-1 — все ядра).")
+    parser.add_argument("--latency-budget-ms", type=float, default=None,
+                        help="Бюджет задержки предсказания одной записи (p95), мс: выбирается лучшая модель в бюджете.")
+    args = parser.parse_args()
+    search = None
+    if args.search:
+        search = {'method': args.search, 'cv': args.cv, 'workers': args.workers, 'models': args.models,
+                  'config': args.search_config, 'latency_budget_ms': args.latency_budget_ms}
+    main(args.incremental, args.batch_rows, args.epochs, not args.no_plot, args.data, search)
\ No newline at end of file
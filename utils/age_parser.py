@@ -1,5 +1,10 @@
 import re
 
+from utils.parse_cache import cached
+
+AGE_PATTERN = re.compile(r'(\d+)\s+(?:год|года|лет)')
+
+@cached
 def extract_age(text: str) -> int:
     """
     Извлекает возраст в годах из текстовой строки.
@@ -14,5 +19,5 @@ def extract_age(text: str) -> int:
     """
     if not isinstance(text, str):
         return 30
-    match = re.search(r'(\d+)\s+(?:год|года|лет)', text)
+    match = AGE_PATTERN.search(text)
     return int(match.group(1)) if match else 30
\ No newline at end of file
@@ -1,5 +1,6 @@
-import numpy as np
+from utils.parse_cache import cached
 
+@cached
 def extract_city(text: str) -> str:
     """
     Извлекает название города из текстовой строки до первой запятой.
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from utils.age_parser import AGE_PATTERN
+from utils.experience_parser import MONTHS_PATTERN, YEARS_PATTERN
+from utils.keyword_matcher import get_matcher
+from utils.parse_cache import by_uniques
+from utils.salary_parser import NON_DIGIT_PATTERN, RATES
+
+# Векторные версии парсеров из utils/*_parser.py: обрабатывают колонку целиком
+# через pandas .str и возвращают ровно те же значения, что и построчный .apply.
+# Колонки разбираются по уникальным значениям (by_uniques, utils/parse_cache.py).
+
+
+def _strings(col: pd.Series) -> pd.Series:
+    """Оставляет только строковые значения, остальные заменяет на NaN (аналог isinstance(text, str))."""
+    if pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col):
+        return col
+    return pd.Series(np.nan, index=col.index, dtype=object)
+
+
+def _as_str(col: pd.Series) -> pd.Series:
+    """Аналог str(text): пропуски дают NaN и обрабатываются вызывающим кодом как 'nan'."""
+    return col.astype(str).where(col.notna())
+
+
+def _to_int(digits: pd.Series, default: int) -> pd.Series:
+    """Переводит извлеченные цифры в int64; Unicode-цифры (понимаемые int()) разбираются отдельно."""
+    num = pd.to_numeric(digits, errors='coerce')
+    rare = digits.notna() & num.isna()
+    if rare.any():
+        num[rare] = digits[rare].map(int)
+    return num.fillna(default).astype('int64')
+
+
+@by_uniques
+def parse_salary_column(col: pd.Series) -> pd.Series:
+    """Векторный extract_salary: зарплата в рублях (float) или NaN."""
+    col = _strings(col)
+    digits = col.str.replace(NON_DIGIT_PATTERN, '', regex=True)
+    amount = digits.where(digits != '').astype('float64')
+    upper = col.str.upper()
+    rate = pd.Series(1.0, index=col.index)
+    # Побеждает первая валюта из RATES — поэтому применяем их в обратном порядке
+    for currency, value in reversed(list(RATES.items())):
+        rate = rate.mask(upper.str.contains(currency, regex=False, na=False), value)
+    return amount * rate
+
+
+@by_uniques
+def parse_age_column(col: pd.Series) -> pd.Series:
+    """Векторный extract_age: возраст в годах, 30 по умолчанию."""
+    age = _strings(col).str.extract(AGE_PATTERN, expand=False)
+    return _to_int(age, 30)
+
+
+@by_uniques
+def parse_experience_column(col: pd.Series) -> pd.Series:
+    """Векторный extract_experience: опыт в месяцах, 0 если не указан."""
+    s = _as_str(col).str.lower()
+    years = _to_int(s.str.extract(YEARS_PATTERN, expand=False), 0)
+    months = _to_int(s.str.extract(MONTHS_PATTERN, expand=False), 0)
+    # Эвристика: если число лет выглядит как год (например, 2019), сбрасываем его
+    months_total = years.where(years <= 100, 0) * 12 + months
+    unknown = s.isna() | (s == 'nan') | s.str.contains('не указано', regex=False, na=True)
+    return months_total.mask(unknown, 0)
+
+
+@by_uniques
+def parse_male_column(col: pd.Series) -> pd.Series:
+    """Признак пола: 1, если в строке есть 'Мужчина', иначе 0."""
+    return _as_str(col).str.contains('Мужчина', regex=False, na=False).astype('int64')
+
+
+@by_uniques
+def parse_city_column(col: pd.Series) -> pd.Series:
+    """Векторный extract_city: город до первой запятой или пустая строка."""
+    return _strings(col).str.split(',', n=1).str[0].str.strip().fillna('')
+
+
+@by_uniques
+def is_it_developer_column(col: pd.Series) -> pd.Series:
+    """Векторный is_it_developer: булева маска IT-должностей."""
+    return get_matcher('it').contains_series(_strings(col))
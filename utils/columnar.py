@@ -0,0 +1,243 @@
+import json
+import os
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+Features = Union[np.ndarray, sp.csr_matrix]
+
+# Колоночные форматы по расширению файла: Parquet (сжатый, для выгрузок) и Arrow IPC
+# (несжатый, отображается в память без копирования)
+FORMATS = {'.parquet': 'parquet', '.pq': 'parquet', '.arrow': 'ipc', '.feather': 'ipc', '.ipc': 'ipc'}
+# Ключ метаданных схемы таблицы признаков: формат X, число признаков, схема признаков, хэш трансформеров
+METADATA_KEY = b'hh_features'
+
+
+def columnar_format(path: str) -> Optional[str]:
+    """'parquet', 'ipc' или None, если путь не колоночный файл."""
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("Для работы с Parquet/Arrow установите pyarrow: pip install pyarrow")
+    return pa
+
+
+def _read_dataset(path: str):
+    import pyarrow.dataset as ds
+    return ds.dataset(path, format='parquet' if columnar_format(path) == 'parquet' else 'ipc')
+
+
+def iter_frames(path: str, columns: Optional[List[str]] = None, filters=None,
+                batch_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Читает колоночную выгрузку: только нужные колонки (проекция), с фильтром строк,
+    который Parquet проверяет по статистикам row group до чтения данных (predicate pushdown).
+    Row group читаются параллельно в потоках pyarrow.
+
+    Args:
+        path: Путь к .parquet или .arrow.
+        columns: Имена колонок (None — все).
+        filters: Фильтр строк: выражение pyarrow.compute или список условий в формате
+                 pandas.read_parquet, например [('Город', '==', 'Москва')].
+        batch_rows: Размер порции, строк. None — вся таблица одним DataFrame.
+    """
+    _pyarrow()
+    import pyarrow.parquet as pq
+    if isinstance(filters, list):
+        filters = pq.filters_to_expression(filters)
+    scanner = _read_dataset(path).scanner(columns=columns, filter=filters, use_threads=True,
+                                          **({'batch_size': batch_rows} if batch_rows else {}))
+    if batch_rows is None:
+        yield scanner.to_table().to_pandas()
+        return
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def schema_names(path: str) -> List[str]:
+    """Имена колонок файла по схеме, без чтения данных."""
+    _pyarrow()
+    return _read_dataset(path).schema.names
+
+
+class ColumnarWriter:
+    """Потоковая запись таблиц pyarrow в Parquet (row group на порцию) или Arrow IPC (батч на порцию)."""
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        self.schema = None
+        self._writer = None
+
+    def write(self, table) -> None:
+        pa = _pyarrow()
+        if self._writer is None:
+            # Схема фиксируется по первой порции, следующие приводятся к ней
+            self.schema = table.schema
+            if columnar_format(self.path) == 'parquet':
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.path, self.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.path, self.schema)
+        self._writer.write_table(table.cast(self.schema))
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def _merge_kind(a: str, b: str) -> str:
+    """Общий тип двух чанков колонки: пустой чанк не влияет, int и float дают float, иначе — строка."""
+    if a == 'null' or a == b:
+        return b
+    if b == 'null':
+        return a
+    return 'float' if {a, b} == {'int', 'float'} else 'string'
+
+
+def _column_kind(values: pd.Series) -> str:
+    if values.isna().all():
+        return 'null'
+    if pd.api.types.is_bool_dtype(values):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(values):
+        return 'int'
+    return 'float' if pd.api.types.is_float_dtype(values) else 'string'
+
+
+def csv_schema(csv_path: str, encoding: str, sep: str, chunksize: int = 100000):
+    """
+    Первый проход convert_csv: схема pyarrow по типам, которые pd.read_csv выводит в каждом чанке,
+    расширенным до общего типа по всему файлу. Целые с пропусками — float64 (как у pandas),
+    bool с пропусками, пустые и смешанные колонки — строки.
+    """
+    pa = _pyarrow()
+    kinds, has_null = {}, {}
+    with pd.read_csv(csv_path, sep=sep, encoding=encoding, chunksize=chunksize) as reader:
+        for chunk in reader:
+            for col in chunk.columns:
+                kinds[col] = _merge_kind(kinds.get(col, 'null'), _column_kind(chunk[col]))
+                has_null[col] = has_null.get(col, False) or bool(chunk[col].isna().any())
+    types = {'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_()}
+    fields = []
+    for col, kind in kinds.items():
+        if kind == 'int' and has_null[col]:
+            kind = 'float'
+        elif kind == 'bool' and has_null[col]:
+            kind = 'string'
+        fields.append(pa.field(col, types.get(kind, pa.string())))
+    return pa.schema(fields)
+
+
+def convert_csv(csv_path: str, out_path: str, encoding: str, sep: str, chunksize: int = 100000) -> int:
+    """
+    Однократно переводит CSV-выгрузку в Parquet или Arrow IPC за два прохода. Первый (csv_schema)
+    выводит типы колонок так же, как CSV-загрузчик (pd.read_csv без dtype), и расширяет их до общего
+    типа по всем чанкам; второй читает чанки и явно приводит их к этой схеме. Текстовые колонки
+    читаются как строки без разбора чисел, поэтому значения записываются без изменений.
+
+    Returns:
+        Число записанных строк.
+    """
+    pa = _pyarrow()
+    schema = csv_schema(csv_path, encoding, sep, chunksize)
+    text_cols = {field.name: str for field in schema if field.type == pa.string()}
+    writer = ColumnarWriter(out_path)
+    try:
+        with pd.read_csv(csv_path, sep=sep, encoding=encoding, dtype=text_cols, chunksize=chunksize) as reader:
+            for chunk in reader:
+                writer.write(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    except Exception:
+        # Недописанный файл без футера не читается — удаляем его
+        writer.close()
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        raise
+    writer.close()
+    return writer.rows
+
+
+def feature_table(x: Features, y: Optional[np.ndarray], row_ids: np.ndarray,
+                  feature_schema: Optional[List[str]] = None, transformer_hash: Optional[str] = None):
+    """
+    Таблица признаков: row_id, y (если есть) и X. Строка CSR хранится как пара списков
+    x_indices/x_values (смещения списков Arrow — это indptr), плотная — как список фиксированной длины x.
+    """
+    pa = _pyarrow()
+    fmt = 'csr' if sp.issparse(x) else 'dense'
+    columns = {'row_id': pa.array(np.asarray(row_ids, dtype=np.int64))}
+    if y is not None:
+        columns['y'] = pa.array(np.asarray(y))
+    if fmt == 'csr':
+        # copy=False: массивы хранилища (memory-mapped, int32/float32) передаются в Arrow без копирования
+        x = x.tocsr()
+        offsets = pa.array(x.indptr.astype(np.int32, copy=False))
+        columns['x_indices'] = pa.ListArray.from_arrays(offsets, pa.array(x.indices.astype(np.int32, copy=False)))
+        columns['x_values'] = pa.ListArray.from_arrays(offsets, pa.array(x.data.astype(np.float32, copy=False)))
+    else:
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        columns['x'] = pa.FixedSizeListArray.from_arrays(pa.array(x.ravel()), x.shape[1])
+    metadata = {'format': fmt, 'n_features': x.shape[1], 'feature_schema': feature_schema,
+                'transformer_hash': transformer_hash}
+    return pa.table(columns, metadata={METADATA_KEY: json.dumps(metadata, ensure_ascii=False)})
+
+
+def table_metadata(table) -> dict:
+    return json.loads(table.schema.metadata[METADATA_KEY])
+
+
+def write_feature_table(table, path: str) -> None:
+    """
+    Пишет таблицу признаков одним батчем Arrow IPC или одним row group Parquet: open_feature_table
+    строит массивы поверх единственного батча без склейки (см. ColumnarSaveHandler в src/output.py).
+    """
+    pa = _pyarrow()
+    table = table.combine_chunks() if any(column.num_chunks > 1 for column in table.columns) else table
+    if columnar_format(path) == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, row_group_size=max(table.num_rows, 1))
+    else:
+        with pa.ipc.new_file(path, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _single(column):
+    """
+    Массив колонки: без копирования, если таблица состоит из одного батча (так пишет write_feature_table),
+    иначе батчи склеиваются (файлы, записанные по батчам прежними версиями или другими инструментами).
+    """
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def open_feature_table(path: str) -> Tuple[Features, Optional[np.ndarray], np.ndarray]:
+    """
+    Открывает таблицу признаков. Arrow IPC отображается в память: массивы NumPy и CSR
+    строятся поверх буферов файла без копирования (файл записан одним батчем, см. write_feature_table).
+    Parquet распаковывается в память.
+
+    Returns:
+        Кортеж (X, y, row_ids).
+    """
+    pa = _pyarrow()
+    if columnar_format(path) == 'ipc':
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    else:
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+    m = table_metadata(table)
+    if m['format'] == 'csr':
+        indices, values = _single(table.column('x_indices')), _single(table.column('x_values'))
+        x = sp.csr_matrix((values.values.to_numpy(), indices.values.to_numpy(), indices.offsets.to_numpy()),
+                          shape=(table.num_rows, m['n_features']))
+    else:
+        x = _single(table.column('x')).values.to_numpy().reshape(table.num_rows, m['n_features'])
+    y = _single(table.column('y')).to_numpy() if 'y' in table.column_names else None
+    return x, y, _single(table.column('row_id')).to_numpy()
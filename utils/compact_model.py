@@ -0,0 +1,257 @@
+import os
+import re
+import struct
+import zipfile
+from typing import Any, Dict, Iterable
+
+import numpy as np
+import scipy.sparse as sp
+
+# Фиксированная часть локального заголовка ZIP: сигнатура, 22 байта полей, длины имени и доп. поля
+_LOCAL_HEADER = struct.Struct('<4s22xHH')
+_HEADER_READERS = {(1, 0): np.lib.format.read_array_header_1_0, (2, 0): np.lib.format.read_array_header_2_0}
+# Параметры TfidfVectorizer, которые воспроизводит CompactTfidf (значения sklearn по умолчанию)
+_TFIDF_PARAMS = {'analyzer': 'word', 'binary': False, 'lowercase': True, 'ngram_range': (1, 1), 'norm': 'l2',
+                 'preprocessor': None, 'stop_words': None, 'strip_accents': None, 'sublinear_tf': False,
+                 'token_pattern': r"(?u)\b\w\w+\b", 'tokenizer': None, 'use_idf': True}
+
+
+def export_compact_model(model: Any, path: str, vectorizer: Any = None, scaler: Any = None) -> None:
+    """
+    Сохраняет обученную модель sklearn в компактный .npz без pickle.
+
+    RandomForestClassifier — узлы всех деревьев в плоских массивах (дети, признак, порог,
+    доли классов в листьях); линейные модели (LogisticRegression, SGDClassifier) — матрица
+    коэффициентов и свободные члены. Вместе с моделью сохраняются параметры скалера и
+    словарь с idf векторайзера: load_compact_model строит по ним трансформеры без sklearn.
+    Словарь сохраняется только для TfidfVectorizer с параметрами, которые воспроизводит CompactTfidf
+    (HashingVectorizer словаря не имеет) — иначе инференс берет векторайзер из pickle.
+    Архив пишется без сжатия: load_compact_model отображает массивы в память (memory-mapping).
+
+    Raises:
+        TypeError: Если тип модели не поддерживается.
+    """
+    arrays: Dict[str, np.ndarray] = {'classes': np.asarray(model.classes_)}
+    if hasattr(model, 'estimators_'):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        # Номера детей сдвигаются на начало дерева в общем массиве; -1 — лист.
+        # children[узел] = (левый, правый): переход — один gather по признаку «значение > порога»
+        children = np.concatenate([np.column_stack([t.children_left, t.children_right]) + o
+                                   for t, o in zip(trees, offsets)])
+        children[np.concatenate([t.children_left for t in trees]) < 0] = -1
+        # Признаки узлов хранятся как позиции в used_features: при предсказании из X берутся
+        # только эти колонки (листья получают позицию 0, она не читается)
+        feature = np.concatenate([t.feature for t in trees])
+        used_features = np.unique(feature[feature >= 0])
+        arrays.update(
+            kind=np.array('forest'),
+            roots=offsets.astype(np.int64),
+            children=children.astype(np.int32),
+            used_features=used_features.astype(np.int64),
+            feature=np.where(feature >= 0, np.searchsorted(used_features, feature), 0).astype(np.int32),
+            threshold=np.concatenate([t.threshold for t in trees]),
+            value=np.concatenate([_leaf_proba(t.value[:, 0, :]) for t in trees]),
+        )
+    elif hasattr(model, 'coef_'):
+        # LogisticRegression на 3+ классах — softmax, остальные линейные модели — one-vs-rest сигмоиды
+        multinomial = type(model).__name__ == 'LogisticRegression' and len(model.classes_) > 2
+        arrays.update(kind=np.array('softmax' if multinomial else 'ovr'),
+                      coef=np.asarray(model.coef_), intercept=np.asarray(model.intercept_))
+    else:
+        raise TypeError(f"Экспорт модели {type(model).__name__} не поддерживается.")
+
+    if scaler is not None:
+        arrays.update(scaler_mean=scaler.mean_, scaler_scale=scaler.scale_)
+    if vectorizer is not None and type(vectorizer).__name__ == 'TfidfVectorizer' and all(
+            vectorizer.get_params()[name] == value for name, value in _TFIDF_PARAMS.items()):
+        arrays.update(vocabulary=np.array(vectorizer.get_feature_names_out(), dtype=str), idf=vectorizer.idf_)
+    np.savez(path, **arrays)
+
+
+def _leaf_proba(value: np.ndarray) -> np.ndarray:
+    """Доли классов в узлах, как их нормирует DecisionTreeClassifier.predict_proba."""
+    normalizer = value.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+    return value / normalizer
+
+
+def mmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    Открывает несжатый .npz, отображая каждый массив в память (np.load для .npz так не умеет).
+
+    Raises:
+        ValueError: Если член архива сжат.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: массив {info.filename} сжат, memory-mapping невозможен.")
+            f.seek(info.header_offset)
+            _, name_len, extra_len = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+            f.seek(info.header_offset + _LOCAL_HEADER.size + name_len + extra_len)
+            shape, fortran_order, dtype = _HEADER_READERS[np.lib.format.read_magic(f)](f)
+            name = info.filename[:-len('.npy')]
+            if not shape or 0 in shape:
+                # Скаляры и пустые массивы memmap не поддерживает — они занимают байты
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+            else:
+                # np.asarray снимает подкласс memmap (его __getitem__ медленнее), отображение сохраняется
+                arrays[name] = np.asarray(np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                                    order='F' if fortran_order else 'C'))
+    return arrays
+
+
+class CompactForest:
+    """Предсказание случайного леса по плоским массивам узлов (только NumPy)."""
+    # Строки обходятся порциями: число пар (строка, дерево) в работе ограничено
+    CHUNK_ROWS = 2048
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.classes_ = np.asarray(arrays['classes'])
+        self.roots, self.children, self.used_features = arrays['roots'], arrays['children'], arrays['used_features']
+        self.feature, self.threshold, self.value = arrays['feature'], arrays['threshold'], arrays['value']
+
+    def predict_proba(self, x) -> np.ndarray:
+        proba = np.empty((x.shape[0], len(self.classes_)))
+        for start in range(0, x.shape[0], self.CHUNK_ROWS):
+            proba[start:start + self.CHUNK_ROWS] = self._predict_chunk(x[start:start + self.CHUNK_ROWS])
+        return proba
+
+    def predict(self, x) -> np.ndarray:
+        return self.classes_[self.predict_proba(x).argmax(axis=1)]
+
+    def _predict_chunk(self, x) -> np.ndarray:
+        n_rows, n_trees = x.shape[0], len(self.roots)
+        # Плотный блок только из колонок, которые встречаются в узлах леса
+        block = x[:, self.used_features]
+        block = np.ascontiguousarray(block.toarray() if hasattr(block, 'toarray') else block, dtype=np.float32)
+        values, n_used = block.ravel(), block.shape[1]
+        leaves = np.empty(n_rows * n_trees, dtype=np.int64)
+        # Обход всех пар (строка, дерево) по уровням; дошедшие до листа пары выбывают из массивов
+        pairs = np.arange(n_rows * n_trees)
+        rows = pairs // n_trees
+        nodes = self.roots[pairs % n_trees]
+        while True:
+            done = self.children[nodes, 0] < 0
+            leaves[pairs[done]] = nodes[done]
+            pairs, rows, nodes = pairs[~done], rows[~done], nodes[~done]
+            if not pairs.size:
+                break
+            # Как в sklearn: значение признака float32 сравнивается с порогом float64
+            go_right = values.take(rows * n_used + self.feature[nodes]) > self.threshold[nodes]
+            nodes = self.children[nodes, go_right.view(np.uint8)]
+        return self.value[leaves].reshape(n_rows, n_trees, -1).sum(axis=1) / n_trees
+
+
+class CompactLinear:
+    """Предсказание линейной модели по матрице коэффициентов (только NumPy)."""
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.classes_ = np.asarray(arrays['classes'])
+        self.kind = str(arrays['kind'])
+        self.coef, self.intercept = np.asarray(arrays['coef']), np.asarray(arrays['intercept'])
+
+    def decision_function(self, x) -> np.ndarray:
+        scores = x @ self.coef.T + self.intercept
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict_proba(self, x) -> np.ndarray:
+        scores = self.decision_function(x)
+        if self.kind == 'softmax':
+            scores = np.exp(scores - scores.max(axis=1, keepdims=True))
+            return scores / scores.sum(axis=1, keepdims=True)
+        proba = 1.0 / (1.0 + np.exp(-scores))
+        if proba.ndim == 1:
+            return np.vstack([1 - proba, proba]).T
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, x) -> np.ndarray:
+        return self.classes_[self.predict_proba(x).argmax(axis=1)]
+
+
+class CompactTfidf:
+    """
+    TF-IDF по словарю и idf из .npz (только NumPy и re): токены, частоты, idf и l2-нормировка
+    строк в том же порядке операций, что у TfidfVectorizer с параметрами _TFIDF_PARAMS.
+    """
+    TOKEN_PATTERN = re.compile(_TFIDF_PARAMS['token_pattern'])
+
+    def __init__(self, vocabulary: np.ndarray, idf: np.ndarray):
+        self.feature_names = np.asarray(vocabulary, dtype=object)
+        self.vocabulary_ = {token: i for i, token in enumerate(self.feature_names.tolist())}
+        self.idf_ = np.asarray(idf)
+
+    def get_feature_names_out(self) -> np.ndarray:
+        return self.feature_names
+
+    def transform(self, texts: Iterable[str]) -> sp.csr_matrix:
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            row: Dict[int, int] = {}
+            for token in self.TOKEN_PATTERN.findall(text.lower()):
+                column = self.vocabulary_.get(token)
+                if column is not None:
+                    row[column] = row.get(column, 0) + 1
+            for column in sorted(row):
+                indices.append(column)
+                counts.append(row[column])
+            indptr.append(len(indices))
+        indptr, indices = np.asarray(indptr, dtype=np.int32), np.asarray(indices, dtype=np.int32)
+        data = np.asarray(counts, dtype=np.float64) * self.idf_[indices]
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(indptr) - 1))
+        norms[norms == 0.0] = 1.0
+        data /= norms[rows]
+        return sp.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.feature_names)))
+
+
+class CompactScaler:
+    """Стандартизация по среднему и масштабу из .npz, как StandardScaler.transform."""
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_, self.scale_ = np.asarray(mean), np.asarray(scale)
+
+    def transform(self, x) -> np.ndarray:
+        x = np.array(x, dtype=np.float64)
+        x -= self.mean_
+        x /= self.scale_
+        return x
+
+
+def load_compact_model(path: str):
+    """
+    Загружает компактную модель из .npz с memory-mapping массивов. Если в архиве есть словарь
+    и параметры скалера, у модели заполняются vectorizer и scaler (CompactTfidf, CompactScaler),
+    иначе они None.
+    """
+    arrays = mmap_npz(path)
+    model = CompactForest(arrays) if str(arrays['kind']) == 'forest' else CompactLinear(arrays)
+    model.vectorizer = CompactTfidf(arrays['vocabulary'], arrays['idf']) if 'vocabulary' in arrays else None
+    model.scaler = CompactScaler(arrays['scaler_mean'], arrays['scaler_scale']) if 'scaler_mean' in arrays else None
+    return model
+
+
+def load_model(path: str, prefer_compact: bool = True):
+    """
+    Загружает модель для инференса: компактный .npz рядом с pickle или pickle sklearn.
+    joblib и sklearn импортируются только для pickle.
+
+    Args:
+        path: Путь к модели .pkl (рядом может лежать .npz с тем же именем).
+        prefer_compact: Брать .npz, если он есть. Компактный лес быстрее загружается и
+                        предсказывает единичные строки (сервис, холодный старт), но на больших батчах
+                        деревья sklearn (Cython) быстрее — пакетные CLI передают prefer_compact=False.
+                        .npz старше pickle считается устаревшим и не загружается.
+
+    Raises:
+        FileNotFoundError: Если нет ни .npz, ни pickle.
+    """
+    compact_path = os.path.splitext(path)[0] + '.npz'
+    has_pickle = os.path.exists(path)
+    if os.path.exists(compact_path) and (not has_pickle or (
+            prefer_compact and os.stat(compact_path).st_mtime_ns >= os.stat(path).st_mtime_ns)):
+        return load_compact_model(compact_path)
+    if not has_pickle:
+        raise FileNotFoundError(f"Модель {path} не найдена. Обучите её через train_classifier.py")
+    import joblib
+    return joblib.load(path)
@@ -0,0 +1,223 @@
+import json
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import scipy.sparse as sp
+
+from utils.columnar import columnar_format, open_feature_table
+from utils.npy_appender import NpyAppender
+
+Features = Union[np.ndarray, sp.csr_matrix]
+
+# Хранилище датасета в директории: манифест + файлы .npy, дописываемые по чанкам.
+#   dense:  x_data.npy
+#   csr:    x_indptr.npy, x_indices.npy, x_values.npy (компоненты scipy.sparse CSR)
+#   общее:  y_data.npy (если есть целевая переменная), manifest.json
+MANIFEST = 'manifest.json'
+ROW_INDEX = 'row_index.npz'  # Индекс инкрементального парсинга (utils/row_index.py), привязан к строкам датасета
+FILES = {'dense': ['x_data.npy'], 'csr': ['x_indptr.npy', 'x_indices.npy', 'x_values.npy']}
+INDEX_DTYPE = np.int32  # scipy не копирует индексы int32 при сборке CSR поверх memmap
+
+
+def read_manifest(data_dir: str) -> dict:
+    """
+    Читает манифест хранилища.
+
+    Raises:
+        FileNotFoundError: Если в директории нет manifest.json.
+    """
+    path = os.path.join(data_dir, MANIFEST)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Манифест датасета '{path}' не найден. Сначала запустите parse_data.py")
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(data_dir: str, manifest: dict) -> None:
+    with open(os.path.join(data_dir, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+
+class DatasetWriter:
+    """
+    Запись матрицы признаков и целевой переменной в хранилище порциями.
+    В режиме append новые батчи дописываются к существующим данным без их перезаписи;
+    формат, число признаков и хэш трансформеров должны совпадать с манифестом.
+    """
+    def __init__(self, data_dir: str, append: bool = False):
+        """
+        Args:
+            data_dir: Директория хранилища.
+            append: Дописывать к существующему датасету вместо перезаписи.
+        """
+        self.data_dir = data_dir
+        self.append = append and os.path.exists(os.path.join(data_dir, MANIFEST))
+        self.manifest = read_manifest(data_dir) if self.append else None
+        self._writers = {}
+        self._batch_rows = 0
+        os.makedirs(data_dir, exist_ok=True)
+
+    def write(self, x: Features, y: Optional[np.ndarray] = None, feature_schema: Optional[List[str]] = None,
+              transformer_hash: Optional[str] = None) -> int:
+        """
+        Дописывает порцию строк.
+
+        Args:
+            x: Матрица признаков (scipy.sparse или np.ndarray).
+            y: Вектор целевой переменной или None.
+            feature_schema: Имена признаков (колонок X).
+            transformer_hash: Хэш обученных трансформеров, которыми получены признаки.
+
+        Returns:
+            Общее число строк в хранилище.
+        """
+        fmt = 'csr' if sp.issparse(x) else 'dense'
+        if self.manifest is None:
+            self._start(fmt, x, feature_schema, transformer_hash)
+        self._check(fmt, x, transformer_hash)
+
+        if fmt == 'csr':
+            x = x.tocsr()
+            if self.manifest['nnz'] + x.nnz > np.iinfo(INDEX_DTYPE).max:
+                raise OverflowError("Число ненулевых элементов превышает int32 — начните новое хранилище.")
+            indptr = x.indptr.astype(np.int64) + self.manifest['nnz']
+            # indptr хранится один на весь датасет: у каждой следующей порции отбрасываем ведущий 0
+            self._writer('x_indptr.npy').append((indptr if self._writer('x_indptr.npy').rows == 0
+                                                 else indptr[1:]).astype(INDEX_DTYPE))
+            self._writer('x_indices.npy').append(x.indices.astype(INDEX_DTYPE))
+            self._writer('x_values.npy').append(x.data.astype(self.manifest['dtype']))
+            self.manifest['nnz'] += int(x.nnz)
+        else:
+            self._writer('x_data.npy').append(np.asarray(x, dtype=self.manifest['dtype']))
+        if y is not None:
+            self._writer('y_data.npy').append(np.asarray(y))
+
+        self.manifest['rows'] += x.shape[0]
+        self._batch_rows += x.shape[0]
+        return self.manifest['rows']
+
+    def close(self) -> None:
+        """Фиксирует заголовки файлов и записывает манифест с новым батчем."""
+        for writer in self._writers.values():
+            writer.close()
+        if self.manifest is not None:
+            self.manifest['batches'].append({'rows': self._batch_rows, 'created': datetime.now().isoformat()})
+            write_manifest(self.data_dir, self.manifest)
+        self._writers, self._batch_rows = {}, 0
+
+    def _start(self, fmt: str, x: Features, feature_schema: Optional[List[str]],
+               transformer_hash: Optional[str]) -> None:
+        # Новое хранилище: удаляем файлы прежнего датасета, чтобы не смешать форматы
+        for name in [MANIFEST, ROW_INDEX, 'y_data.npy'] + FILES['dense'] + FILES['csr'] + ['x_data.npz']:
+            if os.path.exists(os.path.join(self.data_dir, name)):
+                os.remove(os.path.join(self.data_dir, name))
+        self.manifest = {
+            'format': fmt, 'rows': 0, 'n_features': int(x.shape[1]), 'dtype': str(x.dtype), 'nnz': 0,
+            'feature_schema': list(feature_schema) if feature_schema is not None else None,
+            'transformer_hash': transformer_hash, 'batches': [],
+        }
+
+    def _check(self, fmt: str, x: Features, transformer_hash: Optional[str]) -> None:
+        m = self.manifest
+        if fmt != m['format'] or x.shape[1] != m['n_features'] or transformer_hash != m['transformer_hash']:
+            raise ValueError(f"Порция ({fmt}, {x.shape[1]} признаков, трансформеры {transformer_hash}) "
+                             f"несовместима с датасетом ({m['format']}, {m['n_features']}, {m['transformer_hash']}).")
+
+    def _writer(self, name: str) -> NpyAppender:
+        if name not in self._writers:
+            self._writers[name] = NpyAppender(os.path.join(self.data_dir, name), append=self.append)
+        return self._writers[name]
+
+
+def compact_dataset(data_dir: str, keep: np.ndarray) -> int:
+    """
+    Удаляет строки датасета на месте: оставшиеся строки сдвигаются к началу файлов .npy
+    (порядок сохраняется), файлы обрезаются, манифест обновляется.
+
+    Args:
+        data_dir: Директория хранилища.
+        keep: Булева маска строк датасета (длины manifest['rows']).
+
+    Returns:
+        Число строк после удаления.
+    """
+    m = read_manifest(data_dir)
+    keep = np.asarray(keep, dtype=bool)
+    if keep.shape[0] != m['rows']:
+        raise ValueError(f"Маска на {keep.shape[0]} строк не совпадает с датасетом ({m['rows']} строк).")
+
+    def compact(name: str, mask: np.ndarray) -> None:
+        appender = NpyAppender(os.path.join(data_dir, name), append=True)
+        appender.compact(mask)
+        appender.close()
+
+    if m['format'] == 'csr':
+        indptr = np.load(os.path.join(data_dir, 'x_indptr.npy'))
+        lengths = np.diff(indptr)
+        # Элементы CSR удаляются вместе со своими строками; indptr пересчитывается по длинам оставшихся строк
+        element_keep = np.repeat(keep, lengths)
+        compact('x_indices.npy', element_keep)
+        compact('x_values.npy', element_keep)
+        indptr_writer = NpyAppender(os.path.join(data_dir, 'x_indptr.npy'))
+        indptr_writer.append(np.concatenate([[0], np.cumsum(lengths[keep])]).astype(INDEX_DTYPE))
+        indptr_writer.close()
+        m['nnz'] = int(lengths[keep].sum())
+    else:
+        compact('x_data.npy', keep)
+    if os.path.exists(os.path.join(data_dir, 'y_data.npy')):
+        compact('y_data.npy', keep)
+
+    m['rows'] = int(keep.sum())
+    m['batches'].append({'rows': -int((~keep).sum()), 'created': datetime.now().isoformat()})
+    write_manifest(data_dir, m)
+    return m['rows']
+
+
+def open_dataset(data_dir: str, mmap_mode: Optional[str] = 'r') -> Tuple[Features, Optional[np.ndarray]]:
+    """
+    Открывает хранилище без копирования данных в память (через memory-mapping).
+
+    Args:
+        data_dir: Директория хранилища или файл таблицы признаков .arrow/.parquet (utils/columnar.py).
+        mmap_mode: Режим np.load (по умолчанию 'r'; None — загрузить в память).
+
+    Returns:
+        Кортеж (X, y): X — np.memmap или scipy.sparse CSR поверх memmap, y — memmap или None.
+    """
+    if columnar_format(data_dir) is not None:
+        if not os.path.exists(data_dir):
+            raise FileNotFoundError(f"Таблица признаков {data_dir} не найдена. Запустите parse_data.py --output.")
+        x, y, _ = open_feature_table(data_dir)
+        return x, y
+    m = read_manifest(data_dir)
+
+    def load(name):
+        return np.load(os.path.join(data_dir, name), mmap_mode=mmap_mode)
+
+    if m['format'] == 'csr':
+        x = sp.csr_matrix((load('x_values.npy'), load('x_indices.npy'), load('x_indptr.npy')),
+                          shape=(m['rows'], m['n_features']))
+    else:
+        x = load('x_data.npy')
+    y = load('y_data.npy') if os.path.exists(os.path.join(data_dir, 'y_data.npy')) else None
+    return x, y
+
+
+def load_features(path: str) -> Features:
+    """
+    Загружает матрицу признаков: директорию хранилища (memory-mapped), таблицу признаков
+    .arrow/.parquet, отдельный файл .npz (scipy.sparse CSR) или .npy (плотный массив, memory-mapped).
+
+    Args:
+        path: Путь к хранилищу или файлу признаков.
+
+    Returns:
+        Матрица признаков, пригодная для передачи в модели sklearn напрямую.
+    """
+    if os.path.isdir(path) or columnar_format(path) is not None:
+        return open_dataset(path)[0]
+    if path.endswith('.npz'):
+        return sp.load_npz(path).tocsr()
+    return np.load(path, mmap_mode='r')
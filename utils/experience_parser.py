@@ -1,5 +1,11 @@
 import re
 
+from utils.parse_cache import cached
+
+YEARS_PATTERN = re.compile(r'(\d+)\s+(?:год|года|лет)')
+MONTHS_PATTERN = re.compile(r'(\d+)\s+(?:месяц|месяца|месяцев)')
+
+@cached
 def extract_experience(text: str) -> int:
     """
     Извлекает опыт работы из текстовой строки и конвертирует его в общее количество месяцев.
@@ -17,8 +23,8 @@ def extract_experience(text: str) -> int:
     if s == 'nan' or 'не указано' in s:
         return 0
 
-    years_match = re.search(r'(\d+)\s+(?:год|года|лет)', s)
-    months_match = re.search(r'(\d+)\s+(?:месяц|месяца|месяцев)', s)
+    years_match = YEARS_PATTERN.search(s)
+    months_match = MONTHS_PATTERN.search(s)
 
     years = int(years_match.group(1)) if years_match else 0
     months = int(months_match.group(1)) if months_match else 0
@@ -1,3 +1,6 @@
+import hashlib
+from typing import Iterable
+
 import pandas as pd
 
 def find_column_name(df: pd.DataFrame, keyword: str) -> str:
@@ -18,4 +21,22 @@ def find_column_name(df: pd.DataFrame, keyword: str) -> str:
     for col in df.columns:
         if keyword.lower() in str(col).lower():
             return col
-    raise KeyError(f"Колонка с ключевым словом '{keyword}' не найдена в данных.")
\ No newline at end of file
+    raise KeyError(f"Колонка с ключевым словом '{keyword}' не найдена в данных.")
+
+
+def files_hash(paths: Iterable[str]) -> str:
+    """
+    Вычисляет SHA-256 содержимого набора файлов (например, обученных трансформеров).
+
+    Args:
+        paths: Пути к файлам (порядок важен).
+
+    Returns:
+        Hex-строка хэша.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
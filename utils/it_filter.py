@@ -1,3 +1,5 @@
+from utils.keyword_matcher import get_matcher
+
 def is_it_developer(position_text: str) -> bool:
     """
     Определяет, относится ли текст должности к IT-разработке.
@@ -12,13 +14,5 @@ def is_it_developer(position_text: str) -> bool:
         bool: True, если в тексте найдены ключевые слова, характерные для IT-разработки,
               иначе False.
     """
-    if not isinstance(position_text, str):
-        return False
-
-    s = position_text.lower()
-    it_keywords = [
-        'разработчик', 'developer', 'программист', 'engineer', 'инженер',
-        'backend', 'frontend', 'fullstack', 'qa', 'тестировщик', 'devops',
-        'python', 'java', 'c++', 'javascript', 'php', 'go', 'data scientist'
-    ]
-    return any(kw in s for kw in it_keywords)
\ No newline at end of file
+    # Набор 'it' компилируется один раз (см. utils/keyword_matcher.py)
+    return get_matcher('it').contains(position_text)
\ No newline at end of file
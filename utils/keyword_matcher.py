@@ -0,0 +1,86 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+import pandas as pd
+
+# Наборы ключевых слов по умолчанию. Их можно переопределить без правки кода:
+# JSON-файл {"имя_набора": [ключевые слова]} по пути из KEYWORDS_PATH.
+DEFAULT_KEYWORDS = {
+    'it': [
+        'разработчик', 'developer', 'программист', 'engineer', 'инженер',
+        'backend', 'frontend', 'fullstack', 'qa', 'тестировщик', 'devops',
+        'python', 'java', 'c++', 'javascript', 'php', 'go', 'data scientist'
+    ],
+    'senior': ['senior', 'ведущий', 'lead', 'architect', 'главный'],
+    'junior': ['junior', 'младший', 'стажер', 'intern', 'trainee'],
+}
+KEYWORDS_PATH = os.environ.get('KEYWORDS_PATH', os.path.join('resources', 'keywords.json'))
+
+
+class KeywordMatcher:
+    """
+    Поиск набора ключевых слов (подстрок) без учета регистра за один проход.
+    Все ключевые слова компилируются один раз в единое регулярное выражение-альтернацию;
+    более длинные слова стоят раньше, поэтому на каждой позиции находится самое длинное.
+    """
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: Ключевые слова (подстроки) для поиска.
+        """
+        self.keywords = tuple(dict.fromkeys(kw.lower() for kw in keywords))
+        alternation = '|'.join(re.escape(kw) for kw in sorted(self.keywords, key=len, reverse=True))
+        self._search = re.compile(alternation or r'(?!)')
+        # Просмотр вперед позволяет находить вхождения, начинающиеся внутри других
+        self._find = re.compile(f'(?=({alternation}))' if alternation else r'(?!)')
+
+    def contains(self, text: str) -> bool:
+        """Есть ли в тексте хотя бы одно ключевое слово (False для не-строк)."""
+        return isinstance(text, str) and self._search.search(text.lower()) is not None
+
+    def find_all(self, text: str) -> List[str]:
+        """Все найденные ключевые слова в порядке вхождения (пустой список для не-строк)."""
+        return self._find.findall(text.lower()) if isinstance(text, str) else []
+
+    def contains_series(self, col: pd.Series) -> pd.Series:
+        """Векторный contains: булева маска по колонке."""
+        return col.str.lower().str.contains(self._search, na=False).astype(bool)
+
+    def find_all_series(self, col: pd.Series) -> pd.Series:
+        """Векторный find_all: списки найденных ключевых слов по колонке."""
+        hits = col.str.lower().str.findall(self._find)
+        return hits.apply(lambda x: x if isinstance(x, list) else [])
+
+
+def load_keyword_sets(path: str = KEYWORDS_PATH) -> Dict[str, List[str]]:
+    """
+    Возвращает наборы ключевых слов: значения по умолчанию, переопределенные JSON-файлом (если он есть).
+
+    Args:
+        path: Путь к JSON-файлу с наборами ключевых слов.
+
+    Returns:
+        Словарь {имя набора: список ключевых слов}.
+    """
+    keyword_sets = dict(DEFAULT_KEYWORDS)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            keyword_sets.update(json.load(f))
+    return keyword_sets
+
+
+@lru_cache(maxsize=None)
+def get_matcher(name: str) -> KeywordMatcher:
+    """
+    Возвращает скомпилированный матчер набора ключевых слов (один на процесс).
+
+    Raises:
+        KeyError: Если набор с таким именем не найден.
+    """
+    keyword_sets = load_keyword_sets()
+    if name not in keyword_sets:
+        raise KeyError(f"Набор ключевых слов '{name}' не найден.")
+    return KeywordMatcher(keyword_sets[name])
@@ -1,4 +1,10 @@
 import numpy as np
+import pandas as pd
+
+from utils.keyword_matcher import get_matcher
+from utils.parse_cache import by_uniques
+
+LEVEL_CODES = {'junior': 0, 'middle': 1, 'senior': 2}
 
 def extract_level_from_text(text: str) -> str:
     """
@@ -10,10 +16,10 @@ def extract_level_from_text(text: str) -> str:
     Returns:
         str: Одна из категорий: 'senior', 'junior' или 'middle' (по умолчанию).
     """
-    s = str(text).lower()
-    if any(kw in s for kw in ['senior', 'ведущий', 'lead', 'architect', 'главный']):
+    s = str(text)
+    if get_matcher('senior').contains(s):
         return 'senior'
-    if any(kw in s for kw in ['junior', 'младший', 'стажер', 'intern', 'trainee']):
+    if get_matcher('junior').contains(s):
         return 'junior'
     return 'middle'
 
@@ -45,4 +51,28 @@ def classify_developer_level(experience_months: float, pos_text: str) -> str:
     if 12 <= experience_months <= 36:
         return 'middle'
 
-    return 'senior'
\ No newline at end of file
+    return 'senior'
+
+
+def classify_developer_levels(experience_months, pos_texts) -> np.ndarray:
+    """
+    Пакетная версия classify_developer_level: размечает целые колонки за один проход.
+    Ключевые слова ищутся скомпилированными матчерами (utils/keyword_matcher.py) по всей колонке,
+    пороги опыта применяются через np.select. Результат совпадает со скалярной функцией.
+
+    Args:
+        experience_months (array-like): Стаж работы в месяцах (NaN допускается).
+        pos_texts (array-like): Тексты названий должностей.
+
+    Returns:
+        np.ndarray: Коды уровней (int8) согласно LEVEL_CODES.
+    """
+    exp = np.asarray(experience_months, dtype=np.float64)
+    pos = pd.Series(pos_texts).astype(str)
+    # Должности повторяются: ключевые слова ищутся только в уникальных текстах
+    is_senior = by_uniques(get_matcher('senior').contains_series)(pos).to_numpy(dtype=bool)
+    is_junior = by_uniques(get_matcher('junior').contains_series)(pos).to_numpy(dtype=bool)
+
+    conditions = [is_senior, is_junior, np.isnan(exp) | (exp < 12), exp <= 36]
+    choices = [LEVEL_CODES['senior'], LEVEL_CODES['junior'], LEVEL_CODES['junior'], LEVEL_CODES['middle']]
+    return np.select(conditions, choices, default=LEVEL_CODES['senior']).astype(np.int8)
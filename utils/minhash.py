@@ -0,0 +1,89 @@
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# MinHash по символьным n-граммам: устойчив к мелким правкам текста (опечатки, порядок слов, «Senior»)
+NUM_PERM = 128
+SHINGLE_SIZE = 3
+SEED = 42
+# Порция n-грамм при вычислении сигнатур: ограничивает память матрицы (перестановки x n-граммы)
+SHINGLES_PER_BLOCK = 1 << 16
+# Нечетные 64-битные множители: перемешивание кодов символов n-граммы и ключей полос LSH
+_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+EMPTY = np.iinfo(np.uint32).max
+
+
+def normalize_text(col: pd.Series) -> pd.Series:
+    """Нижний регистр, схлопнутые пробелы, без пробелов по краям; пропуск — пустая строка."""
+    return col.fillna('').astype(str).str.lower().str.replace(r'\s+', ' ', regex=True).str.strip()
+
+
+def _shingles(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Хэши (uint64) символьных n-грамм всех текстов одним массивом и номер текста каждой n-граммы.
+    Текст дополняется нулевыми символами до n-граммы, пустой текст n-грамм не дает.
+    """
+    pad = '\0' * (SHINGLE_SIZE - 1)
+    padded = [text + pad if text else '' for text in texts]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    codes = np.frombuffer(''.join(padded).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if codes.size < SHINGLE_SIZE:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+    starts = np.arange(codes.size - SHINGLE_SIZE + 1)
+    owner = np.repeat(np.arange(len(padded)), lengths)[starts]
+    ends = np.cumsum(lengths)
+    # N-граммы на стыке двух текстов отбрасываются
+    valid = starts + SHINGLE_SIZE <= ends[owner]
+    hashes = np.zeros(starts.size, dtype=np.uint64)
+    for i in range(SHINGLE_SIZE):
+        hashes = (hashes ^ codes[starts + i]) * _MIX[i]
+    return hashes[valid], owner[valid]
+
+
+def signatures(texts: List[str], num_perm: int = NUM_PERM, seed: int = SEED) -> np.ndarray:
+    """
+    MinHash-сигнатуры текстов (len(texts) x num_perm, uint32). Доля совпадающих позиций двух сигнатур —
+    оценка коэффициента Жаккара их множеств n-грамм. Перестановки — multiply-shift хэши
+    с фиксированным seed, поэтому сигнатуры воспроизводимы между прогонами и процессами.
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.randint(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    hashes, owner = _shingles(texts)
+    result = np.full((len(texts), num_perm), EMPTY, dtype=np.uint32)
+    if not hashes.size:
+        return result
+    # Порции по границам текстов: минимум по тексту считается reduceat внутри порции
+    cuts = np.searchsorted(owner, owner[::SHINGLES_PER_BLOCK])
+    bounds = np.unique(np.r_[cuts, hashes.size])
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        part_owner = owner[lo:hi]
+        first = np.r_[0, np.flatnonzero(part_owner[1:] != part_owner[:-1]) + 1]
+        values = ((a[:, None] * hashes[None, lo:hi] + b[:, None]) >> np.uint64(32)).astype(np.uint32)
+        result[part_owner[first]] = np.minimum.reduceat(values, first, axis=1).T
+    return result
+
+
+def lsh_bands(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    Разбиение сигнатуры на полосы (bands, rows) для LSH. Выбирается порог S-кривой (1/bands)^(1/rows),
+    ближайший к threshold снизу: пары с похожестью выше порога почти всегда становятся кандидатами,
+    а ложные кандидаты отсеиваются проверкой по сигнатуре.
+    """
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    below = [(bands, rows) for bands, rows in options if (1 / bands) ** (1 / rows) <= threshold]
+    return max(below or options[:1], key=lambda option: (1 / option[0]) ** (1 / option[1]))
+
+
+def band_keys(sig: np.ndarray, salt: np.ndarray, bands: int) -> np.ndarray:
+    """
+    Ключи полос LSH (строки x bands, uint64): хэш значений полосы, ее номера и соли строки.
+    Строки с общим ключом хотя бы одной полосы — кандидаты в почти дубликаты.
+    """
+    rows = sig.shape[1] // bands
+    keys = np.repeat(salt.astype(np.uint64)[:, None], bands, axis=1) ^ np.arange(bands, dtype=np.uint64)
+    parts = sig.reshape(sig.shape[0], bands, rows).astype(np.uint64)
+    for j in range(rows):
+        keys = (keys ^ parts[:, :, j]) * _MIX[j % _MIX.size]
+    return keys
@@ -0,0 +1,123 @@
+import importlib
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Пространство поиска по умолчанию: модель -> (класс sklearn, фиксированные параметры, сетка).
+# Модели внутри поиска однопоточные (n_jobs=1): параллельность — на уровне кандидатов и фолдов
+SEARCH_SPACE = {
+    'LR': {'estimator': 'sklearn.linear_model.LogisticRegression',
+           'params': {'max_iter': 1000, 'class_weight': 'balanced'},
+           'grid': {'C': [0.1, 1.0, 10.0]}},
+    'RF': {'estimator': 'sklearn.ensemble.RandomForestClassifier',
+           'params': {'class_weight': 'balanced', 'n_jobs': 1, 'random_state': 42},
+           'grid': {'n_estimators': [50, 100], 'max_depth': [None, 20], 'min_samples_leaf': [1, 5]}},
+    'ET': {'estimator': 'sklearn.ensemble.ExtraTreesClassifier',
+           'params': {'class_weight': 'balanced', 'n_jobs': 1, 'random_state': 42},
+           'grid': {'n_estimators': [100], 'max_depth': [None, 20]}},
+    'SGD': {'estimator': 'sklearn.linear_model.SGDClassifier',
+            'params': {'loss': 'log_loss', 'class_weight': 'balanced', 'random_state': 42},
+            'grid': {'alpha': [1e-5, 1e-4, 1e-3]}},
+    'NB': {'estimator': 'sklearn.naive_bayes.BernoulliNB', 'params': {}, 'grid': {'alpha': [0.1, 1.0]}},
+}
+SCORING = 'f1_macro'
+# Задержка онлайн-инференса: предсказание одной записи, повторов на модель
+LATENCY_SAMPLES = 200
+
+
+def load_search_space(path: Optional[str] = None, models: Optional[List[str]] = None) -> Dict[str, dict]:
+    """
+    Пространство поиска из JSON того же вида, что SEARCH_SPACE (по умолчанию — SEARCH_SPACE),
+    опционально только для перечисленных моделей.
+
+    Raises:
+        KeyError: Если модель не найдена в пространстве поиска.
+    """
+    space = SEARCH_SPACE
+    if path is not None:
+        with open(path, encoding='utf-8') as f:
+            space = json.load(f)
+    if models:
+        missing = [name for name in models if name not in space]
+        if missing:
+            raise KeyError(f"Модели {', '.join(missing)} нет в пространстве поиска ({', '.join(space)}).")
+        space = {name: space[name] for name in models}
+    return space
+
+
+def make_estimator(spec: dict) -> Any:
+    """Создает оценщик по пути к классу ('sklearn.ensemble.RandomForestClassifier') и параметрам."""
+    module, name = spec['estimator'].rsplit('.', 1)
+    return getattr(importlib.import_module(module), name)(**spec.get('params', {}))
+
+
+def measure_latency(model: Any, x, samples: int = LATENCY_SAMPLES) -> Dict[str, float]:
+    """Медиана и 95-й перцентиль времени предсказания одной записи, мс."""
+    rows = np.random.RandomState(0).randint(0, x.shape[0], size=min(samples, x.shape[0]))
+    times = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict(x[row:row + 1])
+        times.append((time.perf_counter() - start) * 1000)
+    return {'latency_p50_ms': float(np.percentile(times, 50)), 'latency_p95_ms': float(np.percentile(times, 95))}
+
+
+def search_models(x, y, train_idx: np.ndarray, space: Dict[str, dict], method: str = 'grid', cv: int = 5,
+                  n_jobs: int = 1) -> Dict[str, dict]:
+    """
+    Подбирает гиперпараметры каждой модели стратифицированной кросс-валидацией на строках train_idx.
+
+    X передается в поиск целиком, а фолды задаются номерами строк: memory-mapped датасет
+    уходит в процессы пула ссылкой на файл (joblib), без копирования матрицы в каждый процесс.
+    Лучшая модель заново не обучается (refit=False) — это делает вызывающий код на train_idx.
+
+    Args:
+        method: 'grid' — полный перебор сетки, 'halving' — successive halving (кандидаты
+                отсеиваются на растущих подвыборках строк).
+        cv: Число фолдов StratifiedKFold.
+        n_jobs: Число процессов пула (-1 — все ядра).
+
+    Returns:
+        {модель: {'params', 'cv_score', 'cv_fit_s', 'cv_score_s', 'candidates'}}.
+    """
+    from sklearn.model_selection import GridSearchCV, StratifiedKFold
+
+    y_train = np.asarray(y[train_idx])
+    folds = [(train_idx[fit], train_idx[val])
+             for fit, val in StratifiedKFold(cv, shuffle=True, random_state=42).split(train_idx, y_train)]
+    results = {}
+    for name, spec in space.items():
+        if method == 'halving':
+            from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+            from sklearn.model_selection import HalvingGridSearchCV
+            search = HalvingGridSearchCV(make_estimator(spec), spec['grid'], cv=folds, scoring=SCORING,
+                                         n_jobs=n_jobs, refit=False, random_state=42)
+        else:
+            search = GridSearchCV(make_estimator(spec), spec['grid'], cv=folds, scoring=SCORING,
+                                  n_jobs=n_jobs, refit=False)
+        start = time.perf_counter()
+        search.fit(x, y)
+        best = search.best_index_
+        results[name] = {'params': search.best_params_, 'cv_score': float(search.best_score_),
+                         'cv_fit_s': float(search.cv_results_['mean_fit_time'][best]),
+                         'cv_score_s': float(search.cv_results_['mean_score_time'][best]),
+                         'candidates': int(getattr(search, 'n_candidates_', [len(search.cv_results_['params'])])[0]),
+                         'search_s': time.perf_counter() - start}
+        print(f"[Search] {name}: {SCORING}={results[name]['cv_score']:.4f} {results[name]['params']} "
+              f"({results[name]['candidates']} кандидатов, {results[name]['search_s']:.1f} с)")
+    return results
+
+
+def select_model(results: Dict[str, dict], latency_budget_ms: Optional[float] = None) -> Optional[str]:
+    """
+    Модель с лучшей оценкой кросс-валидации среди укладывающихся в бюджет задержки
+    (95-й перцентиль предсказания одной записи). None — ни одна модель не уложилась.
+    Отложенная выборка в выборе не участвует и остается честной оценкой выбранной модели.
+    """
+    fits = {name: r for name, r in results.items()
+            if latency_budget_ms is None or r['latency_p95_ms'] <= latency_budget_ms}
+    if not fits:
+        return None
+    return max(fits, key=lambda name: fits[name]['cv_score'])
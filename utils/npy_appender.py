@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+
+HEADER_SIZE = 128  # Резерв под заголовок .npy: форма массива может расти без перезаписи данных
+
+
+class NpyAppender:
+    """
+    Потоковая запись массива в файл .npy порциями (по первой оси).
+    Данные дописываются в конец файла, а заголовок с итоговой формой
+    перезаписывается на месте, поэтому память не зависит от размера массива.
+    """
+    def __init__(self, path: str, append: bool = False):
+        """
+        Args:
+            path: Путь к файлу .npy.
+            append: Дописывать в существующий файл (созданный NpyAppender) вместо перезаписи.
+        """
+        self.path = path
+        self.rows = 0
+        self.dtype = None
+        self.tail_shape = None
+        self._file = None
+        if append and os.path.exists(path):
+            self._open_existing()
+
+    def append(self, arr: np.ndarray) -> None:
+        """
+        Дописывает порцию строк. dtype и размерность строк должны совпадать с первой порцией.
+
+        Args:
+            arr: Массив NumPy с произвольным числом строк.
+        """
+        arr = np.ascontiguousarray(arr)
+        if self._file is None:
+            self.dtype, self.tail_shape = arr.dtype, arr.shape[1:]
+            self._file = open(self.path, 'wb')
+            self._write_header()
+        elif arr.dtype != self.dtype or arr.shape[1:] != self.tail_shape:
+            raise ValueError(f"Порция {arr.dtype}{arr.shape} несовместима с {self.dtype}{self.tail_shape}")
+        self._file.write(arr.tobytes())
+        self.rows += arr.shape[0]
+
+    def compact(self, keep: np.ndarray, chunk_rows: int = 1 << 20) -> None:
+        """
+        Удаляет строки на месте: строки с keep=True сдвигаются к началу файла порциями,
+        хвост файла обрезается. Запись никогда не обгоняет чтение, поэтому еще не
+        прочитанные строки не затираются, а память ограничена chunk_rows.
+
+        Args:
+            keep: Булева маска длины rows.
+        """
+        if self.rows == 0:
+            return
+        row_bytes = self.dtype.itemsize * int(np.prod(self.tail_shape, dtype=np.int64))
+        data = np.memmap(self.path, dtype=self.dtype, mode='r', offset=HEADER_SIZE,
+                         shape=(self.rows,) + self.tail_shape)
+        kept = 0
+        for start in range(0, self.rows, chunk_rows):
+            block = np.ascontiguousarray(data[start:start + chunk_rows][keep[start:start + chunk_rows]])
+            self._file.seek(HEADER_SIZE + kept * row_bytes)
+            self._file.write(block.tobytes())
+            kept += block.shape[0]
+        del data
+        self.rows = kept
+        self._file.truncate(HEADER_SIZE + kept * row_bytes)
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self) -> None:
+        """Записывает итоговую форму массива в заголовок и закрывает файл."""
+        if self._file is None:
+            return
+        self._write_header()
+        self._file.close()
+        self._file = None
+
+    def _open_existing(self) -> None:
+        self._file = open(self.path, 'r+b')
+        version = np.lib.format.read_magic(self._file)
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(self._file)
+        if version != (1, 0) or self._file.tell() != HEADER_SIZE or fortran_order:
+            self._file.close()
+            raise ValueError(f"Файл '{self.path}' записан не NpyAppender — дописывание невозможно.")
+        self.dtype, self.tail_shape, self.rows = dtype, shape[1:], shape[0]
+        self._file.seek(0, os.SEEK_END)
+
+    def _write_header(self) -> None:
+        header = repr({
+            'descr': np.lib.format.dtype_to_descr(self.dtype),
+            'fortran_order': False,
+            'shape': (self.rows,) + self.tail_shape,
+        })
+        # magic (6) + версия (2) + длина заголовка (2) + словарь, дополненный пробелами до HEADER_SIZE
+        header = header.ljust(HEADER_SIZE - 11) + '\n'
+        position = self._file.tell()
+        self._file.seek(0)
+        self._file.write(np.lib.format.magic(1, 0) + len(header).to_bytes(2, 'little') + header.encode('latin1'))
+        self._file.seek(max(position, HEADER_SIZE))
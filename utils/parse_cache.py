@@ -0,0 +1,109 @@
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+# Сырые значения полей резюме (ЗП, «Пол, возраст», опыт, город) сильно повторяются:
+# различных строк обычно единицы процентов, поэтому разбор каждой строки один раз окупается
+CACHE_SIZE = 100000
+# Доля различных значений, выше которой разбор уникальных не окупает factorize
+UNIQUE_MAX_SHARE = 0.5
+
+
+class ParseCache:
+    """
+    Общий для скалярных парсеров кэш результатов разбора с вытеснением давно не использованных
+    записей (LRU). Ключ — (имя парсера, сырая строка). Потокобезопасен (HTTP-сервис).
+    """
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_parse(self, name: str, text: str, parse: Callable[[str], Any]) -> Any:
+        key = (name, text)
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+            self.misses += 1
+        value = parse(text)
+        with self._lock:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            calls = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize,
+                    'hit_rate': round(self.hits / calls, 4) if calls else 0.0}
+
+
+class UniqueStats:
+    """Счетчики векторного разбора по уникальным значениям: строк на входе и реально разобранных значений."""
+    def __init__(self):
+        self.rows = self.parsed = 0
+        self._lock = threading.Lock()
+
+    def record(self, rows: int, parsed: int) -> None:
+        with self._lock:
+            self.rows += rows
+            self.parsed += parsed
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {'rows': self.rows, 'parsed': self.parsed,
+                    'saved_share': round(1 - self.parsed / self.rows, 4) if self.rows else 0.0}
+
+
+cache = ParseCache()
+unique_stats = UniqueStats()
+
+
+def cached(parse: Callable[[str], Any]) -> Callable[[Any], Any]:
+    """Декоратор скалярного парсера: строки разбираются через общий ParseCache, остальные значения — напрямую."""
+    @functools.wraps(parse)
+    def wrapper(text):
+        if not isinstance(text, str):
+            return parse(text)
+        return cache.get_or_parse(parse.__name__, text, parse)
+    return wrapper
+
+
+def by_uniques(parse: Callable[[pd.Series], pd.Series]) -> Callable[[pd.Series], pd.Series]:
+    """
+    Декоратор векторного парсера колонки: колонка кодируется словарем (pd.factorize),
+    парсер применяется только к уникальным значениям, результат раскладывается по строкам
+    через take по кодам. Пропуски разбираются тем же парсером (как отдельное значение),
+    поэтому результат совпадает с разбором всей колонки.
+    """
+    @functools.wraps(parse)
+    def wrapper(col: pd.Series) -> pd.Series:
+        codes, uniques = pd.factorize(col)
+        if len(uniques) > len(col) * UNIQUE_MAX_SHARE:
+            unique_stats.record(len(col), len(col))
+            return parse(col)
+        # Последний элемент — пропуск того же dtype: код -1 у take указывает именно на него
+        values = pd.Series(uniques).reindex(range(len(uniques) + 1))
+        if col.dtype == object:
+            values = values.astype(object)
+        parsed = parse(values)
+        unique_stats.record(len(col), len(values))
+        return pd.Series(parsed.to_numpy().take(codes), index=col.index, dtype=parsed.dtype)
+    return wrapper
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    """Статистика кэша скалярных парсеров и разбора по уникальным значениям."""
+    return {'cache': cache.stats(), 'uniques': unique_stats.stats()}
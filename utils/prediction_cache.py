@@ -0,0 +1,240 @@
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.helpers import find_column_name
+
+# Память: записей в LRU процесса. Диск: общий для процессов SQLite-файл в cache_dir
+MEMORY_SIZE = 100000
+DISK_FILE = 'predictions.sqlite'
+# При превышении лимита диска удаляются давно не читавшиеся записи до этой доли лимита,
+# кандидаты читаются порциями по DISK_EVICT_ROWS записей (меньше лимита SQLite на число параметров)
+DISK_EVICT_TO = 0.9
+DISK_EVICT_ROWS = 512
+# Схема диска. Число записей и байт хранится в строке cache_size и обновляется триггерами в той же
+# транзакции, что и записи: так размер верен для всех процессов и не требует SUM по таблице
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, value TEXT, '
+    'version TEXT, created REAL, accessed REAL, size INTEGER)',
+    'CREATE INDEX IF NOT EXISTS predictions_accessed ON predictions (accessed)',
+    'CREATE INDEX IF NOT EXISTS predictions_created ON predictions (created)',
+    'CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), rows INTEGER, bytes INTEGER)',
+    # Файл прежней версии без cache_size: размер считается один раз при первом открытии
+    'INSERT OR IGNORE INTO cache_size SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM predictions',
+    'CREATE TRIGGER IF NOT EXISTS predictions_insert AFTER INSERT ON predictions BEGIN '
+    'UPDATE cache_size SET rows = rows + 1, bytes = bytes + new.size; END',
+    'CREATE TRIGGER IF NOT EXISTS predictions_update AFTER UPDATE OF size ON predictions BEGIN '
+    'UPDATE cache_size SET bytes = bytes + new.size - old.size; END',
+    'CREATE TRIGGER IF NOT EXISTS predictions_delete AFTER DELETE ON predictions BEGIN '
+    'UPDATE cache_size SET rows = rows - 1, bytes = bytes - old.size; END',
+]
+
+
+def artifacts_version(res_dir: str, extra_paths: Iterable[str] = ()) -> str:
+    """
+    Версия артефактов инференса по метаданным файлов resources/*.pkl (и модели, если она
+    лежит отдельно): путь, mtime_ns и размер. Любое переобучение или замена файла меняет версию.
+    """
+    paths = sorted(set(glob.glob(os.path.join(res_dir, '*.pkl'))) | {p for p in extra_paths if os.path.exists(p)})
+    digest = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f'{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size};'.encode())
+    return digest.hexdigest()
+
+
+def prediction_keys(df: pd.DataFrame, columns: Sequence[str], version: str) -> List[str]:
+    """
+    Ключи кэша: 128-битный хэш сырых значений колонок, из которых строятся признаки, с версией артефактов.
+    Пропуски (None в JSON, пустое поле CSV) хэшируются одинаково, поэтому ключи сервиса
+    и пакетного предсказания совпадают.
+    """
+    sub = df[[find_column_name(df, keyword) for keyword in columns]]
+    # object вместо строкового dtype pandas: хэширование двух половин не факторизует колонки заново
+    text = sub.astype(str).astype(object).where(sub.notna(), None)
+    # Две половины ключа — хэши с разными солями из версии: другая версия дает другие ключи
+    halves = [pd.util.hash_pandas_object(text, index=False, hash_key=version[i:i + 16]).to_numpy()
+              for i in (0, 16)]
+    digest = np.column_stack(halves).astype('>u8').tobytes().hex()
+    return [digest[i:i + 32] for i in range(0, len(digest), 32)]
+
+
+class PredictionCache:
+    """
+    Кэш предсказаний инференса: ключ -> вероятности уровней (или None, если запись не прошла
+    фильтр IT-специалистов). Два уровня: LRU в памяти процесса и, если задан cache_dir,
+    общий для процессов SQLite-файл с TTL и ограничением размера (вытесняются давно не читавшиеся
+    записи). Записи привязаны к версии артефактов: при ее смене память очищается, а с диска читаются
+    только записи текущей версии. Записи прежних версий не удаляются сразу — файл может быть общим
+    для процессов разных версий (например, при поэтапном обновлении), — их вытесняют TTL и лимит размера.
+    Потокобезопасен.
+    """
+    def __init__(self, maxsize: int = MEMORY_SIZE, cache_dir: Optional[str] = None, ttl_s: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        """
+        Args:
+            maxsize: Записей в памяти (0 — без уровня памяти).
+            cache_dir: Директория дискового уровня (None — только память).
+            ttl_s: Время жизни записи, с (None — без ограничения).
+            max_bytes: Лимит размера дискового уровня, байт (None — без ограничения).
+        """
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.version = None
+        self.hits_memory = self.hits_disk = self.misses = self.evicted = 0
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(cache_dir, DISK_FILE), check_same_thread=False,
+                                       isolation_level=None, timeout=30)
+            # WAL: читатели других процессов не блокируются записью; в WAL synchronous=NORMAL не теряет целостность
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            with self._transaction():
+                for statement in _SCHEMA:
+                    self._db.execute(statement)
+
+    def set_version(self, version: str) -> bool:
+        """
+        Фиксирует версию артефактов; при смене очищает память, а с диска дальше читаются только записи
+        новой версии. True — версия сменилась.
+        """
+        with self._lock:
+            if version == self.version:
+                return False
+            self.version = version
+            self._memory.clear()
+            return True
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Optional[list]]:
+        """Найденные записи {ключ: значение}: сначала в памяти, затем на диске (с диска — поднимаются в память)."""
+        now = time.time()
+        found, missing = {}, []
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None and (self.ttl_s is None or now - entry[1] <= self.ttl_s):
+                    self._memory.move_to_end(key)
+                    found[key] = entry[0]
+                    self.hits_memory += 1
+                else:
+                    missing.append(key)
+            if self._db is not None and missing:
+                disk = self._read_disk(list(dict.fromkeys(missing)), now)
+                for key, (value, created) in disk.items():
+                    found[key] = value
+                    self._remember(key, value, created)
+                self.hits_disk += sum(key in disk for key in missing)
+            self.misses += sum(key not in found for key in missing)
+        return found
+
+    def put_many(self, items: Dict[str, Optional[list]]) -> None:
+        """Сохраняет предсказания в память и на диск; на диске при превышении лимита вытесняет старые записи."""
+        now = time.time()
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value, now)
+            if self._db is not None and items:
+                values = {key: json.dumps(value) for key, value in items.items()}
+                with self._transaction():
+                    # UPSERT, а не INSERT OR REPLACE: замена строки через REPLACE не вызывает триггер удаления
+                    self._db.executemany('INSERT INTO predictions VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO '
+                                         'UPDATE SET value = excluded.value, version = excluded.version, '
+                                         'created = excluded.created, accessed = excluded.accessed, '
+                                         'size = excluded.size',
+                                         [(key, value, self.version, now, now, len(key) + len(value))
+                                          for key, value in values.items()])
+                    self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self.hits_memory = self.hits_disk = self.misses = self.evicted = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM predictions')
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            calls = self.hits_memory + self.hits_disk + self.misses
+            stats = {'hits_memory': self.hits_memory, 'hits_disk': self.hits_disk, 'misses': self.misses,
+                     'hit_rate': round((self.hits_memory + self.hits_disk) / calls, 4) if calls else 0.0,
+                     'size': len(self._memory), 'maxsize': self.maxsize, 'evicted': self.evicted}
+            if self._db is not None:
+                rows, size = self._db.execute('SELECT rows, bytes FROM cache_size').fetchone()
+                stats.update(disk_rows=rows, disk_bytes=size)
+            return stats
+
+    def _remember(self, key: str, value: Optional[list], created: float) -> None:
+        if self.maxsize <= 0:
+            return
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    @contextmanager
+    def _transaction(self):
+        """Одна транзакция на пакет запросов (в режиме autocommit каждый запрос фиксировался бы отдельно)."""
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+
+    def _read_disk(self, keys: List[str], now: float) -> Dict[str, tuple]:
+        found = {}
+        with self._transaction():
+            # Ограничение SQLite на число параметров запроса
+            for start in range(0, len(keys), 900):
+                part = keys[start:start + 900]
+                marks = ','.join('?' * len(part))
+                for key, value, created in self._db.execute(
+                        f'SELECT key, value, created FROM predictions WHERE key IN ({marks}) AND version IS ?',
+                        [*part, self.version]):
+                    if self.ttl_s is None or now - created <= self.ttl_s:
+                        found[key] = (json.loads(value), created)
+                hits = [key for key in part if key in found]
+                if hits:
+                    self._db.execute(f"UPDATE predictions SET accessed = ? WHERE key IN ({','.join('?' * len(hits))})",
+                                     [now, *hits])
+        return found
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_s is not None:
+            self.evicted += self._db.execute('DELETE FROM predictions WHERE created < ?', (now - self.ttl_s,)).rowcount
+        if self.max_bytes is None:
+            return
+        total = self._db.execute('SELECT bytes FROM cache_size').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Давно не читавшиеся записи удаляются, пока размер не опустится до DISK_EVICT_TO лимита. Кандидаты
+        # читаются порциями по индексу accessed: работа пропорциональна числу удаленных записей, а не таблице
+        excess = total - self.max_bytes * DISK_EVICT_TO
+        while excess > 0:
+            rows = self._db.execute('SELECT key, size FROM predictions ORDER BY accessed LIMIT ?',
+                                    (DISK_EVICT_ROWS,)).fetchall()
+            if not rows:
+                break
+            keys = []
+            for key, size in rows:
+                keys.append(key)
+                excess -= size
+                if excess <= 0:
+                    break
+            self.evicted += self._db.execute(f"DELETE FROM predictions WHERE key IN ({','.join('?' * len(keys))})",
+                                             keys).rowcount
@@ -0,0 +1,154 @@
+import os
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_io import ROW_INDEX, DatasetWriter, compact_dataset, open_dataset, read_manifest
+
+
+def row_fingerprints(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+    """
+    Отпечаток содержимого строк (uint64) по колонкам, от которых зависят признаки.
+    Значения приводятся к строкам: отпечаток не зависит от того, как pandas вывел dtype колонки в чанке.
+    """
+    return pd.util.hash_pandas_object(df[columns].astype(str), index=False, categorize=True).to_numpy()
+
+
+def _occurrences(keys: np.ndarray) -> np.ndarray:
+    """Номер вхождения каждого ключа среди равных ему (0 для первого) в порядке массива."""
+    if not keys.size:
+        return np.zeros(0, dtype=np.int64)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(keys.size), 0))
+    ranks = np.empty(keys.size, dtype=np.int64)
+    ranks[order] = np.arange(keys.size) - group_start
+    return ranks
+
+
+def _pair_keys(keys: np.ndarray) -> np.ndarray:
+    """Ключ (отпечаток, номер вхождения): одинаковые строки-дубликаты сопоставляются по одной."""
+    return pd.util.hash_pandas_object(pd.DataFrame({'key': keys, 'rank': _occurrences(keys)}), index=False).to_numpy()
+
+
+class RowIndex:
+    """
+    Индекс инкрементального парсинга: отпечаток каждой строки входного CSV -> номер строки
+    в хранилище датасета (-1, если строка не прошла фильтр IT-специалистов).
+
+    Хранится рядом с датасетом (data/row_index.npz) вместе с числом строк датасета и хэшем
+    трансформеров, на которых он построен: при любом расхождении с манифестом индекс
+    считается недействительным и датасет пересобирается полностью.
+
+    Прогон: add_input для каждого чанка возвращает маску новых/измененных строк (их отпечатков
+    нет в индексе) — только они идут на извлечение признаков и дописываются в датасет;
+    add_rows отмечает, какие входные строки стали строками датасета; finish сопоставляет
+    неизменные строки со старыми, удаляет из датасета исчезнувшие (на месте) и сохраняет индекс.
+    """
+    def __init__(self, data_dir: str, keys: Optional[np.ndarray] = None, offsets: Optional[np.ndarray] = None,
+                 dataset_rows: int = 0):
+        self.data_dir = data_dir
+        self.keys = np.zeros(0, dtype=np.uint64) if keys is None else keys
+        self.offsets = np.zeros(0, dtype=np.int64) if offsets is None else offsets
+        self.dataset_rows = dataset_rows
+        self._sorted_keys = np.sort(self.keys)
+        self._input_keys: List[np.ndarray] = []
+        self._input_new: List[np.ndarray] = []
+        self._appended: List[np.ndarray] = []
+
+    @classmethod
+    def load(cls, data_dir: str, transformer_hash: str, fmt: str) -> Optional['RowIndex']:
+        """Загружает индекс, если он согласован с датасетом, трансформерами и форматом; иначе None."""
+        path = os.path.join(data_dir, ROW_INDEX)
+        if not os.path.exists(path):
+            return None
+        try:
+            manifest = read_manifest(data_dir)
+        except FileNotFoundError:
+            return None
+        with np.load(path) as saved:
+            if (int(saved['dataset_rows']) != manifest['rows'] or str(saved['transformer_hash']) != transformer_hash
+                    or manifest['transformer_hash'] != transformer_hash or manifest['format'] != fmt):
+                return None
+            return cls(data_dir, saved['keys'], saved['offsets'], manifest['rows'])
+
+    def add_input(self, keys: np.ndarray) -> np.ndarray:
+        """Регистрирует отпечатки очередного чанка; возвращает маску строк, которых нет в индексе."""
+        pos = np.searchsorted(self._sorted_keys, keys)
+        known = pos < self._sorted_keys.size
+        known[known] = self._sorted_keys[pos[known]] == keys[known]
+        self._input_keys.append(keys)
+        self._input_new.append(~known)
+        return ~known
+
+    def add_rows(self, input_rows: np.ndarray) -> None:
+        """Отмечает входные строки (сквозные номера в CSV), дописанные в датасет, в порядке записи."""
+        self._appended.append(np.asarray(input_rows, dtype=np.int64))
+
+    def finish(self) -> dict:
+        """
+        Согласует датасет с новым входом и сохраняет индекс.
+
+        Returns:
+            Статистика прогона: строк на входе, новых/измененных, без изменений, удаленных строк датасета.
+        """
+        keys = np.concatenate(self._input_keys) if self._input_keys else np.zeros(0, dtype=np.uint64)
+        is_new = np.concatenate(self._input_new) if self._input_new else np.zeros(0, dtype=bool)
+        appended = np.concatenate(self._appended) if self._appended else np.zeros(0, dtype=np.int64)
+        offsets = np.full(keys.size, -1, dtype=np.int64)
+        offsets[appended] = self.dataset_rows + np.arange(appended.size)
+
+        # Неизменные строки сопоставляются со старыми по (отпечаток, номер вхождения): если дубликатов
+        # стало меньше, лишние старые строки удаляются, если больше — недостающие копируются
+        existing = np.flatnonzero(~is_new)
+        old_pairs, new_pairs = _pair_keys(self.keys), _pair_keys(keys[existing])
+        order = np.argsort(old_pairs)
+        pos = np.minimum(np.searchsorted(old_pairs[order], new_pairs), max(order.size - 1, 0))
+        matched = (old_pairs[order[pos]] == new_pairs) if order.size else np.zeros(existing.size, dtype=bool)
+        old_matched = order[pos[matched]]
+        offsets[existing[matched]] = self.offsets[old_matched]
+
+        # Из старых строк датасета остаются только сопоставленные, новые дописаны в конец
+        keep = np.ones(self.dataset_rows + appended.size, dtype=bool)
+        keep[:self.dataset_rows] = False
+        kept_rows = self.offsets[old_matched]
+        keep[kept_rows[kept_rows >= 0]] = True
+        deleted = int((~keep).sum())
+        if deleted:
+            compact_dataset(self.data_dir, keep)
+        remap = np.cumsum(keep) - 1
+        valid = offsets >= 0
+        offsets[valid] = remap[offsets[valid]]
+
+        # Лишние дубликаты неизменного содержимого получают копию строки датасета с тем же отпечатком
+        surplus = existing[~matched]
+        copied = 0
+        if surplus.size:
+            by_key = np.argsort(self.keys, kind='stable')
+            sources = self.offsets[by_key[np.searchsorted(self.keys[by_key], keys[surplus])]]
+            copy = sources >= 0
+            copied = int(copy.sum())
+            if copied:
+                offsets[surplus[copy]] = self._append_copies(remap[sources[copy]])
+
+        manifest = read_manifest(self.data_dir)
+        path = os.path.join(self.data_dir, ROW_INDEX)
+        # Индекс пишется последним и атомарно: прерванный прогон оставит индекс, не совпадающий с манифестом
+        np.savez(path + '.tmp.npz', keys=keys, offsets=offsets, dataset_rows=manifest['rows'],
+                 transformer_hash=manifest['transformer_hash'])
+        os.replace(path + '.tmp.npz', path)
+        return {'input_rows': int(keys.size), 'new_rows': int(is_new.sum()), 'unchanged_rows': int(existing.size),
+                'appended_rows': int(appended.size) + copied, 'deleted_rows': deleted, 'dataset_rows': manifest['rows']}
+
+    def _append_copies(self, rows: np.ndarray) -> np.ndarray:
+        """Дописывает в датасет копии существующих строк; возвращает их новые номера."""
+        manifest = read_manifest(self.data_dir)
+        x, y = open_dataset(self.data_dir)
+        x_copy, y_copy = x[rows], (np.asarray(y[rows]) if y is not None else None)
+        del x, y  # memory-mapping закрывается до дозаписи в те же файлы
+        writer = DatasetWriter(self.data_dir, append=True)
+        writer.write(x_copy, y_copy, manifest['feature_schema'], manifest['transformer_hash'])
+        writer.close()
+        return manifest['rows'] + np.arange(rows.size)
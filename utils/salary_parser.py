@@ -2,6 +2,13 @@ import re
 
 import numpy as np
 
+from utils.parse_cache import cached
+
+NON_DIGIT_PATTERN = re.compile(r'[^\d]')
+# Фиксированные курсы для PoC
+RATES = {'USD': 90.0, 'EUR': 98.0, 'KZT': 0.20, 'ГРН': 2.5, 'UAH': 2.5}
+
+@cached
 def extract_salary(text: str) -> float:
     """
     Извлекает числовое значение зарплаты и конвертирует в рубли по фиксированным курсам.
@@ -17,16 +24,14 @@ def extract_salary(text: str) -> float:
     if not isinstance(text, str):
         return np.nan
 
-    num_match = re.sub(r'[^\d]', '', text)
+    num_match = NON_DIGIT_PATTERN.sub('', text)
     if not num_match:
         return np.nan
 
     amount = float(num_match)
     text_upper = text.upper()
 
-    # Фиксированные курсы для PoC
-    rates = {'USD': 90.0, 'EUR': 98.0, 'KZT': 0.20, 'ГРН': 2.5, 'UAH': 2.5}
-    for currency, rate in rates.items():
+    for currency, rate in RATES.items():
         if currency in text_upper:
             amount *= rate
             break
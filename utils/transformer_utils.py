@@ -1,54 +1,103 @@
+import hashlib
 import os
-import numpy as np
+from typing import Any, Dict, List, Tuple, Union
+
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import StandardScaler
-
-from utils.age_parser import extract_age
-from utils.city_parser import extract_city
-from utils.experience_parser import extract_experience
-from utils.helpers import find_column_name
-from utils.it_filter import is_it_developer
-from utils.level_classifier import classify_developer_level
-from utils.salary_parser import extract_salary
-from utils.transformer_utils import get_fitted_transformer  # Наша логика здесь
-from .base import Handler
-
-class FeatureExtractionHandler(Handler):
-    """Извлекает признаки и размечает уровни IT-специалистов (Jr/Mid/Sr)."""
-    RES_DIR = "resources"
-    LEVEL_MAP = {'junior': 0, 'middle': 1, 'senior': 2}
-
-    def __init__(self, is_training: bool = True):
-        self.is_training = is_training
-
-    def handle(self, df: pd.DataFrame) -> dict:
-        """Трансформирует данные, обучая или используя готовые веса."""
-        pos_col, last_col = find_column_name(df, 'Ищет работу'), find_column_name(df, 'должность')
-        data = pd.DataFrame({
-            'sal': df[find_column_name(df, 'ЗП')].apply(extract_salary),
-            'age': df[find_column_name(df, 'Пол, возраст')].apply(extract_age),
-            'exp': df[find_column_name(df, 'Опыт')].apply(extract_experience),
-            'male': df[find_column_name(df, 'Пол, возраст')].apply(lambda x: 1 if 'Мужчина' in str(x) else 0),
-            'city': df[find_column_name(df, 'Город')].apply(extract_city),
-            'pos': (df[pos_col].fillna('') + ' ' + df[last_col].fillna('')).str.lower()
-        }).dropna(subset=['sal', 'age', 'exp'])  # Удаляем пропуски без inplace
-
-        data = data[data['pos'].apply(is_it_developer)]
-
-        y_data = None
-        if self.is_training:
-            y_data = data.apply(lambda r: self.LEVEL_MAP[classify_developer_level(r['exp'], r['pos'])], axis=1).values
-
-        vec = get_fitted_transformer(TfidfVectorizer(max_features=500),
-                                     os.path.join(self.RES_DIR, "vectorizer.pkl"),
-                                     data['pos'] + " " + data['city'], self.is_training)
-
-        scaler = get_fitted_transformer(StandardScaler(),
-                                        os.path.join(self.RES_DIR, "scaler.pkl"),
-                                        data[['sal', 'age', 'exp']], self.is_training)
-
-        x_data = np.hstack([data[['male']].values, scaler.transform(data[['sal', 'age', 'exp']]),
-                            vec.transform(data['pos'] + " " + data['city']).toarray()]).astype(np.float32)
-
-        return super().handle({'x': x_data, 'y': y_data})
\ No newline at end of file
+
+from utils.helpers import files_hash
+
+# Реестр трансформеров процесса: путь -> (mtime_ns и размер файла, трансформер, хэш обучения)
+_CACHE: Dict[str, Tuple[tuple, Any, str]] = {}
+HASH_SUFFIX = '.sha256'
+
+
+def fit_hash(transformer: Any, fit_data: Union[pd.Series, pd.DataFrame]) -> str:
+    """
+    Хэш обучения: класс и параметры трансформера плюс содержимое обучающих данных.
+    Совпадение хэша означает, что повторное обучение даст тот же артефакт.
+    """
+    digest = hashlib.sha256()
+    digest.update(type(transformer).__name__.encode())
+    digest.update(repr(sorted(transformer.get_params().items())).encode())
+    digest.update(pd.util.hash_pandas_object(fit_data, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_transformer(path: str) -> Any:
+    """
+    Загружает трансформер один раз на процесс и держит его в памяти.
+    Файл перечитывается, только если он изменился на диске (mtime или размер).
+
+    Raises:
+        FileNotFoundError: Если артефакт не найден.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Трансформер {path} не найден. Запустите parse_data.py для обучения.")
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _CACHE.get(path)
+    if cached is None or cached[0] != version:
+        hash_path = path + HASH_SUFFIX
+        saved_hash = None
+        if os.path.exists(hash_path):
+            with open(hash_path) as f:
+                saved_hash = f.read().strip()
+        import joblib
+        _CACHE[path] = (version, joblib.load(path), saved_hash)
+    return _CACHE[path][1]
+
+
+def artifacts_hash(paths: List[str]) -> str:
+    """
+    Общий хэш набора артефактов для манифеста датасета. Строится по хэшам обучения,
+    а не по байтам .pkl: pickle одного и того же трансформера не обязан совпадать побайтно
+    (например, порядок элементов множества stop_words_ у TfidfVectorizer).
+    Для артефактов без сохраненного хэша обучения используется SHA-256 файла.
+    Сами артефакты не распаковываются: инференс с компактной моделью не загружает sklearn.
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        saved_hash = None
+        if os.path.exists(path + HASH_SUFFIX):
+            with open(path + HASH_SUFFIX) as f:
+                saved_hash = f.read().strip()
+        digest.update((saved_hash or files_hash([path])).encode())
+    return digest.hexdigest()
+
+
+def get_fitted_transformer(transformer: Any, path: str, fit_data: Union[pd.Series, pd.DataFrame],
+                           is_training: bool) -> Any:
+    """
+    Возвращает обученный трансформер.
+
+    В режиме обучения трансформер обучается на fit_data и сохраняется в path вместе с хэшем
+    обучения (path + '.sha256'). Если хэш совпадает с сохраненным, обучение пропускается
+    и используется уже сохраненный артефакт. В режиме инференса артефакт только загружается.
+
+    Args:
+        transformer: Необученный трансформер sklearn (определяет класс и параметры).
+        path: Путь к артефакту .pkl.
+        fit_data: Данные для обучения (используются только при is_training=True).
+        is_training: Режим обучения.
+
+    Returns:
+        Обученный трансформер (из кэша процесса, если он не менялся).
+    """
+    if not is_training:
+        return load_transformer(path)
+
+    new_hash = fit_hash(transformer, fit_data)
+    if os.path.exists(path):
+        fitted = load_transformer(path)
+        if _CACHE[path][2] == new_hash:
+            return fitted
+
+    import joblib
+    transformer.fit(fit_data)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    joblib.dump(transformer, path)
+    with open(path + HASH_SUFFIX, 'w') as f:
+        f.write(new_hash)
+    stat = os.stat(path)
+    _CACHE[path] = ((stat.st_mtime_ns, stat.st_size), transformer, new_hash)
+    return transformer
@@ -1,10 +1,7 @@
 import os
 from collections import Counter
 
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-def save_class_balance_plot(y, mapping, docs_dir: str = 'docs'):
+def save_class_balance_plot(y, mapping, docs_dir: str = 'docs', counts: dict = None):
     """
     Строит и сохраняет график распределения классов.
 
@@ -12,8 +9,13 @@ def save_class_balance_plot(y, mapping, docs_dir: str = 'docs'):
         y (np.ndarray): массив целевых меток.
         mapping (dict): словарь для перевода кодов в названия (0 -> 'junior').
         res_dir (str): папка для сохранения графика.
+        counts (dict): готовые частоты классов {код: количество} (если y не загружается в память).
     """
-    counts = Counter(y)
+    # matplotlib и seaborn импортируются только при построении графика (их импорт — больше секунды)
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    counts = counts if counts is not None else Counter(y)
     sorted_items = sorted(counts.items())
     labels = [mapping[int(item[0])] for item in sorted_items]
     vals = [item[1] for item in sorted_items]